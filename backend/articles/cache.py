@@ -0,0 +1,233 @@
+import hashlib
+import logging
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+logger = logging.getLogger("articles")
+
+# Response headers kept with the cached content: Vary tells shared caches
+# the representation depends on Accept
+CACHED_HEADERS = ["ETag", "Last-Modified", "Cache-Control", "Vary", "Allow"]
+
+
+class ResponseCache:
+    """
+    Rendered responses of anonymous GETs, by namespace version and normalized
+    request, in the cache of CACHES named by ARTICLE_RESPONSE_CACHE_BACKEND
+    (the database by default). ARTICLE_RESPONSE_CACHE_TIMEOUT is the lifetime
+    of the entries, 0 disables the cache.
+
+    Writes do not delete the entries: invalidate() bumps the version of the
+    namespace, part of every key, so the previous responses are all missed
+    at once and expire on their own.
+    Versions live in the same cache as the entries, so it must be shared by
+    every worker: a local memory cache would only be invalidated in the
+    worker serving the write. It is ignored when GUNICORN_WORKERS > 1.
+    A hit reads the version and the entry from the cache: two queries of the
+    cache table with the default database cache, instead of the queries and
+    serialization of the articles. Only local memory (one worker) or a shared
+    redis cache serve hits without querying the database.
+
+    Hits, misses and the time they took are counted by process.
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._warned = False
+        self.clear_stats()
+
+    @property
+    def backend(self):
+        return caches[settings.ARTICLE_RESPONSE_CACHE_BACKEND]
+
+    @property
+    def timeout(self):
+        return settings.ARTICLE_RESPONSE_CACHE_TIMEOUT
+
+    @property
+    def enabled(self):
+        if not self.timeout:
+            return False
+        if isinstance(self.backend, LocMemCache) and settings.GUNICORN_WORKERS > 1:
+            if not self._warned:
+                self._warned = True
+                logger.warning(
+                    f"Response cache '{self.namespace}' disabled: "
+                    f"{settings.ARTICLE_RESPONSE_CACHE_BACKEND} is local to each "
+                    f"of the {settings.GUNICORN_WORKERS} workers."
+                )
+            return False
+        return True
+
+    @property
+    def version_key(self):
+        return f"{self.namespace}:version"
+
+    def get_version(self):
+        version = self.backend.get(self.version_key)
+        if version is None:
+            # Never 1 again: an evicted version must not meet its old entries
+            self.backend.add(self.version_key, time.time_ns(), timeout=None)
+            version = self.backend.get(self.version_key)
+        return version
+
+    def invalidate(self):
+        """
+        Forget every cached response of the namespace.
+        """
+        try:
+            self.backend.incr(self.version_key)
+        except ValueError:
+            self.get_version()
+
+    def get_key(self, request):
+        """
+        Key of the response of 'request': its URL with sorted query
+        parameters (filters, search, ordering, page, cursor) and the media
+        type of the response.
+        """
+        params = sorted(
+            (key, value)
+            for key in request.query_params
+            for value in request.query_params.getlist(key)
+        )
+        url = f"{request.build_absolute_uri(request.path)}?{urlencode(params)}"
+        digest = hashlib.sha256(
+            f"{url} {request.accepted_media_type}".encode()
+        ).hexdigest()
+        return f"{self.namespace}:{self.get_version()}:{digest}"
+
+    def get(self, request, key, start_time):
+        """
+        Cached response of 'key', or 304 Not Modified when the client has it
+        already. None on a miss.
+        """
+        entry = self.backend.get(key)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        response = HttpResponse(entry["content"], content_type=entry["content_type"])
+        for header, value in entry["headers"].items():
+            response[header] = value
+        response["X-Cache"] = "HIT"
+
+        response = get_conditional_response(
+            request,
+            etag=entry["headers"].get("ETag"),
+            last_modified=parse_http_date_safe(
+                entry["headers"].get("Last-Modified", "")
+            ),
+            response=response,
+        )
+
+        duration = time.perf_counter() - start_time
+        with self._lock:
+            self.hits += 1
+            self.hit_seconds += duration
+            self.saved_seconds += max(entry["duration"] - duration, 0)
+        return response
+
+    def set(self, key, response, start_time):
+        """
+        Cache the rendered 'response' with the time it took.
+        """
+        duration = time.perf_counter() - start_time
+        self.backend.set(
+            key,
+            {
+                "content": response.content,
+                "content_type": response["Content-Type"],
+                "headers": {
+                    header: response[header]
+                    for header in CACHED_HEADERS
+                    if header in response
+                },
+                "duration": duration,
+            },
+            timeout=self.timeout,
+        )
+        with self._lock:
+            self.miss_seconds += duration
+
+    def stats(self):
+        """
+        Hit ratio and latency of this process since the last clear_stats().
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "hit_ms": 1000 * self.hit_seconds / self.hits if self.hits else 0.0,
+                "miss_ms": (
+                    1000 * self.miss_seconds / self.misses if self.misses else 0.0
+                ),
+                "saved_ms": 1000 * self.saved_seconds,
+            }
+
+    def clear_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.hit_seconds = 0.0
+            self.miss_seconds = 0.0
+            self.saved_seconds = 0.0
+
+
+article_response_cache = ResponseCache("articles:responses")
+
+
+class AnonymousResponseCacheMixin:
+    """
+    ViewSet mixin serving list and retrieve to anonymous users from its
+    'response_cache', before any query of the model. Authenticated users
+    always get fresh responses. Place it first: cached responses skip the
+    other mixins.
+    """
+
+    response_cache = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        self.response_cache_miss = None
+        if (
+            self.response_cache is None
+            or not request.user.is_anonymous
+            or not self.response_cache.enabled
+        ):
+            return handler(request, *args, **kwargs)
+
+        start_time = time.perf_counter()
+        key = self.response_cache.get_key(request)
+        response = self.response_cache.get(request, key, start_time)
+        if response is None:
+            # Stored once rendered, see finalize_response
+            self.response_cache_miss = (key, start_time)
+            response = handler(request, *args, **kwargs)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, "response_cache_miss", None) and response.status_code == 200:
+            key, start_time = self.response_cache_miss
+            response.render()
+            response["X-Cache"] = "MISS"
+            self.response_cache.set(key, response, start_time)
+        return response
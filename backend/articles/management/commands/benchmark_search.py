@@ -0,0 +1,188 @@
+import random
+import statistics
+import string
+import time
+
+from articles.models import Article
+from articles.search import (
+    DEFAULT_BACKENDS,
+    InvertedIndexSearchBackend,
+    get_search_backend,
+)
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+from satisfactions.management.commands.utils import print_color
+
+User = get_user_model()
+
+# Fields of the former SearchFilter, each term is an icontains on all of them
+LIKE_FIELDS = [
+    "title",
+    "description",
+    "user__email",
+    "user__first_name",
+    "user__last_name",
+]
+
+
+def like_search(queryset, terms):
+    """
+    Former '?search=' of ArticleViewSet: a LIKE '%term%' of each field, by title.
+    """
+    for term in terms:
+        matches = Q()
+        for field in LIKE_FIELDS:
+            matches |= Q(**{f"{field}__icontains": term})
+        queryset = queryset.filter(matches)
+    return queryset.order_by("title")
+
+
+def make_words(rng, count):
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))))
+    return sorted(words)
+
+
+class Command(BaseCommand):
+    """
+    Django management command to compare the search backends with the former
+    LIKE search on generated articles.
+
+    This command:
+        - Generating articles with Zipf distributed words and their authors
+        - Building the index of each backend, timed
+        - Timing each search like the API does: COUNT(*) then the first page
+        - Rolling everything back at the end
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py benchmark_search
+
+        Otherwise:
+            python manage.py benchmark_search --articles 10000
+    """
+
+    help = "Compare the article search backends with LIKE scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--articles",
+            type=int,
+            default=100_000,
+            help="Number of generated articles.",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Runs of each search."
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        vocabulary = make_words(rng, 5000)
+        names = make_words(rng, 200)
+
+        with transaction.atomic():
+            author = self.create_articles(rng, vocabulary, names, options["articles"])
+
+            searches = {
+                "frequent word": [vocabulary[0]],
+                "rare word": [vocabulary[-1]],
+                "two words": [vocabulary[1], vocabulary[20]],
+                "prefix": [vocabulary[5][:3]],
+                "author": [author],
+            }
+            backends = {"like": None, "inverted": InvertedIndexSearchBackend()}
+            if connection.vendor in DEFAULT_BACKENDS:
+                backends[connection.vendor] = import_string(
+                    DEFAULT_BACKENDS[connection.vendor]
+                )()
+
+            for name, backend in backends.items():
+                if backend is not None:
+                    start_time = time.time()
+                    backend.rebuild()
+                    print_color(
+                        f"'{name}' index built in {time.time() - start_time:.2f}s",
+                        "yellow",
+                    )
+
+            print_color(
+                f"\nSearch on {Article.objects.count()} articles "
+                f"(median of {options['repeat']} runs, number of results)",
+                "blue",
+            )
+            print_color(f"\t{'':<14}" + "".join(f"{name:>20}" for name in backends))
+            timings = {name: {} for name in backends}
+            for name, backend in backends.items():
+                for search, terms in searches.items():
+                    timings[name][search] = self.time_search(
+                        backend, terms, options["repeat"]
+                    )
+
+            for search in searches:
+                results = [timings[name][search] for name in backends]
+                print_color(
+                    f"\t{search:<14}"
+                    + "".join(f"{ms:>9.1f} ms {count:>7}" for ms, count in results)
+                )
+
+            # Generated rows are not kept
+            transaction.set_rollback(True)
+
+        print_color(f"\nAPI backend: {type(get_search_backend()).__name__}", "green")
+
+    def create_articles(self, rng, vocabulary, names, count):
+        """
+        Returns the last name of one of the authors.
+        """
+        start_time = time.time()
+        weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+
+        users = User.objects.bulk_create(
+            User(
+                email=f"benchmark-{index}@example.com",
+                first_name=rng.choice(names),
+                last_name=rng.choice(names),
+                password="!",
+            )
+            for index in range(100)
+        )
+        Article.objects.bulk_create(
+            (
+                Article(
+                    title=" ".join(rng.choices(vocabulary, weights, k=6)).capitalize(),
+                    description=" ".join(rng.choices(vocabulary, weights, k=30)),
+                    user=rng.choice(users),
+                )
+                for _ in range(count)
+            ),
+            batch_size=2000,
+        )
+        print_color(
+            f"{count} articles created in {time.time() - start_time:.2f}s", "yellow"
+        )
+        return users[0].last_name
+
+    def time_search(self, backend, terms, repeat):
+        """
+        Returns the median duration of COUNT(*) and the first page of results,
+        and the number of results.
+        """
+        durations = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            if backend is None:
+                queryset = like_search(Article.objects.all(), terms)
+            else:
+                queryset = backend.search(Article.objects.all(), terms).order_by(
+                    "-search_rank", "id"
+                )
+            count = queryset.count()
+            list(queryset[:5])
+            durations.append((time.perf_counter() - start_time) * 1000)
+
+        return statistics.median(durations), count
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from satisfactions.management.commands.utils import print_color
+
+from backend.query_plans import check_query_plans
+
+
+class Command(BaseCommand):
+    """
+    Django management command to check that the list and filter requests of
+    the API are served by indexes.
+
+    This command:
+        - Replaying the article, user and stats requests with sample rows
+        - Explaining each SELECT they run
+        - Failing on full table scans
+        - Rolling the sample rows back at the end
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py check_query_plans
+
+        Otherwise:
+            python manage.py check_query_plans --verbosity 2
+    """
+
+    help = "Check the query plans of the list and filter requests."
+
+    def handle(self, *args, **options):
+        results = check_query_plans()
+
+        full_scans = 0
+        request = None
+        for result in results:
+            if result["request"] != request:
+                request = result["request"]
+                print_color(f"\n{request}", "blue")
+
+            if result["full_scans"]:
+                full_scans += 1
+                print_color(f"\tFull scan of {', '.join(result['full_scans'])}", "red")
+            if result["full_scans"] or options["verbosity"] > 1:
+                print_color(f"\t{result['sql']}")
+                for row in result["plan"]:
+                    print_color(f"\t\t{row}")
+
+        if full_scans:
+            raise CommandError(f"{full_scans} of {len(results)} queries scan a table.")
+        print_color(f"\n{len(results)} queries, no full scan", "green")
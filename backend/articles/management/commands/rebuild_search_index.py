@@ -0,0 +1,54 @@
+import time
+
+from articles.search import get_search_backend
+from django.core.management.base import BaseCommand
+from satisfactions.management.commands.utils import print_color
+
+
+class Command(BaseCommand):
+    """
+    Django management command to index again every article in the search
+    backend (see articles/search.py).
+
+    This command:
+        - Indexing the title, description and author of each article
+        - Needed after loading fixtures or bulk imports, which skip the signals
+        - Nothing to do for indexes maintained by the database (MySQL), and
+          with --if-empty when articles are indexed already
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py rebuild_search_index
+
+        Otherwise:
+            python manage.py rebuild_search_index --if-empty
+    """
+
+    help = "Index again every article in the search backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-empty",
+            action="store_true",
+            help="Only index the articles when the index is empty (first start).",
+        )
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        backend = get_search_backend()
+        name = type(backend).__name__
+
+        if backend.maintained_by_database:
+            print_color(f"{name} is maintained by the database", "green")
+            return
+        if options["if_empty"] and not backend.is_empty():
+            print_color(f"{name} index is not empty, nothing to do", "green")
+            return
+
+        print_color(f"Indexing articles with {name}...", "yellow")
+
+        count = backend.rebuild()
+
+        print_color(
+            f"{count} articles indexed in {time.time() - start_time:.2f}s", "green"
+        )
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Full-text indexes of the 'sqlite' and 'mysql' search backends (see search.py)
+FULL_TEXT_SQL = {
+    "sqlite": [
+        (
+            "CREATE VIRTUAL TABLE articles_article_fts USING fts5"
+            "(title, description, author, tokenize = 'unicode61 remove_diacritics 2')",
+            "DROP TABLE articles_article_fts",
+        ),
+    ],
+    "mysql": [
+        (
+            "ALTER TABLE articles_article "
+            "ADD FULLTEXT INDEX article_fulltext (title, description)",
+            "ALTER TABLE articles_article DROP INDEX article_fulltext",
+        ),
+        (
+            "ALTER TABLE users_emailuser "
+            "ADD FULLTEXT INDEX user_fulltext (email, first_name, last_name)",
+            "ALTER TABLE users_emailuser DROP INDEX user_fulltext",
+        ),
+    ],
+}
+
+
+def create_full_text_indexes(apps, schema_editor):
+    for create_sql, _ in FULL_TEXT_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(create_sql)
+
+
+def drop_full_text_indexes(apps, schema_editor):
+    for _, drop_sql in FULL_TEXT_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(drop_sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0005_keyset_indexes"),
+        ("users", "0003_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=50)),
+                ("weight", models.FloatField()),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="articles.article",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["term", "article"], name="article_search_term")
+                ],
+            },
+        ),
+        migrations.RunPython(create_full_text_indexes, drop_full_text_indexes),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0006_articlesearchterm"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["user", "title", "id"], name="article_user_title_id"
+            ),
+        ),
+    ]
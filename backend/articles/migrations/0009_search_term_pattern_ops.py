@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0008_article_updated_at"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="articlesearchterm",
+            name="article_search_term",
+        ),
+        migrations.AddIndex(
+            model_name="articlesearchterm",
+            index=models.Index(
+                fields=["term", "article"],
+                name="article_search_term",
+                opclasses=["varchar_pattern_ops", "int8_ops"],
+            ),
+        ),
+    ]
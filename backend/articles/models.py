@@ -15,6 +15,46 @@ class Article(models.Model):
     image = models.URLField(max_length=500, blank=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(default=timezone.now)
+    # Validators of the conditional GETs (see backend/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination (see backend/pagination.py)
+            models.Index(fields=["title", "id"], name="article_title_id"),
+            models.Index(fields=["created_at", "id"], name="article_created_at_id"),
+            # ?user= filter, sorted by title
+            models.Index(fields=["user", "title", "id"], name="article_user_title_id"),
+            # Last-Modified of the list
+            models.Index(fields=["updated_at"], name="article_updated_at"),
+        ]
 
     def __str__(self):
         return f"title: {self.title}"
+
+
+class ArticleSearchTerm(models.Model):
+    """
+    Inverted index of the articles: weight of each word of an article,
+    maintained on save by the 'inverted index' search backend (see search.py).
+    """
+
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="search_terms"
+    )
+    term = models.CharField(max_length=50)
+    weight = models.FloatField()
+
+    class Meta:
+        indexes = [
+            # Operator classes of PostgreSQL, where LIKE 'word%' only uses a
+            # pattern_ops index unless the collation is C, ignored elsewhere
+            models.Index(
+                fields=["term", "article"],
+                name="article_search_term",
+                opclasses=["varchar_pattern_ops", "int8_ops"],
+            ),
+        ]
+
+    def __str__(self):
+        return f"term: {self.term} ({self.weight}) in article {self.article_id}"
@@ -0,0 +1,360 @@
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import FloatField, Func, Q, Sum, Value
+from django.utils.module_loading import import_string
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from .models import Article, ArticleSearchTerm
+
+# Weight of a word found in each field of the article
+FIELD_WEIGHTS = {"title": 3.0, "description": 1.0, "author": 1.0}
+
+# Longest indexed word, see ArticleSearchTerm.term
+TERM_LENGTH = 50
+
+# Search backend used by each database when ARTICLE_SEARCH_BACKEND is not set
+DEFAULT_BACKENDS = {
+    "sqlite": "articles.search.SQLiteSearchBackend",
+    "mysql": "articles.search.MySQLSearchBackend",
+}
+
+# Words left out of the MySQL FULLTEXT indexes: shorter than
+# innodb_ft_min_token_size, or in INNODB_FT_DEFAULT_STOPWORD
+MYSQL_MIN_TOKEN_SIZE = 3
+MYSQL_STOPWORDS = frozenset(
+    "a about an are as at be by com de en for from how i in is it la of on or "
+    "that the this to was what when where who will with und www".split()
+)
+
+
+def tokenize(text):
+    """
+    Lowercase words of 'text': 'john.doe@example.com' is 'john', 'doe',
+    'example' and 'com'.
+    """
+    return re.findall(r"\w+", text.lower())
+
+
+def get_document(article):
+    """
+    Indexed text of each field of 'article', the author is searched by email
+    and name.
+    """
+    user = article.user
+    return {
+        "title": article.title,
+        "description": article.description,
+        "author": f"{user.email} {user.first_name} {user.last_name}",
+    }
+
+
+class SearchBackend:
+    """
+    Searches the articles with an index instead of a LIKE '%term%' scan of
+    each field.
+    search() keeps the articles matching every word of the search terms
+    (prefixes included), annotated with their 'search_rank'.
+    """
+
+    # The database updates the index itself: nothing to index nor rebuild
+    maintained_by_database = False
+
+    def search(self, queryset, terms):
+        raise NotImplementedError
+
+    def is_empty(self):
+        """
+        True when no article is indexed yet, e.g. right after the migrations.
+        """
+        raise NotImplementedError
+
+    def index(self, articles):
+        """
+        Add or replace 'articles' in the index.
+        """
+
+    def remove(self, article_ids):
+        """
+        Remove the deleted articles from the index.
+        """
+
+    def rebuild(self, chunk_size=2000):
+        """
+        Index again every article, e.g. after a bulk_create or loaddata which
+        skip the signals. Returns the number of indexed articles.
+        """
+        count = 0
+        articles = Article.objects.select_related("user").order_by("id")
+        batch = []
+        for article in articles.iterator(chunk_size=chunk_size):
+            batch.append(article)
+            if len(batch) == chunk_size:
+                count += self.index_batch(batch)
+                batch = []
+        return count + self.index_batch(batch)
+
+    def index_batch(self, articles):
+        if articles:
+            self.index(articles)
+        return len(articles)
+
+
+class InvertedIndexSearchBackend(SearchBackend):
+    """
+    Portable index, one ArticleSearchTerm row by word of each article,
+    weighted by FIELD_WEIGHTS. The rank of an article sums the weights of the
+    words matching the search.
+    """
+
+    def search(self, queryset, terms):
+        words = tokenize(" ".join(terms))
+        if not words:
+            return queryset
+
+        # Each word as an indexed prefix scan, see get_prefix_filter()
+        matches = Q()
+        for word in words:
+            matches |= self.get_prefix_filter(word)
+
+        if len(words) > 1:
+            # Articles matching every word
+            for word in words:
+                queryset = queryset.filter(
+                    id__in=Article.objects.filter(self.get_prefix_filter(word)).values(
+                        "id"
+                    )
+                )
+
+        # Filtered before the annotation: only the matching terms are summed
+        return queryset.filter(matches).annotate(
+            search_rank=Sum("search_terms__weight")
+        )
+
+    def is_empty(self):
+        return not ArticleSearchTerm.objects.exists()
+
+    def get_prefix_filter(self, word):
+        """
+        Terms starting with 'word', matched with the index of ArticleSearchTerm:
+            - PostgreSQL: LIKE 'word%', with its varchar_pattern_ops index
+              whatever the collation of the database
+            - MySQL: LIKE 'word%' in the collation of the column, it is not
+              indexed for a case sensitive match (LIKE BINARY), terms are
+              lowercase anyway
+            - SQLite: a range of the BINARY collation, LIKE 'word%' is not
+              indexed as it ignores the case
+        """
+        word = word[:TERM_LENGTH]
+        if connection.vendor == "postgresql":
+            return Q(search_terms__term__startswith=word)
+        if connection.vendor == "mysql":
+            return Q(search_terms__term__istartswith=word)
+        return Q(search_terms__term__gte=word, search_terms__term__lt=word + "\uffff")
+
+    def index(self, articles):
+        rows = []
+        for article in articles:
+            weights = Counter()
+            for field, text in get_document(article).items():
+                for word in tokenize(text):
+                    weights[word[:TERM_LENGTH]] += FIELD_WEIGHTS[field]
+            rows.extend((article.id, term, weight) for term, weight in weights.items())
+
+        ArticleSearchTerm.objects.filter(
+            article_id__in=[article.id for article in articles]
+        ).delete()
+        # Without the ORM: a few dozens of terms by article
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {ArticleSearchTerm._meta.db_table} "
+                f"(article_id, term, weight) VALUES (%s, %s, %s)",
+                rows,
+            )
+
+    # Deleted articles lose their terms with the foreign key cascade
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    SQLite FTS5 table, created by the migrations, ranked with bm25.
+    """
+
+    table = "articles_article_fts"
+
+    def get_query(self, terms):
+        """
+        FTS5 query matching every word as a prefix: '"great"* "app"*'.
+        """
+        return " ".join(f'"{word}"*' for word in tokenize(" ".join(terms)))
+
+    def search(self, queryset, terms):
+        query = self.get_query(terms)
+        if not query:
+            return queryset
+
+        weights = ", ".join(str(weight) for weight in FIELD_WEIGHTS.values())
+        # FTS5 ranking functions are only available in the MATCH query itself
+        return queryset.extra(
+            tables=[self.table],
+            where=[
+                f"{self.table}.rowid = articles_article.id",
+                f"{self.table} MATCH %s",
+            ],
+            params=[query],
+            select={"search_rank": f"-bm25({self.table}, {weights})"},
+        )
+
+    def is_empty(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT 1 FROM {self.table} LIMIT 1")
+            return cursor.fetchone() is None
+
+    def index(self, articles):
+        rows = []
+        for article in articles:
+            document = get_document(article)
+            rows.append([article.id, *(document[field] for field in FIELD_WEIGHTS)])
+
+        self.remove([article.id for article in articles])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, {', '.join(FIELD_WEIGHTS)}) "
+                f"VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, article_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [[id] for id in article_ids],
+            )
+
+
+class Match(Func):
+    """
+    MATCH (columns) AGAINST (query IN BOOLEAN MODE) of a MySQL FULLTEXT index.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, *expressions, query):
+        super().__init__(*expressions)
+        self.query = query
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(
+            compiler,
+            connection,
+            template="MATCH (%(expressions)s) AGAINST (%%s IN BOOLEAN MODE)",
+            **extra_context,
+        )
+        return sql, (*params, self.query)
+
+
+class MySQLSearchBackend(SearchBackend):
+    """
+    MySQL FULLTEXT indexes of the articles (title, description) and of their
+    authors (email, first_name, last_name), created by the migrations and
+    maintained by MySQL itself.
+    Words shorter than innodb_ft_min_token_size (3) or in the stopword list
+    are not indexed: MATCH would never find them, they are searched with
+    LIKE '%word%' among the articles matching the other words instead.
+    """
+
+    search_fields = [
+        "title",
+        "description",
+        "user__email",
+        "user__first_name",
+        "user__last_name",
+    ]
+
+    maintained_by_database = True
+
+    def is_empty(self):
+        return False
+
+    def match(self, query):
+        return Match("title", "description", query=query) + Match(
+            "user__email", "user__first_name", "user__last_name", query=query
+        )
+
+    def get_match_filter(self, query):
+        """
+        Articles matching 'query' in their own FULLTEXT index or in the one of
+        their author: each table is filtered by its index in a subquery, a
+        MATCH over the joined tables could not use either of them.
+        """
+        where = "MATCH ({}) AGAINST (%s IN BOOLEAN MODE)"
+        articles = Article.objects.extra(
+            where=[where.format("title, description")], params=[query]
+        )
+        users = get_user_model().objects.extra(
+            where=[where.format("email, first_name, last_name")], params=[query]
+        )
+        return Q(id__in=articles.values("id")) | Q(user__in=users.values("id"))
+
+    def search(self, queryset, terms):
+        words = tokenize(" ".join(terms))
+        if not words:
+            return queryset
+
+        indexed = [word for word in words if self.is_indexed(word)]
+
+        # Each word in the article or its author
+        for word in indexed:
+            queryset = queryset.filter(self.get_match_filter(f"{word}*"))
+        for word in words:
+            if word not in indexed:
+                queryset = queryset.filter(self.get_contains_filter(word))
+
+        if not indexed:
+            return queryset.annotate(search_rank=Value(0.0, FloatField()))
+        # Only computed for the matching articles
+        return queryset.annotate(
+            search_rank=self.match(" ".join(f"{word}*" for word in indexed))
+        )
+
+    def is_indexed(self, word):
+        return len(word) >= MYSQL_MIN_TOKEN_SIZE and word not in MYSQL_STOPWORDS
+
+    def get_contains_filter(self, word):
+        matches = Q()
+        for field in self.search_fields:
+            matches |= Q(**{f"{field}__icontains": word})
+        return matches
+
+
+def get_search_backend():
+    """
+    Backend of ARTICLE_SEARCH_BACKEND, a dotted path, or the default one of
+    the database (inverted index for the others, e.g. PostgreSQL).
+    """
+    path = settings.ARTICLE_SEARCH_BACKEND or DEFAULT_BACKENDS.get(
+        connection.vendor, "articles.search.InvertedIndexSearchBackend"
+    )
+    return import_string(path)()
+
+
+class ArticleSearchFilter(SearchFilter):
+    """
+    Same '?search=' parameter as SearchFilter, served by the search backend.
+    Results are sorted by rank unless an ordering is requested, so it must
+    come after OrderingFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not tokenize(" ".join(terms)):
+            return queryset
+
+        queryset = get_search_backend().search(queryset, terms)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by("-search_rank", "id")
+        return queryset
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import article_response_cache
+from .models import Article
+from .search import get_search_backend
+
+User = get_user_model()
+
+# Fields of the author indexed with each article (see search.get_document)
+AUTHOR_FIELDS = {"email", "first_name", "last_name"}
+
+
+@receiver(post_save, sender=Article)
+def index_article(sender, instance, raw, **kwargs):
+    """
+    Keep the search index up to date, fixtures are indexed by
+    'manage.py rebuild_search_index'.
+    """
+    if not raw:
+        get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Article)
+def remove_article(sender, instance, **kwargs):
+    get_search_backend().remove([instance.id])
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article_responses(sender, **kwargs):
+    """
+    Forget the cached responses now, and again once committed: others may
+    cache the previous rows until then.
+    """
+    article_response_cache.invalidate()
+    transaction.on_commit(article_response_cache.invalidate)
+
+
+@receiver(post_save, sender=User)
+def index_author_articles(sender, instance, raw, update_fields, **kwargs):
+    """
+    Index again the articles of a renamed user, not on each login.
+    """
+    if raw or (update_fields is not None and not AUTHOR_FIELDS & set(update_fields)):
+        return
+
+    articles = list(Article.objects.filter(user=instance).select_related("user"))
+    if articles:
+        get_search_backend().index(articles)
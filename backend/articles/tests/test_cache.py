@@ -0,0 +1,191 @@
+from unittest import mock
+
+from articles.cache import article_response_cache
+from articles.models import Article
+from articles.serializers import ArticleSerializer
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+class ArticleResponseCacheTest(TestCase):
+    def setUp(self):
+        article_response_cache.backend.clear()
+        article_response_cache.clear_stats()
+
+        self.user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        self.article = Article.objects.create(
+            title="Cached article",
+            description="Read by everyone.",
+            user=self.user,
+        )
+        self.client = APIClient()
+        self.list_url = reverse("articles-list")
+        self.detail_url = reverse("articles-detail", args=[self.article.pk])
+
+    def test_anonymous_hit(self):
+        """
+        Should serve the same anonymous request again from the cache only.
+        """
+        response = self.client.get(self.list_url, {"title": "Cached article"})
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        with CaptureQueriesContext(connection) as context:
+            cached = self.client.get(self.list_url, {"title": "Cached article"})
+
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached["ETag"], response["ETag"])
+        self.assertIn("Accept", cached["Vary"])
+        self.assertEqual(cached["Allow"], response["Allow"])
+        # Version and entry, from the cache table only
+        self.assertEqual(
+            [
+                "articles_response_cache" in query["sql"]
+                for query in context.captured_queries
+            ],
+            [True, True],
+        )
+
+    def test_normalized_params(self):
+        """
+        Should share the entry of the same parameters in another order.
+        """
+        self.client.get(
+            self.list_url, {"title": "Cached article", "ordering": "-title"}
+        )
+        response = self.client.get(
+            f"{self.list_url}?ordering=-title&title=Cached+article"
+        )
+        self.assertEqual(response["X-Cache"], "HIT")
+
+        response = self.client.get(self.list_url, {"ordering": "title"})
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    def test_not_modified_hit(self):
+        """
+        Should answer 304 from the cache to a client with the same ETag.
+        """
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertIn("Accept", response["Vary"])
+
+    def test_invalidated_on_write(self):
+        """
+        Should forget the cached responses when an article is saved or deleted.
+        """
+        self.client.get(self.detail_url)
+        self.client.get(self.list_url)
+
+        self.article.title = "Updated article"
+        self.article.save()
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["title"], "Updated article")
+
+        self.client.get(self.list_url)
+        Article.objects.create(title="Another article", user=self.user)
+        response = self.client.get(self.list_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["count"], 2)
+
+        self.article.delete()
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalidated_on_commit(self):
+        """
+        Should forget the responses cached before the write was committed.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.save()
+            self.client.get(self.detail_url)
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    def test_authenticated_not_cached(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.detail_url)
+
+        with mock.patch.object(
+            ArticleSerializer, "to_representation", return_value={}
+        ) as mock_serialize:
+            response = self.client.get(self.detail_url)
+
+        self.assertNotIn("X-Cache", response)
+        mock_serialize.assert_called_once()
+
+    @override_settings(ARTICLE_RESPONSE_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        self.client.get(self.detail_url)
+        response = self.client.get(self.detail_url)
+
+        self.assertNotIn("X-Cache", response)
+
+    @override_settings(ARTICLE_RESPONSE_CACHE_BACKEND="default", GUNICORN_WORKERS=2)
+    def test_local_cache_several_workers(self):
+        """
+        Should not use a cache local to each worker when there are several.
+        """
+        self.client.get(self.detail_url)
+        response = self.client.get(self.detail_url)
+        self.assertNotIn("X-Cache", response)
+
+        with override_settings(GUNICORN_WORKERS=1):
+            caches["default"].clear()
+            self.client.get(self.detail_url)
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_evicted_version(self):
+        """
+        Should not serve the entries of a version evicted from the cache.
+        """
+        self.client.get(self.detail_url)
+        article_response_cache.backend.delete(article_response_cache.version_key)
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    def test_stats(self):
+        """
+        Should count hits and misses, only admins read them.
+        """
+        for _ in range(3):
+            self.client.get(self.detail_url)
+
+        admin = User.objects.create_superuser(
+            email="admin@example.com",
+            password="pass12345",
+            first_name="Admin",
+            last_name="Admin",
+        )
+        stats_url = reverse("articles-cache-stats")
+        self.assertIn(self.client.get(stats_url).status_code, (401, 403))
+
+        self.client.force_authenticate(user=admin)
+        stats = self.client.get(stats_url).json()
+
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+        self.assertGreater(stats["miss_ms"], 0)
+        self.assertGreaterEqual(stats["saved_ms"], 0)
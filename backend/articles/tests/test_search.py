@@ -0,0 +1,287 @@
+from io import StringIO
+from unittest import mock
+
+from articles.models import Article, ArticleSearchTerm
+from articles.search import MySQLSearchBackend, get_search_backend
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+class SearchBackendTestMixin:
+    """
+    Same tests for each backend, see the subclasses.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        self.other_user = User.objects.create_user(
+            email="jane@example.com",
+            password="pass12345",
+            first_name="Jane",
+            last_name="Smith",
+        )
+        self.in_title = Article.objects.create(
+            title="Django search tips",
+            description="How to write queries.",
+            user=self.user,
+        )
+        self.in_description = Article.objects.create(
+            title="Weekly notes",
+            description="Notes about Django and its search filters.",
+            user=self.other_user,
+        )
+        self.other = Article.objects.create(
+            title="Cooking pasta",
+            description="Water, salt and pasta.",
+            user=self.other_user,
+        )
+
+    def search(self, *terms):
+        results = get_search_backend().search(Article.objects.all(), terms)
+        return list(results.order_by("-search_rank", "id"))
+
+    def test_ranking(self):
+        """
+        Should rank the articles with the words in their title first.
+        """
+        self.assertEqual(
+            self.search("django", "search"), [self.in_title, self.in_description]
+        )
+
+    def test_every_word_prefix(self):
+        """
+        Should match every word of the search, as a prefix.
+        """
+        self.assertEqual(self.search("sear"), [self.in_title, self.in_description])
+        self.assertEqual(self.search("django pasta"), [])
+        self.assertEqual(self.search("PASTA"), [self.other])
+
+    def test_author(self):
+        """
+        Should find the articles of an author by email and name.
+        """
+        self.assertCountEqual(self.search("smith"), [self.in_description, self.other])
+        self.assertEqual(self.search("john@example.com"), [self.in_title])
+
+    def test_index_on_save(self):
+        """
+        Should index the updated articles and authors, forget the deleted ones.
+        """
+        self.in_title.title = "Flask tips"
+        self.in_title.save()
+        self.other.delete()
+        self.user.last_name = "Smith"
+        self.user.save()
+
+        self.assertEqual(self.search("flask"), [self.in_title])
+        self.assertEqual(self.search("pasta"), [])
+        self.assertCountEqual(
+            self.search("smith"), [self.in_title, self.in_description]
+        )
+
+    def test_rebuild(self):
+        """
+        Should index the articles created without signals.
+        """
+        bulk = Article.objects.bulk_create(
+            [Article(title="Bulk article", description="Imported.", user=self.user)]
+        )
+        self.assertEqual(self.search("imported"), [])
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(self.search("imported"), bulk)
+
+    def test_rebuild_if_empty(self):
+        """
+        Should only index the articles when the index is empty.
+        """
+        bulk = Article.objects.bulk_create(
+            [Article(title="Bulk article", description="Imported.", user=self.user)]
+        )
+        call_command("rebuild_search_index", "--if-empty", stdout=StringIO())
+        self.assertEqual(self.search("imported"), [])
+
+        Article.objects.exclude(id__in=[article.id for article in bulk]).delete()
+        self.assertTrue(get_search_backend().is_empty())
+
+        call_command("rebuild_search_index", "--if-empty", stdout=StringIO())
+        self.assertEqual(self.search("imported"), bulk)
+
+
+@override_settings(ARTICLE_SEARCH_BACKEND="articles.search.InvertedIndexSearchBackend")
+class InvertedIndexSearchBackendTest(SearchBackendTestMixin, TestCase):
+    def test_terms(self):
+        """
+        Should weight the words of the title more than the others.
+        """
+        weights = dict(
+            ArticleSearchTerm.objects.filter(article=self.in_title).values_list(
+                "term", "weight"
+            )
+        )
+
+        self.assertEqual(weights["django"], 3.0)
+        self.assertEqual(weights["queries"], 1.0)
+        self.assertEqual(weights["doe"], 1.0)
+
+    def test_prefix_filter(self):
+        """
+        Should match the prefixes with LIKE on PostgreSQL and MySQL, whose
+        range comparisons depend on the collation.
+        """
+        backend = get_search_backend()
+
+        with mock.patch.object(connection, "vendor", "postgresql"):
+            self.assertEqual(
+                backend.get_prefix_filter("tip"),
+                Q(search_terms__term__startswith="tip"),
+            )
+        with mock.patch.object(connection, "vendor", "mysql"):
+            self.assertEqual(
+                backend.get_prefix_filter("tip"),
+                Q(search_terms__term__istartswith="tip"),
+            )
+
+
+@override_settings(ARTICLE_SEARCH_BACKEND="articles.search.SQLiteSearchBackend")
+class SQLiteSearchBackendTest(SearchBackendTestMixin, TestCase):
+    def test_get_query(self):
+        self.assertEqual(
+            get_search_backend().get_query(["Django", "john@doe"]),
+            '"django"* "john"* "doe"*',
+        )
+
+
+class MySQLSearchBackendTest(TestCase):
+    @override_settings(ARTICLE_SEARCH_BACKEND="articles.search.MySQLSearchBackend")
+    @mock.patch.object(MySQLSearchBackend, "rebuild")
+    def test_rebuild_maintained_by_database(self, mock_rebuild):
+        """
+        Should not read the articles: MySQL maintains its FULLTEXT indexes.
+        """
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        mock_rebuild.assert_not_called()
+
+    def test_query(self):
+        """
+        Should match each word against the article and author FULLTEXT indexes,
+        each one in a subquery of its own table.
+        """
+        queryset = MySQLSearchBackend().search(Article.objects.all(), ["django", "tip"])
+
+        sql = str(queryset.query)
+        self.assertEqual(sql.count("MATCH"), 6)
+        self.assertIn(
+            'FROM "articles_article" U0 WHERE '
+            "(MATCH (title, description) AGAINST (tip* IN BOOLEAN MODE))",
+            sql,
+        )
+        self.assertIn(
+            "WHERE (MATCH (email, first_name, last_name) "
+            "AGAINST (tip* IN BOOLEAN MODE))",
+            sql,
+        )
+        self.assertIn("AGAINST (django* tip* IN BOOLEAN MODE)", sql)
+        self.assertNotIn("> 0", sql)
+
+    def test_query_not_indexed_words(self):
+        """
+        Should search the short words and stopwords with LIKE: MySQL does not
+        index them, MATCH would never find them.
+        """
+        queryset = MySQLSearchBackend().search(Article.objects.all(), ["re zero"])
+
+        sql = str(queryset.query)
+        self.assertEqual(sql.count("MATCH"), 4)
+        self.assertIn("AGAINST (zero* IN BOOLEAN MODE)", sql)
+        self.assertNotIn("re*", sql)
+        self.assertIn("LIKE %re%", sql)
+
+        queryset = MySQLSearchBackend().search(Article.objects.all(), ["of the"])
+
+        sql = str(queryset.query)
+        self.assertNotIn("MATCH", sql)
+        self.assertIn("LIKE %of%", sql)
+        self.assertIn("LIKE %the%", sql)
+        self.assertIn("search_rank", sql)
+
+    def test_not_indexed_words_results(self):
+        """
+        Should find the articles with every word, indexed or not.
+        """
+        user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        article = Article.objects.create(title="Re zero", user=user)
+        Article.objects.create(title="Zero to one", user=user)
+
+        backend = MySQLSearchBackend()
+        # MATCH is MySQL only: the indexed words are checked by test_query
+        with mock.patch.object(backend, "is_indexed", return_value=False):
+            queryset = backend.search(Article.objects.all(), ["re", "zero"])
+            self.assertEqual(list(queryset), [article])
+
+
+class ArticleSearchFilterTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse("articles-list")
+
+        self.in_description = Article.objects.create(
+            title="Another article",
+            description="About the django framework.",
+            user=self.user,
+        )
+        self.in_title = Article.objects.create(
+            title="Django framework",
+            description="An article.",
+            user=self.user,
+        )
+
+    def get_ids(self, params):
+        response = self.client.get(self.list_url, params)
+        self.assertEqual(response.status_code, 200)
+        return [article["id"] for article in response.json()["results"]]
+
+    def test_search_by_rank(self):
+        """
+        Should sort the results by rank, unless an ordering is requested.
+        """
+        self.assertEqual(
+            self.get_ids({"search": "django"}),
+            [self.in_title.id, self.in_description.id],
+        )
+        self.assertEqual(
+            self.get_ids({"search": "django", "ordering": "title"}),
+            [self.in_description.id, self.in_title.id],
+        )
+
+    def test_search_without_words(self):
+        """
+        Should ignore a search without any word.
+        """
+        self.assertEqual(len(self.get_ids({"search": "@ -"})), 2)
@@ -1,6 +1,12 @@
+from datetime import timedelta
+from unittest import mock
+
 from articles.models import Article
+from articles.serializers import ArticleSerializer
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient, APITestCase
 
@@ -99,6 +105,59 @@ class ArticleViewTests(APITestCase):
         self.assertIn("count", data)
         self.assertTrue(len(data["results"]) >= 1)
 
+    def get_keyset_pages(self, params):
+        """
+        Follow the 'next' links from the first page, returns the ids of each
+        page and the SQL queries run.
+        """
+        pages = []
+        url = self.list_url
+        with CaptureQueriesContext(connection) as context:
+            while url:
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                pages.append([article["id"] for article in response.json()["results"]])
+                url, params = response.json()["next"], None
+
+        return pages, [query["sql"] for query in context.captured_queries]
+
+    def test_list_articles_with_keyset_pagination_success(self):
+        """
+        Should return every article once, by (title, id), without COUNT nor OFFSET.
+        """
+        for _ in range(3):
+            Article.objects.create(title="Same title", user=self.user)
+        expected = list(
+            Article.objects.order_by("title", "id").values_list("id", flat=True)
+        )
+
+        pages, queries = self.get_keyset_pages({"cursor": "", "page_size": 2})
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(len(queries), 3)
+        self.assertFalse(any("COUNT" in sql or "OFFSET" in sql for sql in queries))
+
+    def test_list_articles_with_keyset_pagination_ordering_success(self):
+        """
+        Should page by (created_at, id) in descending order.
+        """
+        expected = [self.article2.id, self.article1.id]
+
+        pages, _ = self.get_keyset_pages(
+            {"cursor": "", "page_size": 1, "ordering": "-created_at"}
+        )
+
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_list_articles_with_keyset_pagination_invalid_cursor_failure(self):
+        """
+        Should reject tampered cursors.
+        """
+        response = self.client.get(self.list_url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 404)
+
     def test_retrieve_article_success(self):
         """
         Should return the details of a specific article.
@@ -109,6 +168,110 @@ class ArticleViewTests(APITestCase):
         self.assertEqual(response.json()["title"], self.article1.title)
         self.assertEqual(response.json()["user"], self.user.id)
 
+    ############ CONDITIONAL GET ############
+    def test_retrieve_article_not_modified_success(self):
+        """
+        Should answer 304 without serializing while the article is unchanged.
+        """
+        response = self.client.get(self.detail_url(self.article1.pk))
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        with mock.patch.object(
+            ArticleSerializer, "to_representation"
+        ) as mock_serialize:
+            response = self.client.get(
+                self.detail_url(self.article1.pk), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        mock_serialize.assert_not_called()
+
+        self.article1.title = "Updated title"
+        self.article1.save()
+        response = self.client.get(
+            self.detail_url(self.article1.pk), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_articles_not_modified_success(self):
+        """
+        Should answer 304 until an article of the list is saved or deleted.
+        """
+        response = self.client.get(self.list_url)
+        etag = response["ETag"]
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        # Other filters, ordering or page: other representation
+        response = self.client.get(
+            self.list_url, {"ordering": "-title"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.article2.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
+
+        etag = response["ETag"]
+        self.article1.description = "Updated description."
+        self.article1.save()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_articles_keyset_not_modified_success(self):
+        """
+        Should validate keyset pages by their rows, without COUNT.
+        """
+        params = {"cursor": "", "page_size": 1}
+        etag = self.client.get(self.list_url, params)["ETag"]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.list_url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(
+            any("COUNT" in query["sql"] for query in context.captured_queries)
+        )
+
+        # Not on the first page
+        self.article2.save()
+        response = self.client.get(self.list_url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.article1.save()
+        response = self.client.get(self.list_url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_articles_if_modified_since_success(self):
+        """
+        Should answer 304 to a Last-Modified date still current.
+        """
+        last_modified = self.client.get(self.list_url)["Last-Modified"]
+
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        Article.objects.filter(pk=self.article1.pk).update(
+            updated_at=self.article1.updated_at + timedelta(seconds=1)
+        )
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_articles_empty_etag_success(self):
+        """
+        Should send an ETag without Last-Modified for an empty list.
+        """
+        response = self.client.get(self.list_url, {"title": "Unknown"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
     ############ SEARCH & ORDERING ############
     def test_search_article_by_title_success(self):
         """
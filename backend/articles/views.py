@@ -1,38 +1,60 @@
 import logging
 
+from backend.conditional import ConditionalGetMixin
+from backend.pagination import KeysetPaginationMixin
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
+from .cache import AnonymousResponseCacheMixin, article_response_cache
 from .models import Article
 from .permissions import IsOwnerOrAdminOrReadOnly
+from .search import ArticleSearchFilter
 from .serializers import ArticleSerializer
 
 logger = logging.getLogger("articles")
 
 
-class ArticleViewSet(viewsets.ModelViewSet):
+class ArticleViewSet(
+    AnonymousResponseCacheMixin,
+    ConditionalGetMixin,
+    KeysetPaginationMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet for managing articles via API.
     list : paginated list of articles / retrieve : article details / create : registration / update : modification / partial_update : partial modification / destroy : deletion.
+    With a 'cursor' query parameter, list is paginated on (title, id) or (created_at, id) instead (see backend/pagination.py).
+    list and retrieve send ETag and Last-Modified, and answer conditional GETs with 304 (see backend/conditional.py).
+    Anonymous list and retrieve are served from a response cache, invalidated on each article save or delete (see cache.py).
     """
 
     queryset = Article.objects.all()
     serializer_class = ArticleSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # Search after ordering: results are sorted by rank without ?ordering
+    filter_backends = [DjangoFilterBackend, OrderingFilter, ArticleSearchFilter]
 
     filterset_fields = ["title", "user"]
-    search_fields = [
-        "title",
-        "description",
-        "user__email",
-        "user__first_name",
-        "user__last_name",
-    ]
-    ordering_fields = ["title", "user"]
+    # ?search= looks for the title, description and author (email and name)
+    # in the index of the search backend, see search.py
+    ordering_fields = ["title", "user", "created_at"]
     ordering = ["title"]
+    keyset_ordering_fields = ["title", "created_at"]
+    keyset_ordering = "title"
 
     permission_classes = [IsOwnerOrAdminOrReadOnly]
+    response_cache = article_response_cache
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """
+        GET /api/articles/cache_stats/
+        Returns the hit ratio and latency of the response cache of this worker
+        """
+        return Response(article_response_cache.stats())
 
     def perform_create(self, serializer):
         """
@@ -0,0 +1,102 @@
+import hashlib
+
+from backend.pagination import KeysetPagination
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin answering the conditional GETs of list and retrieve
+    (If-None-Match, If-Modified-Since) with 304 Not Modified, before the
+    rows are read and serialized.
+
+    Validators come from 'conditional_field', a datetime of the model updated
+    on each save (auto_now):
+        - retrieve: id and conditional field of the object
+        - list: COUNT and MAX of the conditional field of the filtered
+          queryset, a deletion lowers the count and a save raises the max
+        - keyset pages (see pagination.py), read without COUNT: ids and
+          conditional fields of the rows of the page
+    The ETag hashes them with the URL (filters, ordering, page) and the media
+    type, so it is strong. Last-Modified has a one second precision and does
+    not change on deletions: clients should send If-None-Match, browsers do.
+    Rows changed without save() (queryset.update(), raw SQL) must set the
+    conditional field themselves.
+    """
+
+    conditional_field = "updated_at"
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if isinstance(self.paginator, KeysetPagination):
+            # Pages read without COUNT: validated by their own rows instead
+            page = self.paginate_queryset(queryset)
+            values = [getattr(item, self.conditional_field) for item in page]
+            return self.get_conditional_response(
+                request,
+                lambda: self.get_paginated_response(
+                    self.get_serializer(page, many=True).data
+                ),
+                max(values, default=None),
+                [item.pk for item in page],
+                values,
+                self.paginator.has_next,
+            )
+
+        fingerprint = queryset.aggregate(
+            count=Count("pk"), last_modified=Max(self.conditional_field)
+        )
+
+        def get_response():
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+
+        return self.get_conditional_response(
+            request, get_response, fingerprint["last_modified"], fingerprint["count"]
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+
+        def get_response():
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data)
+
+        return self.get_conditional_response(
+            request,
+            get_response,
+            getattr(instance, self.conditional_field),
+            instance.pk,
+        )
+
+    def get_conditional_response(self, request, get_response, last_modified, *state):
+        """
+        304 Not Modified when the client already has the representation of
+        'state' and 'last_modified', otherwise the response of get_response().
+        Both carry the ETag and Last-Modified validators.
+        """
+        key = [request.get_full_path(), request.accepted_media_type, *state]
+        key.append(last_modified.isoformat() if last_modified else None)
+        etag = f'"{hashlib.sha256(repr(key).encode()).hexdigest()}"'
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = get_response()
+
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+            # Revalidated on each use, never served from a heuristic freshness
+            patch_cache_control(response, no_cache=True)
+        return response
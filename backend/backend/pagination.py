@@ -0,0 +1,151 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination on (ordering field, id): each page is read with
+    'WHERE (field, id) > (last field, last id) ORDER BY field, id LIMIT n',
+    without COUNT nor OFFSET, so with an index on (field, id) deep pages cost
+    the same as the first one.
+
+    The ordering field is the 'ordering' query parameter when it is one of the
+    'keyset_ordering_fields' of the view (prefixed with '-' for a descending
+    order), otherwise the view's 'keyset_ordering'.
+    Cursors are opaque: clients only follow the 'next' link.
+    """
+
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_ordering(request, view)
+
+        prefix = "-" if self.descending else ""
+        queryset = queryset.order_by(f"{prefix}{self.field}", f"{prefix}id")
+
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(*position))
+
+        # One more row tells if there is a next page
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        return self.page
+
+    def get_page_size(self, request):
+        """
+        'page_size' query parameter, up to max_page_size, or PAGE_SIZE.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, request, view):
+        """
+        Returns (field, descending).
+        """
+        ordering = request.query_params.get(self.ordering_query_param, "").strip()
+        if ordering.lstrip("-") not in getattr(view, "keyset_ordering_fields", []):
+            ordering = getattr(view, "keyset_ordering", "id")
+        return ordering.lstrip("-"), ordering.startswith("-")
+
+    def get_keyset_filter(self, value, id):
+        lookup = "lt" if self.descending else "gt"
+        return Q(**{f"{self.field}__{lookup}": value}) | Q(
+            **{self.field: value, f"id__{lookup}": id}
+        )
+
+    def encode_cursor(self, instance):
+        """
+        URL safe base64 of the ordering field, id and ordering of 'instance'.
+        """
+        value = getattr(instance, self.field)
+        position = [
+            self.field,
+            self.descending,
+            value.isoformat() if hasattr(value, "isoformat") else value,
+            instance.id,
+        ]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        """
+        Returns (value, id) of the last row of the previous page, or None for
+        the first page. Raises NotFound for a tampered cursor, or a cursor of
+        another ordering.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+
+        try:
+            field, descending, value, id = json.loads(base64.urlsafe_b64decode(cursor))
+            if (field, descending) != (self.field, self.descending):
+                raise ValueError(field)
+            value = model._meta.get_field(field).to_python(value)
+            return value, int(id)
+        except (binascii.Error, TypeError, ValueError, ValidationError) as error:
+            raise NotFound(self.invalid_cursor_message) from error
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("results", data)])
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class KeysetPaginationMixin:
+    """
+    ViewSet mixin serving KeysetPagination to clients sending a 'cursor' query
+    parameter (empty for the first page), and the default page number
+    pagination, with its total count, to the others.
+    """
+
+    keyset_ordering_fields = []
+    keyset_ordering = "id"
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if KeysetPagination.cursor_query_param in self.request.query_params:
+                self._paginator = KeysetPagination()
+            else:
+                return super().paginator
+        return self._paginator
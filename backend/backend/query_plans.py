@@ -0,0 +1,143 @@
+import re
+
+from articles.models import Article
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+class QueryPlanError(Exception):
+    pass
+
+
+def get_checked_requests(user):
+    """
+    List and filter requests of the viewsets: (url, query parameters).
+    """
+    articles_url = reverse("articles-list")
+    users_url = reverse("users-list")
+    return [
+        (articles_url, {}),
+        (articles_url, {"title": "Query plans"}),
+        (articles_url, {"user": user.id}),
+        (articles_url, {"ordering": "-created_at"}),
+        (articles_url, {"ordering": "user"}),
+        (articles_url, {"search": "query plans"}),
+        (articles_url, {"cursor": "", "page_size": 2}),
+        (articles_url, {"cursor": "", "page_size": 2, "ordering": "created_at"}),
+        (users_url, {}),
+        (users_url, {"cursor": "", "page_size": 2}),
+        (reverse("satisfactions_stats"), {"start": "2025-01-01", "end": "2025-12-31"}),
+        (reverse("satisfactions_stats"), {"period": "week", "group_by": "language"}),
+    ]
+
+
+def explain(sql):
+    """
+    Plan of 'sql' on the default database: rows of EXPLAIN QUERY PLAN on SQLite,
+    of EXPLAIN on MySQL (as dicts) and PostgreSQL (as text).
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [
+                {"id": id, "parent": parent, "detail": detail}
+                for id, parent, _, detail in cursor.fetchall()
+            ]
+        if connection.vendor in ("mysql", "postgresql"):
+            cursor.execute(f"EXPLAIN {sql}")
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    raise QueryPlanError(f"EXPLAIN is not supported on {connection.vendor}.")
+
+
+def get_full_scans(sql, plan):
+    """
+    Tables read entirely by the query of 'plan'.
+    SQLite reads a table in the order of its primary key without using an
+    index: such a scan is only accepted for the outer query when it stops at
+    the LIMIT, without sorting the rows first nor filtering them (no WHERE),
+    e.g. the last rows by id. A filter on a column without index is a full
+    scan even with a LIMIT: it reads every row when few or none match.
+    """
+    if connection.vendor == "sqlite":
+        stops_early = (
+            " LIMIT " in sql
+            and " WHERE " not in sql
+            and not any("USE TEMP B-TREE FOR ORDER BY" in row["detail"] for row in plan)
+        )
+        return [
+            match.group(1)
+            for row in plan
+            if (match := re.fullmatch(r"SCAN (\w+)", row["detail"]))
+            and not (stops_early and row["parent"] == 0)
+        ]
+
+    if connection.vendor == "mysql":
+        return [
+            row["table"]
+            for row in plan
+            if row["type"] == "ALL" and not row["table"].startswith("<")
+        ]
+
+    return [
+        match.group(1)
+        for row in plan
+        for match in re.finditer(r"Seq Scan on (\w+)", row["QUERY PLAN"])
+    ]
+
+
+def check_query_plans():
+    """
+    Replay the requests of get_checked_requests, following their 'next' page,
+    and explain every SELECT they run. Sample rows are created then rolled back.
+    Returns a list of {"request", "sql", "plan", "full_scans"}.
+    """
+    results = []
+
+    with transaction.atomic(), override_settings(ALLOWED_HOSTS=["testserver"]):
+        user = User.objects.create_superuser(
+            email="query-plans@example.com",
+            password="!",
+            first_name="Query",
+            last_name="Plans",
+        )
+        # More than PAGE_SIZE, to explain the next page too
+        for index in range(6):
+            Article.objects.create(title=f"Query plans {index}", user=user)
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        for url, params in get_checked_requests(user):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, params)
+                if response.status_code != 200:
+                    raise QueryPlanError(f"GET {url} {params}: {response.status_code}")
+                next_url = response.json().get("next")
+                if next_url:
+                    client.get(next_url)
+
+            for query in context.captured_queries:
+                sql = query["sql"]
+                if not sql.startswith("SELECT"):
+                    continue
+                plan = explain(sql)
+                results.append(
+                    {
+                        "request": f"GET {url} {params}",
+                        "sql": sql,
+                        "plan": plan,
+                        "full_scans": get_full_scans(sql, plan),
+                    }
+                )
+
+        # Sample rows are not kept
+        transaction.set_rollback(True)
+
+    return results
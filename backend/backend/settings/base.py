@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -120,6 +121,67 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Dotted path of the backend serving GET /api/articles/?search=, by default
+# the full-text index of the database (see articles/search.py)
+ARTICLE_SEARCH_BACKEND = os.getenv("ARTICLE_SEARCH_BACKEND")
+
+# 'default' is local memory, per worker. 'responses' is shared by all the
+# workers through the database ('manage.py createcachetable')
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "articles_response_cache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+# Number of processes serving the API, same default as gunicorn.conf.py
+GUNICORN_WORKERS = int(os.getenv("GUNICORN_WORKERS", "2"))
+
+# Responses of GET /api/articles/ for anonymous users (see articles/cache.py):
+# alias of a cache of CACHES shared by all workers (a local memory one is
+# ignored with several GUNICORN_WORKERS), and lifetime of the entries in
+# seconds (0 disables the cache). Hits of the database cache still run two
+# small queries of its table, not those of the articles
+ARTICLE_RESPONSE_CACHE_BACKEND = os.getenv(
+    "ARTICLE_RESPONSE_CACHE_BACKEND", "responses"
+)
+ARTICLE_RESPONSE_CACHE_TIMEOUT = int(os.getenv("ARTICLE_RESPONSE_CACHE_TIMEOUT", "60"))
+
+# Maximum number of comments accepted by POST /api/satisfactions/bulk/
+SATISFACTION_BULK_MAX_ITEMS = 100
+
+# Save satisfactions as pending and let 'manage.py score_satisfactions' predict
+# their polarity in the background instead of during the request
+SATISFACTION_ASYNC_SCORING = os.getenv("SATISFACTION_ASYNC_SCORING") == "true"
+
+# Seconds before a pending satisfaction is claimed again by the scoring
+# workers, e.g. once its model is there or after a failed batch
+SATISFACTION_RETRY_DELAY = int(os.getenv("SATISFACTION_RETRY_DELAY", "300"))
+
+# Seconds after which a satisfaction still processing is considered lost by
+# its worker, and put back in the queue: longer than any scoring batch
+SATISFACTION_CLAIM_TIMEOUT = int(os.getenv("SATISFACTION_CLAIM_TIMEOUT", "600"))
+
+# Predictions of repeated comments, by model version and normalized text:
+# number kept by each worker (0 disables the cache), and optionally the alias
+# of a cache of CACHES shared by all workers, with the lifetime of its entries
+SATISFACTION_PREDICTION_CACHE_SIZE = int(
+    os.getenv("SATISFACTION_PREDICTION_CACHE_SIZE", "10000")
+)
+SATISFACTION_PREDICTION_CACHE_BACKEND = os.getenv(
+    "SATISFACTION_PREDICTION_CACHE_BACKEND"
+)
+SATISFACTION_PREDICTION_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Polarities predicted with a lower probability are saved as 'uncertain'
+SATISFACTION_UNCERTAINTY_THRESHOLD = float(
+    os.getenv("SATISFACTION_UNCERTAINTY_THRESHOLD", "0.6")
+)
+
 # Override the default user model by using our model
 AUTH_USER_MODEL = "users.EmailUser"
 
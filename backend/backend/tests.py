@@ -1,9 +1,18 @@
 import importlib
+import importlib.util
 import unittest
+from io import StringIO
 from unittest import mock
 
+from articles.models import Article
+from backend.pagination import KeysetPagination
+from backend.query_plans import check_query_plans, explain, get_full_scans
 from django.conf import settings
-from django.test import SimpleTestCase
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
 
 class SettingsCITest(unittest.TestCase):
@@ -27,3 +36,124 @@ class SettingsCoverageTest(SimpleTestCase):
         assert settings.CORS_ALLOW_ALL_ORIGINS is True # TEST to mock for prod ?
         assert settings.AUTH_USER_MODEL == "users.EmailUser"
         assert settings.AUTHENTICATION_BACKENDS == ["users.backend.EmailBackend"]
+
+
+class GunicornConfigTest(unittest.TestCase):
+    @mock.patch("gc.freeze")
+    @mock.patch("satisfactions.language.language_identifier.load")
+    @mock.patch("satisfactions.registry.registry.warm_up", return_value=["fr", "en"])
+    def test_models_loaded_before_fork(self, mock_warm_up, mock_load, mock_freeze):
+        spec = importlib.util.spec_from_file_location(
+            "gunicorn_conf", settings.BASE_DIR.parent / "gunicorn.conf.py"
+        )
+        gunicorn_conf = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(gunicorn_conf)
+
+        self.assertTrue(gunicorn_conf.preload_app)
+
+        gunicorn_conf.when_ready(mock.Mock())
+
+        mock_warm_up.assert_called_once()
+        mock_load.assert_called_once()
+        mock_freeze.assert_called_once()
+
+
+class KeysetPaginationTest(SimpleTestCase):
+    def get_request(self, params):
+        return Request(APIRequestFactory().get("/api/articles/", params))
+
+    def test_page_size(self):
+        """
+        Should bound the page size asked by the client.
+        """
+        paginator = KeysetPagination()
+
+        self.assertEqual(paginator.get_page_size(self.get_request({})), 5)
+        self.assertEqual(
+            paginator.get_page_size(self.get_request({"page_size": 1000})), 100
+        )
+
+    def test_cursor_of_another_ordering_failure(self):
+        """
+        Should reject a cursor built for another ordering.
+        """
+        paginator = KeysetPagination()
+        paginator.field, paginator.descending = "title", False
+        cursor = paginator.encode_cursor(Article(id=3, title="Same title"))
+
+        paginator.field = "created_at"
+        with self.assertRaises(NotFound):
+            paginator.decode_cursor(self.get_request({"cursor": cursor}), Article)
+
+        paginator.field = "title"
+        self.assertEqual(
+            paginator.decode_cursor(self.get_request({"cursor": cursor}), Article),
+            ("Same title", 3),
+        )
+
+
+class QueryPlansTest(TestCase):
+    def test_no_full_scan(self):
+        """
+        Should serve every checked request with indexes.
+        """
+        results = check_query_plans()
+
+        self.assertTrue(results)
+        self.assertEqual(
+            [
+                (result["request"], result["sql"])
+                for result in results
+                if result["full_scans"]
+            ],
+            [],
+        )
+        self.assertFalse(Article.objects.exists())
+
+    def test_full_scan_detected(self):
+        """
+        Should flag a filter on a column without index, and a sort of every row.
+        """
+        for sql in [
+            "SELECT id FROM articles_article WHERE description = 'x'",
+            "SELECT id FROM articles_article ORDER BY description LIMIT 5",
+        ]:
+            self.assertEqual(get_full_scans(sql, explain(sql)), ["articles_article"])
+
+        sql = "SELECT id FROM articles_article WHERE user_id = 1"
+        self.assertEqual(get_full_scans(sql, explain(sql)), [])
+
+    def test_full_scan_with_limit(self):
+        """
+        Should flag a filter without index even when a LIMIT stops the scan,
+        but not the first rows in primary key order.
+        """
+        sql = (
+            "SELECT id FROM articles_article WHERE description = 'x' "
+            "ORDER BY id LIMIT 20"
+        )
+        self.assertEqual(get_full_scans(sql, explain(sql)), ["articles_article"])
+
+        sql = "SELECT id FROM articles_article ORDER BY id DESC LIMIT 20"
+        self.assertEqual(get_full_scans(sql, explain(sql)), [])
+
+    def test_command(self):
+        with mock.patch("builtins.print") as mock_print:
+            call_command("check_query_plans", stdout=StringIO())
+
+        self.assertIn("no full scan", str(mock_print.call_args_list[-1]))
+
+    @mock.patch("builtins.print")
+    @mock.patch("articles.management.commands.check_query_plans.check_query_plans")
+    def test_command_full_scan_failure(self, mock_check, mock_print):
+        mock_check.return_value = [
+            {
+                "request": "GET /api/articles/ {}",
+                "sql": "SELECT id FROM articles_article",
+                "plan": [{"id": 2, "parent": 0, "detail": "SCAN articles_article"}],
+                "full_scans": ["articles_article"],
+            }
+        ]
+
+        with self.assertRaisesMessage(CommandError, "1 of 1 queries scan a table."):
+            call_command("check_query_plans")
@@ -14,6 +14,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+
 from django.contrib import admin
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
@@ -21,7 +22,11 @@ from rest_framework_simplejwt.views import TokenRefreshView
 
 from articles.views import ArticleViewSet
 from backend.views import MyTokenObtainPairView
-from satisfactions.views import SatisfactionView
+from satisfactions.views import (
+    SatisfactionBulkView,
+    SatisfactionStatsView,
+    SatisfactionView,
+)
 from users.views import UserViewSet
 
 
@@ -34,6 +39,16 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include(router.urls)),
     path("api/satisfactions/", SatisfactionView.as_view(), name="satisfactions_create"),
+    path(
+        "api/satisfactions/bulk/",
+        SatisfactionBulkView.as_view(),
+        name="satisfactions_bulk_create",
+    ),
+    path(
+        "api/satisfactions/stats/",
+        SatisfactionStatsView.as_view(),
+        name="satisfactions_stats",
+    ),
     # Auth JWT
     path("api/auth/token/", MyTokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
@@ -0,0 +1,33 @@
+"""
+Gunicorn configuration, loaded automatically by 'gunicorn' from this folder.
+
+The Django application is imported in the master process ('preload_app') and
+the sentiment models and language profiles are loaded there too, before
+workers are forked.
+Workers share the vectorizer vocabulary and the NB arrays through copy-on-write
+instead of each one unpickling its own copy on its first satisfaction request.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = True
+
+
+def when_ready(server):
+    """
+    Called in the master, after the application is loaded and before forking.
+    """
+    from satisfactions.language import language_identifier
+    from satisfactions.registry import registry
+
+    language_identifier.load()
+    loaded = registry.warm_up()
+    server.log.info(f"Sentiment models loaded before fork: {loaded}")
+
+    # Move every object loaded so far out of the garbage collector's reach,
+    # otherwise its passes touch them and copy the shared pages in each worker.
+    gc.freeze()
@@ -16,27 +16,35 @@ python manage.py makemigrations
 # Apply migrations
 python manage.py migrate
 
+# Table of the 'responses' cache shared by the workers
+python manage.py createcachetable
+
 # Load fixtures
 python manage.py loaddata users/fixtures/users_fixtures.json || true
 python manage.py loaddata articles/fixtures/articles_fixtures.json || true
 
+# Fixtures skip the signals maintaining the search index: indexed once, when
+# they create the articles on the first start
+python manage.py rebuild_search_index --if-empty
+
 # Checking if dataframes are missing
 missing_dataframes=()
 
-# English file
-if ! find . -name "dataframe_en.csv" | grep -q .; then
-    missing_files+=("dataframe_en.csv")
+# English dataset
+if ! find . -path "*dataset_en/labels.npy" | grep -q .; then
+    missing_files+=("dataset_en")
 fi
 
-# French file
-if ! find . -name "dataframe_fr.csv" | grep -q .; then
-    missing_files+=("dataframe_en.csv")
+# French dataset
+if ! find . -path "*dataset_fr/labels.npy" | grep -q .; then
+    missing_files+=("dataset_fr")
 fi
 
+# Converts dataframe_*.csv when present, otherwise builds them from the sources
 if [ ${#missing_files[@]} -eq 0 ]; then
-    echo "All dataframes are present!"
+    echo "All datasets are present!"
 else
-    echo "Missing dataframes: ${missing_files[*]} , generating them, can take a long time..."
+    echo "Missing datasets: ${missing_files[*]} , generating them, can take a long time..."
     python -u manage.py create_dataframes
 fi
 
@@ -44,12 +52,12 @@ fi
 models_dataframes=()
 
 # English file
-if ! find . -name "model_ia_en.pkl" | grep -q .; then
+if ! find . \( -name "model_ia_en.pkl" -o -path "*/models/en/ACTIVE" \) | grep -q .; then
     models_dataframes+=("model_ia_en.kl")
 fi
 
 # French file
-if ! find . -name "model_ia_fr.pkl" | grep -q .; then
+if ! find . \( -name "model_ia_fr.pkl" -o -path "*/models/fr/ACTIVE" \) | grep -q .; then
     models_dataframes+=("model_ia_fr.pkl")
 fi
 
@@ -60,6 +68,9 @@ else
     python -u manage.py create_models
 fi
 
+# Compact, memory-mapped copy of the models used by the API
+python manage.py export_models
+
 
 # Start server
 python manage.py runserver 0.0.0.0:8000
@@ -2,4 +2,29 @@ from django.contrib import admin
 
 from .models import Satisfaction
 
-admin.site.register(Satisfaction)
+
+@admin.register(Satisfaction)
+class SatisfactionAdmin(admin.ModelAdmin):
+    # Default ordering
+    ordering = ("-created_at",)
+
+    # Columns displayed
+    list_display = (
+        "id",
+        "description",
+        "language",
+        "polarity",
+        "confidence",
+        "corrected_polarity",
+        "status",
+        "created_at",
+    )
+
+    # Wrong predictions are corrected from the list, used by 'retrain_models'
+    list_editable = ("corrected_polarity",)
+
+    # Fields to search by
+    search_fields = ("description", "email")
+
+    # Filters show on the right sidebar
+    list_filter = ("language", "polarity", "corrected_polarity", "status")
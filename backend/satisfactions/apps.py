@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SatisfactionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "satisfactions"
+
+    def ready(self):
+        # Stats updated when satisfactions are corrected or deleted
+        from . import signals  # noqa: F401
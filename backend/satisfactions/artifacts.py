@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import joblib
+import sklearn
+
+from .compact import export_pipeline
+
+ACTIVE_FILE = "ACTIVE"
+MANIFEST_FILE = "manifest.json"
+MODEL_FILE = "model.pkl"
+EXPORT_FOLDER = "export"
+
+
+class ArtifactError(Exception):
+    """
+    Raised when a model version is missing or does not match its manifest.
+    """
+
+
+def get_checksum(path):
+    """
+    SHA-256 of the file 'path', read by blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_checksums(path):
+    """
+    SHA-256 of every file of the folder 'path' but the manifest,
+    by path relative to the folder. Published folders are read through their
+    link (see compact.replace_directory), hidden ones are skipped.
+    """
+    checksums = {}
+    for root, folders, files in os.walk(path, followlinks=True):
+        folders[:] = [folder for folder in folders if not folder.startswith(".")]
+        for file in files:
+            file_path = os.path.join(root, file)
+            name = os.path.relpath(file_path, path)
+            if name != MANIFEST_FILE:
+                checksums[name] = get_checksum(file_path)
+    return dict(sorted(checksums.items()))
+
+
+def write_json_atomic(path, data):
+    """
+    Write 'data' as JSON in a temporary file renamed to 'path':
+    a reader sees the old or the new content, never a partial one.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=".json-"
+    )
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(data, file, indent=2, default=str)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class ArtifactStore:
+    """
+    Versioned models of each language, in 'data_path'/models/<lang>/:
+        - <version>/model.pkl: the pipeline
+        - <version>/export/: its compact export, when it can be exported
+        - <version>/manifest.json: version, training parameters, metrics
+          and checksum of each file
+        - ACTIVE: {"version", "previous"}, the version served by the API
+
+    A version is written in a temporary folder renamed when complete and is
+    never modified afterwards. Activating a version (or rolling back) only
+    replaces ACTIVE, atomically: registries load the new version on their
+    next call.
+    """
+
+    def __init__(self, data_path):
+        self.data_path = data_path
+
+    def get_lang_path(self, lang):
+        return os.path.join(self.data_path, "models", lang)
+
+    def get_version_path(self, lang, version):
+        return os.path.join(self.get_lang_path(lang), version)
+
+    def get_active(self, lang):
+        """
+        Returns the content of the ACTIVE pointer of 'lang', None if there
+        is no active version.
+        """
+        try:
+            with open(os.path.join(self.get_lang_path(lang), ACTIVE_FILE)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def get_active_version(self, lang):
+        active = self.get_active(lang)
+        return active["version"] if active else None
+
+    def get_manifest(self, lang, version):
+        """
+        Raises ArtifactError if the version does not exist.
+        """
+        path = os.path.join(self.get_version_path(lang, version), MANIFEST_FILE)
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            raise ArtifactError(f"No version '{version}' for language '{lang}'.")
+
+    def list_versions(self, lang):
+        """
+        Versions of 'lang', oldest first.
+        """
+        try:
+            names = os.listdir(self.get_lang_path(lang))
+        except FileNotFoundError:
+            return []
+        return sorted(
+            name
+            for name in names
+            if os.path.isfile(
+                os.path.join(self.get_version_path(lang, name), MANIFEST_FILE)
+            )
+        )
+
+    def publish(self, pipeline, lang, params=None, metrics=None, activate=True):
+        """
+        Save 'pipeline' as a new version of 'lang', activated unless
+        'activate' is False.
+        Returns the manifest of the new version.
+        """
+        lang_path = self.get_lang_path(lang)
+        os.makedirs(lang_path, exist_ok=True)
+
+        created_at = datetime.now(timezone.utc)
+        # Sorted like the creation dates
+        version = created_at.strftime("%Y%m%dT%H%M%S%fZ")
+
+        tmp_path = tempfile.mkdtemp(dir=lang_path, prefix=".version-")
+        try:
+            joblib.dump(pipeline, os.path.join(tmp_path, MODEL_FILE))
+            try:
+                export_pipeline(pipeline, os.path.join(tmp_path, EXPORT_FOLDER))
+                model_format = "export"
+            except ValueError:
+                model_format = "pickle"
+
+            manifest = {
+                "version": version,
+                "lang": lang,
+                "created_at": created_at.isoformat(),
+                "format": model_format,
+                "sklearn_version": sklearn.__version__,
+                "params": params or {},
+                "metrics": metrics or {},
+                "checksums": get_checksums(tmp_path),
+            }
+            write_json_atomic(os.path.join(tmp_path, MANIFEST_FILE), manifest)
+            os.rename(tmp_path, self.get_version_path(lang, version))
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(lang, version)
+
+        return manifest
+
+    def verify(self, lang, version):
+        """
+        Raises ArtifactError if the files of the version do not match
+        the checksums of its manifest.
+        """
+        manifest = self.get_manifest(lang, version)
+        if get_checksums(self.get_version_path(lang, version)) != manifest["checksums"]:
+            raise ArtifactError(
+                f"Files of version '{version}' ({lang}) do not match its manifest."
+            )
+
+    def activate(self, lang, version):
+        """
+        Serve 'version' for 'lang', after checking its files.
+        The version served before becomes the one of rollback().
+        """
+        self.verify(lang, version)
+
+        current = self.get_active_version(lang)
+        if current == version:
+            return
+
+        write_json_atomic(
+            os.path.join(self.get_lang_path(lang), ACTIVE_FILE),
+            {"version": version, "previous": current},
+        )
+
+    def rollback(self, lang):
+        """
+        Serve again the version active before the current one.
+        Returns that version. Raises ArtifactError if there is none.
+        """
+        active = self.get_active(lang)
+        if not active or not active["previous"]:
+            raise ArtifactError(f"No previous version to roll back to for '{lang}'.")
+
+        self.activate(lang, active["previous"])
+        return active["previous"]
@@ -0,0 +1,139 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def normalize_text(text):
+    """
+    Lowercase 'text' and collapse its whitespaces: texts differing only
+    by case or spacing share their cached prediction.
+    """
+    return " ".join(text.lower().split())
+
+
+def get_text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """
+    Cache of (language, polarity, confidence) by model version and normalized
+    text hash.
+
+    Each process keeps the most recently used predictions, up to
+    SATISFACTION_PREDICTION_CACHE_SIZE (0 disables the cache). With
+    SATISFACTION_PREDICTION_CACHE_BACKEND, the name of a Django cache shared
+    by every worker (e.g. redis), predictions missing in the process are
+    looked up there too.
+    The model version is part of the key: once another model is served,
+    predictions of the previous one are never returned again.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self):
+        return settings.SATISFACTION_PREDICTION_CACHE_SIZE
+
+    @property
+    def backend(self):
+        alias = settings.SATISFACTION_PREDICTION_CACHE_BACKEND
+        return caches[alias] if alias else None
+
+    def get_backend_key(self, key):
+        version, text_hash = key
+        # 'predictions' holds (language, polarity, confidence) tuples
+        return f"satisfactions:predictions:{get_text_hash(version)[:16]}:{text_hash}"
+
+    def get_many(self, version, texts):
+        """
+        Returns {text: (language, polarity, confidence)} of the cached
+        normalized 'texts'.
+        """
+        if not self.max_size:
+            return {}
+
+        keys = {text: (version, get_text_hash(text)) for text in texts}
+        found = {}
+
+        with self._lock:
+            for text, key in keys.items():
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[text] = self._entries[key]
+
+        missing = {text: key for text, key in keys.items() if text not in found}
+        if missing and self.backend is not None:
+            backend_keys = {
+                self.get_backend_key(key): text for text, key in missing.items()
+            }
+            for backend_key, value in self.backend.get_many(backend_keys).items():
+                text = backend_keys[backend_key]
+                found[text] = tuple(value)
+                self._store(missing[text], found[text])
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def set_many(self, version, predictions):
+        """
+        Cache 'predictions', {normalized text: (language, polarity, confidence)}.
+        """
+        if not self.max_size or not predictions:
+            return
+
+        keys = {text: (version, get_text_hash(text)) for text in predictions}
+        for text, key in keys.items():
+            self._store(key, predictions[text])
+
+        if self.backend is not None:
+            self.backend.set_many(
+                {
+                    self.get_backend_key(key): predictions[text]
+                    for text, key in keys.items()
+                },
+                timeout=settings.SATISFACTION_PREDICTION_CACHE_TIMEOUT,
+            )
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Hit and miss counters of this process since the last clear().
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """
+        Forget the predictions of this process and reset the counters.
+        """
+        with self._lock:
+            self._entries = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+
+
+prediction_cache = PredictionCache()
@@ -0,0 +1,322 @@
+import bisect
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import (
+    HashingVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.preprocessing import normalize
+
+FORMAT_VERSION = 1
+
+# TfidfVectorizer parameters needed to rebuild the same analyzer
+ANALYZER_PARAMS = [
+    "analyzer",
+    "lowercase",
+    "ngram_range",
+    "strip_accents",
+    "stop_words",
+    "token_pattern",
+]
+
+# HashingVectorizer parameters needed to hash terms to the same columns
+HASHING_PARAMS = ["n_features", "alternate_sign", "binary", "norm"]
+
+
+class StringTable:
+    """
+    List of strings stored as one UTF-8 blob and the offsets of each string,
+    both as '.npy' arrays which can be memory-mapped.
+    Supports len(), table[i] and, when saved sorted, bisect, without any
+    Python dict.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def save(cls, directory, name, strings):
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(string) for string in encoded])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        np.save(os.path.join(directory, f"{name}_blob.npy"), blob)
+        np.save(os.path.join(directory, f"{name}_offsets.npy"), offsets)
+
+    @classmethod
+    def load(cls, directory, name, mmap_mode="r"):
+        return cls(
+            np.load(os.path.join(directory, f"{name}_blob.npy"), mmap_mode=mmap_mode),
+            np.load(
+                os.path.join(directory, f"{name}_offsets.npy"), mmap_mode=mmap_mode
+            ),
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        """
+        Returns the UTF-8 bytes of the string at 'index'.
+        """
+        return self.blob[self.offsets[index] : self.offsets[index + 1]].tobytes()
+
+    def index(self, string):
+        """
+        Position of 'string' in the sorted table, None if it is not present.
+        UTF-8 bytes are sorted like the Python strings they encode.
+        """
+        key = string.encode("utf-8")
+        position = bisect.bisect_left(self, key)
+        if position < len(self) and self[position] == key:
+            return position
+        return None
+
+    def decode(self, index):
+        return self[index].decode("utf-8")
+
+
+def export_pipeline(pipeline, path):
+    """
+    Export a fitted Pipeline(TfidfVectorizer, MultinomialNB or
+    OneVsRestClassifier(MultinomialNB)) to the folder 'path':
+        - meta.json: vectorizer parameters and classes
+        - vocabulary_blob.npy / vocabulary_offsets.npy: sorted string table
+        - idf.npy, feature_log_prob.npy, class_log_prior.npy
+    Pipeline(HashingVectorizer, TfidfTransformer, classifier) are exported the
+    same way, without vocabulary.
+    Files are written in a temporary folder which then replaces 'path' (see
+    replace_directory), so a reader never sees a half-written export.
+    """
+    steps = [step for _, step in pipeline.steps]
+
+    if len(steps) == 3 and (
+        isinstance(steps[0], HashingVectorizer)
+        and isinstance(steps[1], TfidfTransformer)
+    ):
+        vectorizer, transformer, classifier = steps
+    elif len(steps) == 2 and isinstance(steps[0], TfidfVectorizer):
+        vectorizer, classifier = steps
+        transformer = vectorizer
+    else:
+        raise ValueError(
+            "Only TfidfVectorizer or HashingVectorizer pipelines can be exported."
+        )
+    hashing = isinstance(vectorizer, HashingVectorizer)
+
+    if isinstance(classifier, OneVsRestClassifier):
+        if classifier.multilabel_:
+            raise ValueError("Multilabel classifiers cannot be exported.")
+        estimators = classifier.estimators_
+        multiclass = classifier.label_binarizer_.y_type_ == "multiclass"
+    elif isinstance(classifier, MultinomialNB):
+        estimators = [classifier]
+        multiclass = False
+    else:
+        raise ValueError("Only MultinomialNB classifiers can be exported.")
+
+    params = vectorizer.get_params()
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "vectorizer": {name: params[name] for name in ANALYZER_PARAMS},
+        "hashing": (
+            {name: params[name] for name in HASHING_PARAMS} if hashing else None
+        ),
+        "binary": vectorizer.binary,
+        "sublinear_tf": transformer.sublinear_tf,
+        "norm": transformer.norm,
+        "one_vs_rest": isinstance(classifier, OneVsRestClassifier),
+        "multiclass": multiclass,
+        "classes": classifier.classes_.tolist(),
+    }
+
+    parent = os.path.dirname(os.path.abspath(path))
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix=".export-")
+
+    if not hashing:
+        # Features of a fitted vectorizer are numbered in alphabetical order
+        vocabulary = vectorizer.get_feature_names_out().tolist()
+        StringTable.save(tmp_path, "vocabulary", vocabulary)
+    np.save(os.path.join(tmp_path, "idf.npy"), transformer.idf_)
+    np.save(
+        os.path.join(tmp_path, "feature_log_prob.npy"),
+        np.stack([estimator.feature_log_prob_ for estimator in estimators]),
+    )
+    np.save(
+        os.path.join(tmp_path, "class_log_prior.npy"),
+        np.stack([estimator.class_log_prior_ for estimator in estimators]),
+    )
+    with open(os.path.join(tmp_path, "meta.json"), "w") as file:
+        json.dump(meta, file)
+
+    replace_directory(tmp_path, path)
+
+
+def get_version_pattern(path):
+    """
+    Names of the versioned folders published at 'path' (see replace_directory).
+    """
+    return re.compile(rf"\.{re.escape(os.path.basename(path))}\.v\d+")
+
+
+def replace_directory(tmp_path, path):
+    """
+    Publish the folder 'tmp_path' at 'path', atomically: it is renamed to a
+    versioned folder '.<name>.v<ns>' next to 'path', then 'path', a symbolic
+    link to it, is replaced in a single rename. Readers resolve 'path' once
+    (see resolve_directory): they never miss the folder nor mix two versions.
+    The previous version is kept for readers still loading it, older ones
+    are removed. Both must be on the same filesystem (renames only).
+    """
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    name = os.path.basename(path)
+
+    version = f".{name}.v{time.time_ns()}"
+    os.rename(tmp_path, os.path.join(parent, version))
+
+    if os.path.islink(path):
+        previous = os.readlink(path)
+    elif os.path.isdir(path):
+        # Folder written before the versioned folders, moved aside once
+        previous = f".{name}.v0"
+        os.rename(path, os.path.join(parent, previous))
+    else:
+        previous = None
+
+    link = os.path.join(parent, f"{version}.link")
+    os.symlink(version, link)
+    os.replace(link, path)
+
+    pattern = get_version_pattern(path)
+    for entry in os.listdir(parent):
+        if pattern.fullmatch(entry) and entry not in (version, previous):
+            shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
+
+
+def resolve_directory(path):
+    """
+    Versioned folder currently published at 'path', read as a whole by the
+    loaders even if another version is published meanwhile.
+    """
+    return os.path.realpath(path)
+
+
+class CompactPipeline:
+    """
+    Read-only pipeline loaded from an export, with the same predict and
+    predict_proba as the sklearn pipeline.
+    Arrays are memory-mapped: workers opening the same export share its pages.
+    The meta and arrays are read from the same version of the export.
+    """
+
+    def __init__(self, path, mmap_mode="r"):
+        path = self.path = resolve_directory(path)
+        with open(os.path.join(path, "meta.json")) as file:
+            self.meta = json.load(file)
+
+        vectorizer_params = self.meta["vectorizer"]
+        vectorizer_params["ngram_range"] = tuple(vectorizer_params["ngram_range"])
+
+        if self.meta.get("hashing"):
+            self.hasher = HashingVectorizer(**vectorizer_params, **self.meta["hashing"])
+            self.vocabulary = None
+        else:
+            self.hasher = None
+            self.analyzer = TfidfVectorizer(**vectorizer_params).build_analyzer()
+            self.vocabulary = StringTable.load(path, "vocabulary", mmap_mode)
+        self.idf = np.load(os.path.join(path, "idf.npy"), mmap_mode=mmap_mode)
+        self.feature_log_prob = np.load(
+            os.path.join(path, "feature_log_prob.npy"), mmap_mode=mmap_mode
+        )
+        self.class_log_prior = np.load(
+            os.path.join(path, "class_log_prior.npy"), mmap_mode=mmap_mode
+        )
+        self.classes_ = np.asarray(self.meta["classes"])
+
+    def transform(self, texts):
+        """
+        Same TF-IDF matrix as TfidfVectorizer.transform.
+        """
+        if self.hasher:
+            X = self.hasher.transform(texts).astype(np.float64)
+        else:
+            X = self.count(texts)
+        if self.meta["sublinear_tf"]:
+            np.log(X.data, X.data)
+            X.data += 1
+        X.data *= self.idf[X.indices]
+
+        if self.meta["norm"]:
+            X = normalize(X, norm=self.meta["norm"], copy=False)
+
+        return X
+
+    def count(self, texts):
+        """
+        Counts of the vocabulary terms in each text.
+        """
+        indices = {}
+        rows, cols, data = [], [], []
+
+        for row, text in enumerate(texts):
+            for term, count in Counter(self.analyzer(text)).items():
+                if term not in indices:
+                    indices[term] = self.vocabulary.index(term)
+                if indices[term] is not None:
+                    rows.append(row)
+                    cols.append(indices[term])
+                    data.append(count)
+
+        X = sp.csr_matrix(
+            (np.asarray(data, dtype=np.float64), (rows, cols)),
+            shape=(len(texts), len(self.vocabulary)),
+        )
+
+        if self.meta["binary"]:
+            X.data[:] = 1
+        return X
+
+    def predict_proba(self, texts):
+        X = self.transform(texts)
+
+        probas = []
+        for feature_log_prob, class_log_prior in zip(
+            self.feature_log_prob, self.class_log_prior
+        ):
+            jll = X @ np.asarray(feature_log_prob).T + class_log_prior
+            jll = np.exp(jll - jll.max(axis=1, keepdims=True))
+            probas.append(jll / jll.sum(axis=1, keepdims=True))
+
+        if not self.meta["one_vs_rest"]:
+            return probas[0]
+
+        Y = np.array([proba[:, 1] for proba in probas]).T
+        if len(probas) == 1:
+            Y = np.concatenate((1 - Y, Y), axis=1)
+
+        row_sums = Y.sum(axis=1)[:, np.newaxis]
+        np.divide(Y, row_sums, out=Y, where=row_sums != 0)
+        return Y
+
+    def predict(self, texts):
+        probas = self.predict_proba(texts)
+
+        if self.meta["one_vs_rest"] and not self.meta["multiclass"]:
+            # Same threshold as OneVsRestClassifier on binary problems
+            return self.classes_[(probas[:, 1] > 0.5).astype(int)]
+
+        return self.classes_[probas.argmax(axis=1)]
@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+import numpy as np
+
+from .compact import StringTable, replace_directory, resolve_directory
+
+
+def get_dataset_path(data_path, lang):
+    return f"{data_path}dataset_{lang}"
+
+
+def dataset_exists(path):
+    return os.path.isfile(os.path.join(path, "labels.npy"))
+
+
+def save_dataset(path, texts, labels):
+    """
+    Save a training dataset to the folder 'path':
+        - text_blob.npy / text_offsets.npy: cleaned texts (see StringTable)
+        - labels.npy: satisfaction of each text, as int8
+    Like model exports, the folder is replaced at once when complete.
+    """
+    if len(texts) != len(labels):
+        raise ValueError("Texts and labels must have the same length.")
+
+    parent = os.path.dirname(os.path.abspath(path))
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix=".dataset-")
+
+    StringTable.save(tmp_path, "text", texts)
+    np.save(os.path.join(tmp_path, "labels.npy"), np.asarray(labels, dtype=np.int8))
+
+    replace_directory(tmp_path, path)
+
+
+def load_dataset(path):
+    """
+    Returns:
+        (list, ndarray): cleaned texts and their labels
+    """
+    # Texts and labels of the same version, see replace_directory
+    path = resolve_directory(path)
+    table = StringTable.load(path, "text", mmap_mode=None)
+    blob = table.blob.tobytes()
+    offsets = table.offsets.tolist()
+
+    texts = [
+        blob[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])
+    ]
+    labels = np.load(os.path.join(path, "labels.npy"))
+
+    return texts, labels
@@ -0,0 +1,177 @@
+import json
+import math
+import os
+import re
+import threading
+
+import langdetect
+import numpy as np
+
+from .registry import AVAILABLE_LANGUAGES
+
+# langdetect profiles written with the latin alphabet: a comment must be
+# closer to French or English than to all of them to be accepted.
+CANDIDATE_LANGUAGES = [
+    "af", "ca", "cs", "cy", "da", "de", "en", "es", "et", "fi", "fr",
+    "hr", "hu", "id", "it", "lt", "lv", "nl", "no", "pl", "pt", "ro",
+    "sk", "sl", "so", "sq", "sv", "sw", "tl", "tr", "vi",
+]  # fmt: skip
+
+# Texts up to this length are first checked against the stop words below.
+SHORT_TEXT_LENGTH = 40
+
+# Frequent words of each supported language which are not words of the other
+# supported one. Other candidate languages may share them ("il" in Italian,
+# "is" and "we" in Dutch): a short text made of at least half stop words of a
+# single supported language is accepted without comparing it to the other
+# candidates (see detect_stop_words). The other texts are compared to all of
+# them.
+STOP_WORDS = {
+    "fr": {
+        "je", "tu", "il", "nous", "vous", "ils", "est", "sont", "très", "bien",
+        "pas", "les", "des", "une", "du", "au", "aux", "pour", "avec", "mais",
+        "ce", "cette", "c'est", "j'aime", "trop", "nul", "génial", "merci",
+    },
+    "en": {
+        "i", "you", "he", "we", "they", "is", "are", "was", "very", "good",
+        "not", "the", "and", "with", "but", "this", "it's", "love", "great",
+        "bad", "awful", "thanks", "app", "really",
+    },
+}  # fmt: skip
+
+# Same smoothing as langdetect (alpha / base frequency).
+SMOOTHING = 0.5 / 10000
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+
+class LanguageIdentifier:
+    """
+    Deterministic language identification restricted to the supported languages.
+
+    It relies on the character n-gram profiles shipped with langdetect, but
+    scores every n-gram of the text at once instead of random sampling,
+    so the same text always gets the same answer.
+    Profiles are read once, on first use, into a single log-probability matrix.
+    """
+
+    def __init__(self, languages=None, candidates=None):
+        self.languages = languages or AVAILABLE_LANGUAGES
+        self.candidates = candidates or CANDIDATE_LANGUAGES
+        self._ngrams = None
+        self._log_probs = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Read the langdetect profiles of every candidate language.
+        """
+        if self._ngrams is not None:
+            return
+
+        with self._lock:
+            if self._ngrams is not None:
+                return
+
+            profiles_path = os.path.join(
+                os.path.dirname(langdetect.__file__), "profiles"
+            )
+            frequencies = []
+            for lang in self.candidates:
+                with open(os.path.join(profiles_path, lang), encoding="utf-8") as file:
+                    profile = json.load(file)
+
+                # langdetect keeps the case, texts are lowercased here
+                freq = {}
+                for ngram, count in profile["freq"].items():
+                    n_words = profile["n_words"][len(ngram) - 1]
+                    freq[ngram.lower()] = freq.get(ngram.lower(), 0) + count / n_words
+                frequencies.append(freq)
+
+            ngrams = sorted(set().union(*frequencies))
+            log_probs = np.empty((len(ngrams) + 1, len(self.candidates)), np.float32)
+            for row, ngram in enumerate(ngrams):
+                for col, freq in enumerate(frequencies):
+                    log_probs[row, col] = math.log(SMOOTHING + freq.get(ngram, 0))
+
+            # Last row is used for n-grams unknown to every language
+            log_probs[-1] = 0
+
+            self._log_probs = log_probs
+            self._ngrams = {ngram: row for row, ngram in enumerate(ngrams)}
+
+    def get_rows(self, words):
+        """
+        Rows of the 1, 2 and 3-grams of the words.
+        """
+        unknown = len(self._ngrams)
+        rows = []
+        for word in words:
+            padded = f" {word} "
+            for n in (1, 2, 3):
+                for i in range(len(padded) - n + 1):
+                    ngram = padded[i : i + n]
+                    if ngram != " ":
+                        rows.append(self._ngrams.get(ngram, unknown))
+        return rows
+
+    def detect_stop_words(self, words):
+        """
+        Short-circuit for short texts: answers when at least half of the words
+        are stop words of a single language, None otherwise.
+        """
+        found = []
+        for lang in self.languages:
+            n_stop_words = sum(word in STOP_WORDS[lang] for word in words)
+            if n_stop_words * 2 >= len(words):
+                found.append(lang)
+
+        if len(found) == 1:
+            return found[0]
+        return None
+
+    def detect_batch(self, texts):
+        """
+        Returns, for each text, 'fr', 'en' or None when the text is written
+        in another language (or has no letters at all).
+        """
+        self.load()
+
+        results = [None] * len(texts)
+        rows = []
+        starts = []
+        indexes = []
+
+        for index, text in enumerate(texts):
+            words = WORD_PATTERN.findall(text.lower())
+            if not words:
+                continue
+
+            if len(text) <= SHORT_TEXT_LENGTH:
+                results[index] = self.detect_stop_words(words)
+                if results[index] is not None:
+                    continue
+
+            text_rows = self.get_rows(words)
+            starts.append(len(rows))
+            indexes.append(index)
+            rows.extend(text_rows)
+
+        if indexes:
+            # One score per text and per candidate language
+            scores = np.add.reduceat(self._log_probs[rows], starts, axis=0)
+            best = scores.argmax(axis=1)
+            known = np.add.reduceat(np.asarray(rows) != len(self._ngrams), starts)
+
+            for index, col, n_known in zip(indexes, best, known):
+                lang = self.candidates[col]
+                if n_known and lang in self.languages:
+                    results[index] = lang
+
+        return results
+
+    def detect(self, text):
+        return self.detect_batch([text])[0]
+
+
+language_identifier = LanguageIdentifier()
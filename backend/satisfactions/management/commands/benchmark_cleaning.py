@@ -0,0 +1,87 @@
+import os
+import re
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+from satisfactions.text import clean_texts
+
+from .utils import print_color
+
+DATAFRAMES = {"fr": ("dataframe_fr.csv", "review"), "en": ("dataframe_en.csv", "en")}
+
+# Previous cleaning, one text at a time
+ROW_PATTERNS = {"fr": r"[^a-zàâçéèêëîïôûùüÿñæœ\s]", "en": r"[^a-z\s]"}
+
+
+def clean_text_by_row(lang, text):
+    text = text.lower()
+    text = re.sub(ROW_PATTERNS[lang], " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+class Command(BaseCommand):
+    """
+    Django management command to compare the batch text cleaning with the
+    previous cleaning applied row by row.
+
+    This command:
+        - Loading reviews of dataframe_fr.csv or dataframe_en.csv
+          (create_dataframes --export-csv)
+        - Timing Series.apply of the previous cleaning and clean_texts
+        - Checking both give the same texts and printing rows/sec
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py benchmark_cleaning
+
+        Otherwise:
+            python manage.py benchmark_cleaning --lang fr --repeat 10
+    """
+
+    help = "Compare batch text cleaning with row by row cleaning."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lang", choices=DATAFRAMES.keys(), default="fr")
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=10,
+            help="Number of times the reviews are repeated, for steadier timings.",
+        )
+
+    def handle(self, *args, **options):
+        file, column = DATAFRAMES[options["lang"]]
+        path_file = os.getenv("DATA_PATH") + file
+
+        if not os.path.isfile(path_file):
+            print_color(f"Dataframe {file} is not present, create it first", "red")
+            return
+
+        reviews = pd.read_csv(path_file, usecols=[column])[column]
+        reviews = pd.concat([reviews.fillna("").astype(str)] * options["repeat"])
+
+        print_color(f"Benchmarking on {len(reviews)} reviews...", "yellow")
+
+        start_time = time.perf_counter()
+        reference = reviews.apply(
+            lambda text: clean_text_by_row(options["lang"], text)
+        ).tolist()
+        row_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        results = clean_texts(options["lang"], reviews)
+        batch_time = time.perf_counter() - start_time
+
+        for name, duration in [("Row by row", row_time), ("clean_texts", batch_time)]:
+            print_color(f"\n\t{name}:", "blue")
+            print_color(f"\t\tTotal time: {duration:.3f} sec")
+            print_color(f"\t\tThroughput: {len(reviews) / duration:.0f} rows/sec")
+
+        if results != reference:
+            print_color("\n\tCleaned texts are different!", "red")
+            return
+
+        print_color(f"\n\tSame cleaned texts", "green")
+        print_color(f"\tSpeedup: x{row_time / batch_time:.1f}", "green")
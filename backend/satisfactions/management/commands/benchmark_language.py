@@ -0,0 +1,101 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from langdetect import DetectorFactory, LangDetectException, detect
+from satisfactions.dataset import dataset_exists, get_dataset_path, load_dataset
+from satisfactions.language import LanguageIdentifier
+
+from .utils import print_color
+
+LANGUAGES = ["fr", "en"]
+
+
+def langdetect_batch(texts):
+    """
+    Detect each text with langdetect, like the serializer used to.
+    """
+    results = []
+    for text in texts:
+        try:
+            results.append(detect(text))
+        except LangDetectException:
+            results.append(None)
+    return results
+
+
+class Command(BaseCommand):
+    """
+    Django management command to compare the language identifier used by the API
+    with langdetect on the training datasets.
+
+    This command:
+        - Loading reviews of the French and English datasets
+        - Timing both detectors (profiles loading included)
+        - Printing throughput, accuracy and agreement between them
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py benchmark_language
+
+        Otherwise:
+            python manage.py benchmark_language --limit 1000
+    """
+
+    help = "Compare the language identifier with langdetect."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=1000,
+            help="Maximum number of reviews read in each dataset.",
+        )
+
+    def handle(self, *args, **options):
+        data_path = os.getenv("DATA_PATH")
+
+        texts = []
+        expected = []
+        for lang in LANGUAGES:
+            path = get_dataset_path(data_path, lang)
+            if not dataset_exists(path):
+                print_color(f"Dataset {path} is not present, create it first", "red")
+                return
+
+            reviews, _ = load_dataset(path)
+            reviews = [review for review in reviews if review][: options["limit"]]
+
+            texts.extend(reviews)
+            expected.extend([lang] * len(reviews))
+
+        print_color(f"Benchmarking on {len(texts)} reviews...", "yellow")
+
+        # Same answer for the same text, like LanguageIdentifier
+        DetectorFactory.seed = 0
+
+        start_time = time.perf_counter()
+        reference = langdetect_batch(texts)
+        langdetect_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        identifier = LanguageIdentifier()
+        results = identifier.detect_batch(texts)
+        identifier_time = time.perf_counter() - start_time
+
+        for name, predictions, duration in [
+            ("langdetect", reference, langdetect_time),
+            ("LanguageIdentifier", results, identifier_time),
+        ]:
+            accuracy = sum(p == e for p, e in zip(predictions, expected)) / len(texts)
+            print_color(f"\n\t{name}:", "blue")
+            print_color(f"\t\tTotal time: {duration:.2f} sec")
+            print_color(f"\t\tThroughput: {len(texts) / duration:.0f} texts/sec")
+            print_color(f"\t\tAccuracy: {accuracy:.4f}")
+
+        # langdetect answers any language, the identifier only fr/en/None
+        reference = [lang if lang in LANGUAGES else None for lang in reference]
+        agreement = sum(r == p for r, p in zip(reference, results)) / len(texts)
+
+        print_color(f"\n\tAgreement with langdetect: {agreement:.4f}", "green")
+        print_color(f"\tSpeedup: x{langdetect_time / identifier_time:.1f}", "green")
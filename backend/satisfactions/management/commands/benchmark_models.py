@@ -0,0 +1,221 @@
+import gc
+import itertools
+import json
+import os
+import resource
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from satisfactions.compact import CompactPipeline
+from satisfactions.dataset import dataset_exists, get_dataset_path, load_dataset
+from satisfactions.predictions import predict_polarities
+from satisfactions.registry import AVAILABLE_LANGUAGES, registry
+from satisfactions.training import split_dataset
+
+from .create_dataframes import TEXT_COLUMNS
+from .export_models import get_size
+
+BATCH_SIZES = [1, 8, 64, 512]
+PERCENTILES = [50, 90, 99]
+
+
+def get_rss():
+    """
+    Resident memory of this process in bytes (peak resident memory when
+    /proc is not available).
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def load_held_out(data_path, lang):
+    """
+    Reviews of the test set of 'create_models', raw from dataframe_<lang>.csv
+    (create_dataframes --export-csv) or already cleaned from the dataset.
+    Returns (source, texts, labels), None if there is no data.
+    """
+    path_file = data_path + f"dataframe_{lang}.csv"
+    dataset_path = get_dataset_path(data_path, lang)
+
+    if os.path.isfile(path_file):
+        column = TEXT_COLUMNS[lang]
+        dataframe = pd.read_csv(path_file, usecols=["satisfaction", column])
+        source = os.path.basename(path_file)
+        X = dataframe[column].fillna("").astype(str).tolist()
+        y = dataframe["satisfaction"].to_numpy()
+    elif dataset_exists(dataset_path):
+        source = os.path.basename(dataset_path)
+        X, y = load_dataset(dataset_path)
+    else:
+        return None
+
+    # Same rows and order as the dataset: same test set as create_models
+    _, X_test, _, y_test = split_dataset(X, y)
+    return source, list(X_test), np.asarray(y_test)
+
+
+def measure_load(lang):
+    """
+    Load the model of 'lang' through the registry, from scratch.
+    Returns (path, model, load time in seconds, resident memory delta in bytes)
+    """
+    registry.clear()
+    gc.collect()
+    path, _, _ = registry.get_source(lang)
+
+    rss = get_rss()
+    start_time = time.perf_counter()
+    model = registry.get(lang)
+    load_time = time.perf_counter() - start_time
+
+    return path, model, load_time, get_rss() - rss
+
+
+def measure_latency(lang, texts, batch_size, batches):
+    """
+    Time 'batches' calls to predict_polarities on 'batch_size' texts.
+    Returns percentiles of the latency per text, in milliseconds.
+    """
+    pool = itertools.cycle(texts)
+    durations = []
+    for _ in range(batches):
+        batch = list(itertools.islice(pool, batch_size))
+        start_time = time.perf_counter()
+        predict_polarities(lang, batch)
+        durations.append(time.perf_counter() - start_time)
+
+    per_text = np.asarray(durations) * 1000 / batch_size
+    latency = {f"p{q}": float(np.percentile(per_text, q)) for q in PERCENTILES}
+    latency["mean"] = float(per_text.mean())
+    latency["batches"] = batches
+    return latency
+
+
+def benchmark(lang, data_path, batch_sizes, batches):
+    """
+    Returns the measures of the model of 'lang', sizes in bytes,
+    durations in seconds and latencies in milliseconds.
+    """
+    held_out = load_held_out(data_path, lang)
+    if held_out is None:
+        return None
+    source, texts, labels = held_out
+
+    path, model, load_time, rss_delta = measure_load(lang)
+
+    pickle_path, export_path = registry.get_paths(lang)
+
+    # Same code path as the API: registry, cleaning and prediction
+    polarities = np.asarray(predict_polarities(lang, texts))
+
+    return {
+        "model": {
+            "version": registry.store.get_active_version(lang),
+            "path": os.path.relpath(path, data_path),
+            "format": "export" if isinstance(model, CompactPipeline) else "pickle",
+            "modified_at": datetime.fromtimestamp(
+                os.path.getmtime(path), timezone.utc
+            ).isoformat(),
+        },
+        "held_out": {"source": source, "samples": len(texts)},
+        "accuracy": float(np.mean(polarities == (labels == 1))),
+        "load_time": load_time,
+        "rss_delta": rss_delta,
+        "pickle_size": get_size(pickle_path) if os.path.isfile(pickle_path) else None,
+        "export_size": get_size(export_path) if os.path.isdir(export_path) else None,
+        "latency_ms": {
+            str(batch_size): measure_latency(lang, texts, batch_size, batches)
+            for batch_size in batch_sizes
+        },
+    }
+
+
+class Command(BaseCommand):
+    """
+    Django management command to evaluate the trained models and benchmark
+    their inference, without any input: runs can be compared with diff.
+
+    This command:
+        - Loading the test set of create_models, from dataframe_<lang>.csv
+          or from the dataset
+        - Loading each model through the registry used by the API,
+          measuring load time and resident memory delta
+        - Computing accuracy with predict_polarities (cleaning included)
+        - Measuring latency percentiles per review for each batch size
+        - Writing a JSON report on stdout or in --output
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py benchmark_models
+
+        Otherwise:
+            python manage.py benchmark_models --lang fr --output benchmark_fr.json
+    """
+
+    help = "Evaluate the models and benchmark their inference, as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lang",
+            choices=AVAILABLE_LANGUAGES,
+            default=None,
+            help="Only benchmark the model of this language.",
+        )
+        parser.add_argument(
+            "--batch-sizes",
+            type=int,
+            nargs="+",
+            default=BATCH_SIZES,
+            help="Number of reviews per prediction call.",
+        )
+        parser.add_argument(
+            "--batches",
+            type=int,
+            default=100,
+            help="Number of prediction calls timed for each batch size.",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="JSON file written instead of stdout.",
+        )
+
+    def handle(self, *args, **options):
+        data_path = os.getenv("DATA_PATH")
+        languages = [options["lang"]] if options["lang"] else AVAILABLE_LANGUAGES
+
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "batch_sizes": options["batch_sizes"],
+            "models": {},
+        }
+
+        for lang in languages:
+            if not registry.is_available(lang):
+                self.stderr.write(f"No model for '{lang}', skipped.")
+                continue
+
+            self.stderr.write(f"Benchmarking the '{lang}' model...")
+            measures = benchmark(
+                lang, data_path, options["batch_sizes"], options["batches"]
+            )
+            if measures is None:
+                self.stderr.write(f"No held-out data for '{lang}', skipped.")
+                continue
+            report["models"][lang] = measures
+
+        # Models loaded for the benchmark are not kept
+        registry.clear()
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,195 @@
+import os
+import pickle
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from satisfactions.compact import CompactPipeline, export_pipeline
+from satisfactions.dataset import dataset_exists, get_dataset_path, load_dataset
+from satisfactions.training import CachedSearch, split_dataset
+
+from .create_models import LANGUAGES, N_FEATURES, VECTORIZERS, build_search
+from .export_models import get_size
+from .utils import print_color
+
+
+def format_size(size):
+    return f"{size / 1024 ** 2:.2f} MB"
+
+
+def timed(function, repeat):
+    """
+    Median duration of 'repeat' calls to 'function', in seconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start_time)
+    return statistics.median(durations)
+
+
+def compare(search, X_train, X_test, y_train, y_test, repeat):
+    """
+    Fit 'search' and measure its best pipeline.
+    Returns a dict of measures, sizes in bytes and durations in seconds.
+    """
+    tracemalloc.start()
+    search.fit(X_train, y_train)
+    fit_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    pipeline = search.best_estimator_
+    vectorizer = pipeline.steps[0][1]
+    pickled = pickle.dumps(pipeline)
+
+    # Memory of a worker holding the unpickled model
+    tracemalloc.start()
+    loaded = pickle.loads(pickled)
+    model_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del loaded
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        export_path = os.path.join(tmp_dir, "export")
+        export_pipeline(pipeline, export_path)
+        export_size = get_size(export_path)
+        compact_load_time = timed(lambda: CompactPipeline(export_path), repeat)
+
+    return {
+        "accuracy": search.score(X_test, y_test),
+        "features": (
+            vectorizer.n_features
+            if hasattr(vectorizer, "n_features")
+            else len(vectorizer.vocabulary_)
+        ),
+        "fit_time": search.search_time_ + search.refit_time_,
+        "fit_memory": fit_memory,
+        "predict_time": timed(lambda: pipeline.predict(X_test), repeat),
+        "single_predict_time": timed(lambda: pipeline.predict(X_test[:1]), repeat),
+        "pickle_size": len(pickled),
+        "load_time": timed(lambda: pickle.loads(pickled), repeat),
+        "model_memory": model_memory,
+        "export_size": export_size,
+        "compact_load_time": compact_load_time,
+    }
+
+
+class Command(BaseCommand):
+    """
+    Django management command to compare the TF-IDF pipeline (vocabulary)
+    with the hashing pipeline (fixed number of features, no vocabulary).
+
+    This command:
+        - Loading the cleaned dataset of --lang and splitting it like create_models
+        - Searching the best pipeline of each vectorizer with the same strategy
+        - Reporting accuracy on the test set, fit time and peak memory,
+          predict latency, pickle size, load time and memory of the loaded
+          model, compact export size and load time
+        - Memory is measured with tracemalloc, in this process: use --n-jobs 1
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py compare_vectorizers
+
+        Otherwise:
+            python manage.py compare_vectorizers --lang fr --n-features 262144
+    """
+
+    help = "Compare accuracy, latency and memory of TF-IDF and hashing pipelines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lang", choices=LANGUAGES, default="fr")
+        parser.add_argument(
+            "--n-features",
+            type=int,
+            default=N_FEATURES,
+            help="Number of columns terms are hashed to.",
+        )
+        parser.add_argument(
+            "--strategy",
+            choices=CachedSearch.STRATEGIES,
+            default="random",
+            help="Search strategy used for both vectorizers.",
+        )
+        parser.add_argument(
+            "--n-iter",
+            type=int,
+            default=20,
+            help="Number of candidates drawn by the random strategy.",
+        )
+        parser.add_argument(
+            "--n-jobs",
+            type=int,
+            default=1,
+            help="Number of processes of the searches.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of timings, the median is reported.",
+        )
+
+    def handle(self, *args, **options):
+        dataset_path = get_dataset_path(os.getenv("DATA_PATH"), options["lang"])
+
+        if not dataset_exists(dataset_path):
+            print_color(f"Dataset is not present, you need to create it", "red")
+            return
+
+        X, y = load_dataset(dataset_path)
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
+        print_color(
+            f"Comparing vectorizers on {len(X_train)} train and {len(X_test)} test reviews...",
+            "yellow",
+        )
+
+        results = {}
+        for vectorizer in VECTORIZERS:
+            print_color(f"\tSearching the {vectorizer} pipeline...")
+            search = build_search(
+                {**options, "vectorizer": vectorizer, "time_budget": None}
+            )
+            search.verbose = 0
+            results[vectorizer] = compare(
+                search, X_train, X_test, y_train, y_test, options["repeat"]
+            )
+
+        rows = [
+            ("Test accuracy", "accuracy", lambda value: f"{value:.4f}"),
+            ("Features", "features", str),
+            ("Search and refit", "fit_time", lambda value: f"{value:.2f} sec"),
+            ("Peak memory of fit", "fit_memory", format_size),
+            (
+                f"Predict {len(X_test)} reviews",
+                "predict_time",
+                lambda value: f"{value * 1000:.2f} ms",
+            ),
+            (
+                "Predict 1 review",
+                "single_predict_time",
+                lambda value: f"{value * 1000:.3f} ms",
+            ),
+            ("Pickle size", "pickle_size", format_size),
+            ("Pickle load", "load_time", lambda value: f"{value * 1000:.2f} ms"),
+            ("Loaded model memory", "model_memory", format_size),
+            ("Compact export size", "export_size", format_size),
+            (
+                "Compact export load",
+                "compact_load_time",
+                lambda value: f"{value * 1000:.2f} ms",
+            ),
+        ]
+
+        print_color(f"\n\t{'':<22}" + "".join(f"{v:>14}" for v in VECTORIZERS), "blue")
+        for label, key, format_value in rows:
+            print_color(
+                f"\t{label:<22}"
+                + "".join(
+                    f"{format_value(results[vectorizer][key]):>14}"
+                    for vectorizer in VECTORIZERS
+                )
+            )
@@ -1,19 +1,26 @@
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 import numpy as np
 import pandas as pd
 from django.core.management.base import BaseCommand
+from satisfactions.dataset import dataset_exists, get_dataset_path, save_dataset
+from satisfactions.text import clean_texts
 
 from .utils import (
+    TRANSLATORS,
     check_files_not_exists,
     exit_with_error,
     get_translations,
     print_color,
+    sample_csv,
 )
 
 START_TIME = time.time()
 SAMPLE_SIZE = 200
+CHUNK_SIZE = 50_000
 DATA_FILES = [
     "allocine_french_review.csv",  # https://www.kaggle.com/datasets/djilax/allocine-french-movie-reviews
     "amazon_fr_en_review.csv",  # https://www.kaggle.com/datasets/dargolex/french-reviews-on-amazon-items-and-en-translation
@@ -27,141 +34,104 @@ DATA_FILES = [
 ]
 
 
-def clean_allocine_reviews(path_file):
+def read_sample(path_file, sampling, **kwargs):
     """
-    Clean the Allociné French reviews dataset:
-    - remove unused columns
-    - rename 'polarity' to 'satisfaction'
-    - sample 1000 rows
-    - translate reviews from French to English
-    Returns:
-        (DataFrame, DataFrame): French and English datasets
+    Sample 'path_file' with sample_csv, exit if pandas cannot read it.
     """
-    dataframe = []
-
     try:
-        dataframe = pd.read_csv(path_file)
+        sample = sample_csv(path_file, **kwargs, **sampling)
     except:
         exit_with_error(
             f"Pandas cannot open the following file: {path_file}", START_TIME
         )
+    if len(sample) < sampling["sample_size"]:
+        print_color(
+            f"\t\tOnly {len(sample)}/{sampling['sample_size']} rows in {path_file}",
+            "yellow",
+        )
+    return sample
 
-    dataframe = dataframe.drop("film-url", axis=1)
-    dataframe = dataframe.drop("Unnamed: 0", axis=1)
 
-    dataframe.rename(columns={"polarity": "satisfaction"}, inplace=True)
+def prepare_allocine_chunk(chunk):
+    return chunk.rename(columns={"polarity": "satisfaction"})
 
-    df_200 = dataframe.sample(n=SAMPLE_SIZE, random_state=42)
 
-    translations = []
+def prepare_amazon_chunk(chunk):
+    chunk["satisfaction"] = np.where(chunk["rating"] < 2.5, 0, 1).astype("int8")
+    return chunk.drop("rating", axis=1).rename(columns={"translation": "en"})
 
-    translations = get_translations(df_200, "fr", "en")
 
-    df_200["en"] = translations
+def prepare_tweeter_chunk(chunk):
+    return chunk.rename(columns={"label": "satisfaction", "text": "review"})
 
-    df_en_200 = df_200[["satisfaction", "en"]]
-    df_fr_200 = df_200[["satisfaction", "review"]]
 
-    cols_fr = ["satisfaction"] + [
-        col for col in df_fr_200.columns if col != "satisfaction"
-    ]
-    df_fr_200 = df_fr_200[cols_fr]
+def clean_allocine_reviews(path_file, sampling, translation_options):
+    """
+    Clean the Allociné French reviews dataset:
+    - read only 'review' and 'polarity' columns, by chunks
+    - rename 'polarity' to 'satisfaction'
+    - sample rows
+    - translate reviews from French to English (cached, see get_translations)
+    Returns:
+        (DataFrame, DataFrame): French and English datasets
+    """
+    dataframe = read_sample(
+        path_file,
+        sampling,
+        usecols=["review", "polarity"],
+        dtype={"review": str, "polarity": "int8"},
+        prepare=prepare_allocine_chunk,
+    )
 
-    cols_en = ["satisfaction"] + [
-        col for col in df_en_200.columns if col != "satisfaction"
-    ]
-    df_en_200 = df_en_200[cols_en]
+    dataframe["en"] = get_translations(dataframe, "fr", "en", **translation_options)
 
-    return df_fr_200, df_en_200
+    return dataframe[["satisfaction", "review"]], dataframe[["satisfaction", "en"]]
 
 
-def clean_amazon_reviews(path_file):
+def clean_amazon_reviews(path_file, sampling, translation_options):
     """
     Clean the Amazon French reviews dataset:
+    - read only 'review', 'rating' and 'translation' columns, by chunks
     - transform data 1 to 5 => 0 to 1
     - rename 'translation' to 'en'
-    - delete 'rating' column
+    - sample rows
     - separate datagrame fron English and French
     Returns:
         (DataFrame, DataFrame): French and English datasets
     """
-    dataframe = []
-
-    try:
-        dataframe = pd.read_csv(path_file)
-    except:
-        exit_with_error(
-            f"Pandas cannot open the following file: {path_file}", START_TIME
-        )
-
-    dataframe["satisfaction"] = np.where(dataframe["rating"] < 2.5, 0, 1)
+    dataframe = read_sample(
+        path_file,
+        sampling,
+        usecols=["review", "rating", "translation"],
+        dtype={"review": str, "rating": "float32", "translation": str},
+        prepare=prepare_amazon_chunk,
+    )
 
-    dataframe.rename(columns={"translation": "en"}, inplace=True)
+    return dataframe[["satisfaction", "review"]], dataframe[["satisfaction", "en"]]
 
-    dataframe = dataframe.drop("rating", axis=1)
 
-    dataframe_en = dataframe[["satisfaction", "en"]]
-    dataframe_fr = dataframe[["satisfaction", "review"]]
-
-    df_fr_200 = dataframe_fr.sample(n=SAMPLE_SIZE, random_state=42)
-    df_en_200 = dataframe_en.sample(n=SAMPLE_SIZE, random_state=42)
-
-    # Order dataframe  with first column as satisfaction
-    cols_fr = ["satisfaction"] + [
-        col for col in df_fr_200.columns if col != "satisfaction"
-    ]
-    df_fr_200 = df_fr_200[cols_fr]
-
-    cols_en = ["satisfaction"] + [
-        col for col in df_en_200.columns if col != "satisfaction"
-    ]
-    df_en_200 = df_en_200[cols_en]
-
-    return df_fr_200, df_en_200
-
-
-def clean_tweeter_reviews(path_file):
+def clean_tweeter_reviews(path_file, sampling, translation_options):
     """
     Clean the tweets dataset:
+    - read only 'label' and 'text' columns, by chunks
     - rename 'label' to 'satisfaction' & 'text' to 'review'
+    - sample rows
     - translate reviews from French to English
     - separate datagrame fron English and French
     Returns:
         (DataFrame, DataFrame): French and English datasets
     """
-    dataframe = []
-
-    try:
-        dataframe = pd.read_csv(path_file)
-    except:
-        exit_with_error(
-            f"Pandas cannot open the following file: {path_file}", START_TIME
-        )
-
-    dataframe.rename(columns={"label": "satisfaction"}, inplace=True)
-    dataframe.rename(columns={"text": "review"}, inplace=True)
+    dataframe = read_sample(
+        path_file,
+        sampling,
+        usecols=["label", "text"],
+        dtype={"label": "int8", "text": str},
+        prepare=prepare_tweeter_chunk,
+    )
 
-    df_200 = dataframe.sample(n=SAMPLE_SIZE, random_state=42)
+    dataframe["en"] = get_translations(dataframe, "fr", "en", **translation_options)
 
-    translations = get_translations(df_200, "fr", "en")
-
-    df_200["en"] = translations
-
-    df_en_200 = df_200[["satisfaction", "en"]]
-    df_fr_200 = df_200[["satisfaction", "review"]]
-
-    # Order dataframe  with first column as satisfaction
-    cols_fr = ["satisfaction"] + [
-        col for col in df_fr_200.columns if col != "satisfaction"
-    ]
-    df_fr_200 = df_fr_200[cols_fr]
-
-    cols_en = ["satisfaction"] + [
-        col for col in df_en_200.columns if col != "satisfaction"
-    ]
-    df_en_200 = df_en_200[cols_en]
-
-    return df_fr_200, df_en_200
+    return dataframe[["satisfaction", "review"]], dataframe[["satisfaction", "en"]]
 
 
 def clean_ai_reviews(path_file):
@@ -172,7 +142,7 @@ def clean_ai_reviews(path_file):
     dataframe = []
 
     try:
-        dataframe = pd.read_csv(path_file)
+        dataframe = pd.read_csv(path_file, dtype={"satisfaction": "int8"})
     except:
         exit_with_error(
             f"Pandas cannot open the following file: {path_file}", START_TIME
@@ -187,6 +157,65 @@ def clean_ai_reviews(path_file):
     return dataframe
 
 
+LANGUAGES = ["fr", "en"]
+TEXT_COLUMNS = {"fr": "review", "en": "en"}
+
+CLEANERS = {
+    "allocine_french_review.csv": clean_allocine_reviews,
+    "amazon_fr_en_review.csv": clean_amazon_reviews,
+    "french_tweets.csv": clean_tweeter_reviews,
+}
+
+
+# Sources translated with get_translations, see CLEANERS
+TRANSLATED_FILES = ["allocine_french_review.csv", "french_tweets.csv"]
+
+
+def clean_file(file, csv_path, sampling, translation_options):
+    """
+    Clean one source file, run in its own process.
+    Returns:
+        (DataFrame or None, DataFrame or None): French and English datasets
+    """
+    if file in CLEANERS:
+        dataframes = CLEANERS[file](csv_path + file, sampling, translation_options)
+    elif "fr" in file:
+        dataframes = clean_ai_reviews(csv_path + file), None
+    else:
+        dataframes = None, clean_ai_reviews(csv_path + file)
+
+    print_color(
+        f"End of {file} after: {time.time() - START_TIME:.2f} sec",
+        "blue",
+    )
+    return dataframes
+
+
+def to_dataset(dataframe, lang):
+    """
+    Returns:
+        (list, ndarray): cleaned texts and labels of a French or English dataframe
+    """
+    texts = dataframe[TEXT_COLUMNS[lang]].fillna("").astype(str)
+    return (
+        clean_texts(lang, texts),
+        dataframe["satisfaction"].to_numpy(dtype="int8"),
+    )
+
+
+def append_csv(dataframe, path_file):
+    """
+    Append 'dataframe' to 'path_file', with the header on the first write.
+    """
+    dataframe.to_csv(
+        path_file,
+        sep=",",
+        index=False,
+        mode="a",
+        header=not os.path.isfile(path_file),
+    )
+
+
 class Command(BaseCommand):
     """
     Django management command to clean and prepare all CSV datasets
@@ -194,29 +223,109 @@ class Command(BaseCommand):
 
     This command:
         - validates all CSV fles
+        - reads each source by chunks and samples it, in parallel processes
         - cleans and normalizes data
-        - concatenates all processed dataframes into 2 files
-            * dataframe_fr.csv — containing French reviews
-            * dataframe_en.csv — containing English translations
+        - saves cleaned texts and labels in 2 datasets (see dataset.py)
+            * dataset_fr — containing French reviews
+            * dataset_en — containing English translations
+        - with --export-csv, appends each processed dataframe to
+          dataframe_fr.csv and dataframe_en.csv
+        - existing dataframe_fr.csv and dataframe_en.csv are only converted
 
     How to use it?
         Using outside of docker when services are running:
             docker compose exec api python manage.py create_dataframes
 
         Otherwise:
-            python manage.py create_dataframes
+            python manage.py create_dataframes --sample-size 200 --processes 3
     """
 
     help = "This command checks csv files and clear all datas"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sample-size",
+            type=int,
+            default=SAMPLE_SIZE,
+            help="Number of rows sampled in each large dataset.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Number of rows read at once.",
+        )
+        parser.add_argument(
+            "--stratify",
+            action="store_true",
+            help="Sample as many positive as negative reviews.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of source files cleaned in parallel.",
+        )
+        parser.add_argument(
+            "--export-csv",
+            action="store_true",
+            help="Also write dataframe_fr.csv and dataframe_en.csv.",
+        )
+        parser.add_argument(
+            "--translator",
+            choices=TRANSLATORS.keys(),
+            default="google",
+            help="Translation backend, 'stub' works offline (tests, benchmarks).",
+        )
+        parser.add_argument(
+            "--translation-workers",
+            type=int,
+            default=4,
+            help="Number of threads translating reviews.",
+        )
+        parser.add_argument(
+            "--translation-rate",
+            type=float,
+            default=10,
+            help="Maximum number of translations per second, shared by the processes.",
+        )
+
     def handle(self, *args, **options):
+        sampling = {
+            "sample_size": options["sample_size"],
+            "chunk_size": options["chunk_size"],
+            "stratify": "satisfaction" if options["stratify"] else None,
+        }
+        # Each process limits its own rate: the budget of the translation API
+        # is split between the processes translating at the same time
+        translating = min(max(options["processes"], 1), len(TRANSLATED_FILES))
+        translation_options = {
+            "translator": options["translator"],
+            "workers": options["translation_workers"],
+            "rate": options["translation_rate"] / translating,
+        }
+
         # All CSV files must be in this folder
         csv_path = os.getenv("DATA_PATH")
 
-        if os.path.isfile(csv_path + "dataframe_en.csv") and os.path.isfile(
-            csv_path + "dataframe_fr.csv"
-        ):
-            print_color(f"All dataframes are here, no need to create", "green")
+        datasets = {lang: get_dataset_path(csv_path, lang) for lang in LANGUAGES}
+        dataframes = {lang: csv_path + f"dataframe_{lang}.csv" for lang in LANGUAGES}
+
+        if all(dataset_exists(path) for path in datasets.values()):
+            print_color(f"All datasets are here, no need to create", "green")
+            return
+
+        if all(os.path.isfile(path) for path in dataframes.values()):
+            # Dataframes of a previous version, only clean their texts
+            print_color(f"Converting dataframes to datasets...", "yellow")
+            for lang in LANGUAGES:
+                save_dataset(
+                    datasets[lang], *to_dataset(pd.read_csv(dataframes[lang]), lang)
+                )
+            print_color(
+                f"\nCreate 2 datasets: 'dataset_fr' and 'dataset_en' in {time.time() - START_TIME:.2f} sec",
+                "green",
+            )
             return
 
         print_color(f"Starting Clear Csv Files...", "yellow")
@@ -224,70 +333,55 @@ class Command(BaseCommand):
         # checks if all files exists
         check_files_not_exists(DATA_FILES, csv_path, START_TIME)
 
-        dataframe_fr = []
-        dataframe_en = []
-        for file in DATA_FILES:
-            print_color(f"\tClearing file: {file}")
-
-            if file == "allocine_french_review.csv":
-                df_allocine_fr, df_allocine_en = clean_allocine_reviews(csv_path + file)
-
-                dataframe_fr.append(df_allocine_fr)
-                dataframe_en.append(df_allocine_en)
-                print_color(
-                    f"End of clean_allocine_reviews after: {time.time() - START_TIME:.2f} sec",
-                    "blue",
-                )
-
-            if file == "amazon_fr_en_review.csv":
-                df_amazon_fr, df_amazon_en = clean_amazon_reviews(csv_path + file)
-
-                dataframe_fr.append(df_amazon_fr)
-                dataframe_en.append(df_amazon_en)
-                print_color(
-                    f"End of clean_amazon_reviews after: {time.time() - START_TIME:.2f} sec",
-                    "blue",
-                )
-
-            if file == "french_tweets.csv":
-                df_tweet_fr, df_tweet_en = clean_tweeter_reviews(csv_path + file)
-
-                dataframe_fr.append(df_tweet_fr)
-                dataframe_en.append(df_tweet_en)
-                print_color(
-                    f"End of clean_tweeter_reviews after: {time.time() - START_TIME:.2f} sec",
-                    "blue",
-                )
-
-            ia_files = ["chatgpt", "claude", "lechat"]
-            if any(elem in file for elem in ia_files):
-                if "fr" in file:
-                    df_chat_fr = clean_ai_reviews(csv_path + file)
-                    dataframe_fr.append(df_chat_fr)
-                else:
-                    df_chat_en = clean_ai_reviews(csv_path + file)
-                    dataframe_en.append(df_chat_en)
-                print_color(
-                    f"End of ia reviews after: {time.time() - START_TIME:.2f} sec",
-                    "blue",
-                )
-
-        df_final_fr = pd.concat(dataframe_fr)
-        df_final_en = pd.concat(dataframe_en)
-
-        print_color(
-            f"Repartition FR Positive/Negative: {df_final_fr['satisfaction'].value_counts()} ",
-            "yellow",
-        )
-        print_color(
-            f"Repartition EN Positive/Negative: {df_final_en['satisfaction'].value_counts()} ",
-            "yellow",
+        # Written next to the final files, which only appear once complete
+        outputs = {lang: path + ".part" for lang, path in dataframes.items()}
+        for output in outputs.values():
+            if os.path.isfile(output):
+                os.remove(output)
+
+        texts = {lang: [] for lang in LANGUAGES}
+        labels = {lang: [] for lang in LANGUAGES}
+
+        def save(cleaned_dataframes):
+            for lang, dataframe in zip(LANGUAGES, cleaned_dataframes):
+                if dataframe is None:
+                    continue
+                if options["export_csv"]:
+                    append_csv(dataframe, outputs[lang])
+
+                lang_texts, lang_labels = to_dataset(dataframe, lang)
+                texts[lang].extend(lang_texts)
+                labels[lang].append(lang_labels)
+
+        clean = partial(
+            clean_file,
+            csv_path=csv_path,
+            sampling=sampling,
+            translation_options=translation_options,
         )
 
-        df_final_fr.to_csv(csv_path + "dataframe_fr.csv", sep=",", index=False)
-        df_final_en.to_csv(csv_path + "dataframe_en.csv", sep=",", index=False)
+        if options["processes"] > 1:
+            with ProcessPoolExecutor(max_workers=options["processes"]) as executor:
+                # Results come back in DATA_FILES order, each one saved when ready
+                for cleaned_dataframes in executor.map(clean, DATA_FILES):
+                    save(cleaned_dataframes)
+        else:
+            for file in DATA_FILES:
+                print_color(f"\tClearing file: {file}")
+                save(clean(file))
+
+        for lang in LANGUAGES:
+            lang_labels = np.concatenate(labels[lang])
+            print_color(
+                f"Repartition {lang.upper()} Positive/Negative: {np.bincount(lang_labels)} ",
+                "yellow",
+            )
+            save_dataset(datasets[lang], texts[lang], lang_labels)
+
+            if options["export_csv"]:
+                os.replace(outputs[lang], dataframes[lang])
 
         print_color(
-            f"\nCreate 2 files: 'dataframe_fr.csv' and 'dataframe_en.csv' in {time.time() - START_TIME:.2f} sec",
+            f"\nCreate 2 datasets: 'dataset_fr' and 'dataset_en' in {time.time() - START_TIME:.2f} sec",
             "green",
         )
@@ -1,18 +1,127 @@
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 
-import joblib
-import pandas as pd
+import numpy as np
 from django.core.management.base import BaseCommand
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.model_selection import GridSearchCV, train_test_split
-from sklearn.multiclass import OneVsRestClassifier
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
-
-from .utils import clean_text_en, clean_text_fr, print_color
+from satisfactions.dataset import dataset_exists, get_dataset_path, load_dataset
+from satisfactions.registry import ModelRegistry
+from satisfactions.training import (
+    HASHING_PARAMETERS,
+    PARAMETERS,
+    CachedSearch,
+    save_pipeline,
+    split_dataset,
+)
+
+from .utils import print_color
 
 START_TIME = time.time()
+LANGUAGES = ["fr", "en"]
+LANGUAGE_NAMES = {"fr": "French", "en": "English"}
+VECTORIZERS = ["tfidf", "hashing"]
+N_FEATURES = 2**18
+
+# Options read by train_model, sent to the training processes: the others
+# (stdout, stderr...) may not be picklable
+TRAINING_OPTIONS = [
+    "vectorizer",
+    "n_features",
+    "strategy",
+    "n_iter",
+    "time_budget",
+    "n_jobs",
+]
+
+
+def build_search(options):
+    """
+    Search of the pipeline of '--vectorizer': a vocabulary, or hashed terms.
+    """
+    hashing = options["vectorizer"] == "hashing"
+    return CachedSearch(
+        HASHING_PARAMETERS if hashing else PARAMETERS,
+        n_features=options["n_features"] if hashing else None,
+        strategy=options["strategy"],
+        n_iter=options["n_iter"],
+        time_budget=options["time_budget"],
+        cv=2,
+        n_jobs=options["n_jobs"],
+        verbose=1,
+    )
+
+
+def train_model(lang, data_path, options):
+    """
+    Search the best pipeline for the reviews of 'lang', print its accuracy
+    on the test set and save it. Runs in its own process.
+    """
+    name = LANGUAGE_NAMES[lang]
+
+    # Texts are already cleaned by 'create_dataframes'
+    print_color(f"Loading {name} dataset...", "yellow")
+    X, y = load_dataset(get_dataset_path(data_path, lang))
+
+    print_color(f"Splitting {name} data...", "yellow")
+    X_train, X_test, y_train, y_test = split_dataset(X, y)
+    print_color(f"\tTrain set: {len(X_train)}, Test set: {len(X_test)}")
+
+    # Vectorizer outputs are shared by candidates, see CachedSearch
+    print_color(
+        f"Searching best {name} parameters ({options['strategy']})...", "yellow"
+    )
+    grid_search_tune = build_search(options)
+    grid_search_tune.fit(X_train, y_train)
+    print_search(grid_search_tune)
+
+    print_color(f"\n\tBest parameters set for {name} Reviews:", "blue")
+    print_color(f"\t\t{grid_search_tune.best_estimator_.steps}")
+
+    score = grid_search_tune.score(X_test, y_test)
+    print_color(f"\n\tAccuracy sur le test : {score:.4f}", "blue")
+
+    manifest = save_pipeline(
+        grid_search_tune.best_estimator_,
+        data_path,
+        lang,
+        params={
+            "vectorizer": options["vectorizer"],
+            "strategy": options["strategy"],
+            **grid_search_tune.best_params_,
+        },
+        metrics={
+            "cv_accuracy": float(grid_search_tune.best_score_),
+            "test_accuracy": float(score),
+            "train_samples": len(X_train),
+            "test_samples": len(X_test),
+        },
+    )
+
+    print_color(
+        f"\nSaving best trained {name} model, version {manifest['version']}, in {time.time() - START_TIME:.2f} sec",
+        "green",
+    )
+
+
+def print_search(search):
+    """
+    Print how the best cross validation score improved with time.
+    """
+    print_color(f"\tBest score versus time:")
+    last = None
+    for point in search.history_:
+        best_score = point["best_score"]
+        if not np.isnan(best_score) and (point["iter"], best_score) != last:
+            last = (point["iter"], best_score)
+            print_color(
+                f"\t\t{point['time']:.2f} sec, iteration {point['iter']}, "
+                f"{point['candidates']} candidates scored: {best_score:.4f}"
+            )
+    print_color(
+        f"\tSearch done in {search.search_time_:.2f} sec "
+        f"({len(search.history_)} candidates scored), "
+        f"refit in {search.refit_time_:.2f} sec"
+    )
 
 
 class Command(BaseCommand):
@@ -21,148 +130,111 @@ class Command(BaseCommand):
     to predict user satisfaction from French review text and English review text.
 
     This command:
-        - Loading and clearing files
+        - Training each missing model (or only --lang) in its own process,
+          cores are split between them
+        - Loading the cleaned datasets
         - Splitting data into training and test sets
-        - Using Pipeline to find the best params
-        - Saving models
+        - Searching the best params (exhaustive, random or successive halving,
+          optionally within a time budget), of a TF-IDF vocabulary or of
+          hashed terms (--vectorizer hashing, see compare_vectorizers)
+        - Publishing each model as a new version and activating it
+          (see model_versions to list versions and roll back)
 
     How to use it?
         Using outside of docker when services are running:
             docker compose exec api python manage.py create_models
 
         Otherwise:
-            python manage.py create_models
+            python manage.py create_models --strategy halving --time-budget 600
     """
 
     help = (
         "Train a simple AI model to classify satisfaction from French/English reviews."
     )
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--strategy",
+            choices=CachedSearch.STRATEGIES,
+            default="exhaustive",
+            help="Every candidate, some candidates drawn at random or successive halving.",
+        )
+        parser.add_argument(
+            "--n-iter",
+            type=int,
+            default=50,
+            help="Number of candidates drawn by the random strategy.",
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=None,
+            help="Seconds after which no new candidate is scored.",
+        )
+        parser.add_argument(
+            "--n-jobs",
+            type=int,
+            default=-1,
+            help="Number of processes of the searches, all cores by default.",
+        )
+        parser.add_argument(
+            "--lang",
+            choices=LANGUAGES,
+            default=None,
+            help="Only (re)train the model of this language.",
+        )
+        parser.add_argument(
+            "--vectorizer",
+            choices=VECTORIZERS,
+            default="tfidf",
+            help="TF-IDF with a vocabulary, or of hashed terms (no vocabulary).",
+        )
+        parser.add_argument(
+            "--n-features",
+            type=int,
+            default=N_FEATURES,
+            help="Number of columns terms are hashed to, with --vectorizer hashing.",
+        )
+
     def handle(self, *args, **options):
         # All files must be in this folder
         data_path = os.getenv("DATA_PATH")
 
-        if not os.path.isfile(data_path + "dataframe_en.csv") and not os.path.isfile(
-            data_path + "dataframe_fr.csv"
+        if options["lang"]:
+            # Retrain this language even if its model exists
+            languages = [options["lang"]]
+        else:
+            languages = [
+                lang
+                for lang in LANGUAGES
+                if not ModelRegistry(data_path).is_available(lang)
+            ]
+
+        if not all(
+            dataset_exists(get_dataset_path(data_path, lang)) for lang in languages
         ):
-            print_color(f"Dataframes are not present, you need to create them", "red")
+            print_color(f"Datasets are not present, you need to create them", "red")
             return
 
-        if not os.path.isfile(data_path + "model_ia_fr.pkl"):
-            # First: French reviews.
-            print_color(f"Loading French DF...", "yellow")
-            df_fr = pd.read_csv(data_path + "dataframe_fr.csv")
-
-            # clear french reviews
-            print_color(f"Clearing french reviews...", "yellow")
-            df_fr["review"] = df_fr["review"].astype(str).apply(clean_text_fr)
-
-            y = df_fr["satisfaction"]
-            X = df_fr["review"]
-
-            print_color(f"Splitting data...", "yellow")
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=48
-            )
-            print_color(f"\tTrain set: {X_train.shape}, Train Set: {X_test.shape}")
-
-            print_color(f"Buildind pipeline...", "yellow")
-            pipeline = Pipeline(
-                [
-                    ("tfidf", TfidfVectorizer()),
-                    (
-                        "clf",
-                        OneVsRestClassifier(
-                            MultinomialNB(fit_prior=True, class_prior=None)
-                        ),
-                    ),
-                ]
-            )
-            parameters = {
-                # TF-IDF
-                "tfidf__max_df": [0.25, 0.5, 0.75, 1.0],
-                "tfidf__min_df": [1, 2, 5],
-                "tfidf__ngram_range": [(1, 1), (1, 2), (1, 3)],
-                "tfidf__sublinear_tf": [True, False],
-                # MultinomialNB
-                "clf__estimator__alpha": [1e-2, 1e-3, 1e-1],
-                "clf__estimator__fit_prior": [True, False],
-            }
-
-            grid_search_tune = GridSearchCV(
-                pipeline, parameters, cv=2, n_jobs=2, verbose=1
-            )
-            grid_search_tune.fit(X_train, y_train)
-
-            print_color(f"\n\tBest parameters set for French Reviews:", "blue")
-            print_color(f"\t\t{grid_search_tune.best_estimator_.steps}")
-
-            score = grid_search_tune.score(X_test, y_test)
-            print_color(f"\n\tAccuracy sur le test : {score:.4f}", "blue")
-
-            joblib.dump(grid_search_tune.best_estimator_, data_path + "model_ia_fr.pkl")
-
-            print_color(
-                f"\nSaving best trained french model model_ia_fr.pkl in {time.time() - START_TIME:.2f} sec",
-                "green",
-            )
-            time.sleep(2)
-
-        if not os.path.isfile(data_path + "model_ia_en.pkl"):
-            # SECOND: English Reviews
-            print_color(f"Loading English DF...", "yellow")
-            df_en = pd.read_csv(data_path + "dataframe_en.csv")
-
-            # clear enflgish reviews
-            print_color(f"clearing english reviews...", "yellow")
-            df_en["en"] = df_en["en"].astype(str).apply(clean_text_en)
-
-            y = df_en["satisfaction"]
-            X = df_en["en"]
-
-            print_color(f"Splitting data...", "yellow")
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=48
-            )
-            print_color(f"\tTrain set: {X_train.shape}, Train Set: {X_test.shape}")
-
-            print_color(f"Buildind pipeline...", "yellow")
-            pipeline = Pipeline(
-                [
-                    ("tfidf", TfidfVectorizer()),
-                    (
-                        "clf",
-                        OneVsRestClassifier(
-                            MultinomialNB(fit_prior=True, class_prior=None)
-                        ),
-                    ),
-                ]
-            )
-            parameters = {
-                # TF-IDF
-                "tfidf__max_df": [0.25, 0.5, 0.75, 1.0],
-                "tfidf__min_df": [1, 2, 5],
-                "tfidf__ngram_range": [(1, 1), (1, 2), (1, 3)],
-                "tfidf__sublinear_tf": [True, False],
-                # MultinomialNB
-                "clf__estimator__alpha": [1e-2, 1e-3, 1e-1],
-                "clf__estimator__fit_prior": [True, False],
-            }
-
-            grid_search_tune = GridSearchCV(
-                pipeline, parameters, cv=2, n_jobs=2, verbose=1
-            )
-            grid_search_tune.fit(X_train, y_train)
-
-            print_color(f"\n\tBest parameters set for English Reviews:", "blue")
-            print_color(f"\t\t{grid_search_tune.best_estimator_.steps}")
+        if not languages:
+            print_color(f"All models are here, no need to train", "green")
+            return
 
-            score = grid_search_tune.score(X_test, y_test)
-            print_color(f"\n\tAccuracy sur le test : {score:.4f}", "blue")
+        # Cores are split between the languages trained at the same time
+        n_jobs = os.cpu_count() if options["n_jobs"] == -1 else options["n_jobs"]
+        options = {
+            **{name: options[name] for name in TRAINING_OPTIONS},
+            "n_jobs": max(1, n_jobs // len(languages)),
+        }
 
-            joblib.dump(grid_search_tune.best_estimator_, data_path + "model_ia_en.pkl")
+        if len(languages) == 1:
+            train_model(languages[0], data_path, options)
+            return
 
-            print_color(
-                f"\nSaving best trained English model model_ia_en.pkl in {time.time() - START_TIME:.2f} sec",
-                "green",
-            )
+        with ProcessPoolExecutor(max_workers=len(languages)) as executor:
+            futures = [
+                executor.submit(train_model, lang, data_path, options)
+                for lang in languages
+            ]
+            for future in futures:
+                future.result()
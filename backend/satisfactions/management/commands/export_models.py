@@ -0,0 +1,83 @@
+import os
+import time
+
+import joblib
+from django.core.management.base import BaseCommand
+from satisfactions.compact import CompactPipeline, export_pipeline
+from satisfactions.registry import AVAILABLE_LANGUAGES, registry
+
+from .utils import print_color
+
+
+def get_size(path):
+    """
+    Size in bytes of a file or of all files in a folder.
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, file)) for file in os.listdir(path))
+
+
+class Command(BaseCommand):
+    """
+    Django management command to export the trained pickles to the compact format:
+    a sorted string table for the vocabulary and raw '.npy' arrays,
+    memory-mapped by every worker instead of unpickled.
+
+    Versions published by create_models are already exported (see
+    artifacts.py): this command is for the legacy model_ia_<lang>.pkl.
+
+    This command:
+        - Loading each pickle
+        - Writing its export in DATA_PATH/model_ia_<lang>/
+        - Printing load time and size of both formats
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py export_models
+
+        Otherwise:
+            python manage.py export_models
+    """
+
+    help = "Export the trained models to a compact, memory-mappable format."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lang",
+            choices=AVAILABLE_LANGUAGES,
+            help="Export only this language.",
+        )
+
+    def handle(self, *args, **options):
+        languages = [options["lang"]] if options["lang"] else AVAILABLE_LANGUAGES
+
+        for lang in languages:
+            model_path = registry.get_model_path(lang)
+            export_path = registry.get_export_path(lang)
+
+            if not os.path.isfile(model_path):
+                print_color(f"No model for '{lang}', nothing to export", "red")
+                continue
+
+            start_time = time.perf_counter()
+            pipeline = joblib.load(model_path)
+            pickle_time = time.perf_counter() - start_time
+
+            try:
+                export_pipeline(pipeline, export_path)
+            except ValueError as error:
+                print_color(f"Model '{lang}' kept as a pickle: {error}", "yellow")
+                continue
+
+            start_time = time.perf_counter()
+            CompactPipeline(export_path)
+            export_time = time.perf_counter() - start_time
+
+            print_color(f"\nExported model '{lang}' to {export_path}", "green")
+            print_color(
+                f"\tPickle: {get_size(model_path)} bytes, loaded in {pickle_time:.4f} sec"
+            )
+            print_color(
+                f"\tExport: {get_size(export_path)} bytes, loaded in {export_time:.4f} sec"
+            )
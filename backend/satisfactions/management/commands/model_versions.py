@@ -0,0 +1,103 @@
+import os
+
+import joblib
+from django.core.management.base import BaseCommand, CommandError
+from satisfactions.artifacts import ArtifactError, ArtifactStore
+from satisfactions.registry import AVAILABLE_LANGUAGES, ModelRegistry
+
+from .utils import print_color
+
+
+class Command(BaseCommand):
+    """
+    Django management command to list, activate and roll back the versions
+    of the models (see artifacts.py).
+
+    This command:
+        - Listing the versions of each language with their metrics,
+          the active one is marked with '*'
+        - With --activate, serving a version after checking its files
+        - With --rollback, serving again the version active before
+        - With --import-legacy, publishing model_ia_<lang>.pkl as a version
+        - Running workers serve the activated version from their next request
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py model_versions
+
+        Otherwise:
+            python manage.py model_versions --lang fr --rollback
+    """
+
+    help = "List, activate and roll back the versions of the models."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lang", choices=AVAILABLE_LANGUAGES, default=None)
+        actions = parser.add_mutually_exclusive_group()
+        actions.add_argument(
+            "--activate",
+            metavar="VERSION",
+            default=None,
+            help="Serve this version of the model of --lang.",
+        )
+        actions.add_argument(
+            "--rollback",
+            action="store_true",
+            help="Serve again the version active before the current one.",
+        )
+        actions.add_argument(
+            "--import-legacy",
+            action="store_true",
+            help="Publish model_ia_<lang>.pkl as a new active version.",
+        )
+
+    def handle(self, *args, **options):
+        data_path = os.getenv("DATA_PATH")
+        store = ArtifactStore(data_path)
+        languages = [options["lang"]] if options["lang"] else AVAILABLE_LANGUAGES
+
+        if (options["activate"] or options["rollback"]) and not options["lang"]:
+            raise CommandError("--activate and --rollback need --lang.")
+
+        try:
+            if options["activate"]:
+                store.activate(options["lang"], options["activate"])
+                print_color(f"Version {options['activate']} activated", "green")
+            elif options["rollback"]:
+                version = store.rollback(options["lang"])
+                print_color(f"Rolled back to version {version}", "green")
+            elif options["import_legacy"]:
+                for lang in languages:
+                    self.import_legacy(store, data_path, lang)
+        except ArtifactError as error:
+            raise CommandError(error)
+
+        for lang in languages:
+            self.print_versions(store, lang)
+
+    def import_legacy(self, store, data_path, lang):
+        model_path = ModelRegistry(data_path).get_model_path(lang)
+        if not os.path.isfile(model_path):
+            print_color(f"No legacy model for '{lang}'", "yellow")
+            return
+
+        manifest = store.publish(
+            joblib.load(model_path),
+            lang,
+            params={"source": os.path.basename(model_path)},
+        )
+        print_color(f"Legacy '{lang}' model is version {manifest['version']}", "green")
+
+    def print_versions(self, store, lang):
+        active = store.get_active_version(lang)
+        versions = store.list_versions(lang)
+
+        print_color(f"\nModel '{lang}': {len(versions)} versions", "blue")
+        for version in versions:
+            manifest = store.get_manifest(lang, version)
+            accuracy = manifest["metrics"].get("test_accuracy")
+            print_color(
+                f"\t{'*' if version == active else ' '} {version}"
+                f"  {manifest['format']:<7}"
+                + (f"  test accuracy {accuracy:.4f}" if accuracy is not None else "")
+            )
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from satisfactions.stats import rebuild_rollups
+
+from .utils import print_color
+
+
+class Command(BaseCommand):
+    """
+    Django management command to compute again the rollups served by the
+    satisfaction stats (see stats.py) from the satisfactions.
+
+    This command:
+        - Counting the scored satisfactions by day and week, language and cohort
+        - Replacing every rollup in a single transaction
+        - Needed once after the migration creating the rollups, or after
+          polarities were changed outside of the API
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py rebuild_stats
+
+        Otherwise:
+            python manage.py rebuild_stats
+    """
+
+    help = "Compute again the rollups of the satisfaction stats."
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        print_color("Rebuilding satisfaction stats...", "yellow")
+
+        count = rebuild_rollups()
+
+        print_color(
+            f"{count} rollups saved in {time.time() - start_time:.2f}s", "green"
+        )
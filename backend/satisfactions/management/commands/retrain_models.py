@@ -0,0 +1,128 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from satisfactions.dataset import dataset_exists, get_dataset_path, load_dataset
+from satisfactions.online import (
+    OnlineModel,
+    get_learnable,
+    get_training_rows,
+    mark_learned,
+)
+from satisfactions.registry import AVAILABLE_LANGUAGES
+from satisfactions.training import save_pipeline
+
+from .utils import print_color
+
+
+class Command(BaseCommand):
+    """
+    Django management command to update the online models with the
+    satisfactions saved since the last run, without reading the datasets again.
+
+    This command:
+        - Loading the online model of each language (the first time, creating
+          it from the cleaned dataset)
+        - Streaming the scored satisfactions not learned yet by chunks
+        - Learning them with partial_fit, with the admin corrections
+        - Saving the model, then marking the satisfactions as learned
+        - With --publish, serving it in place of the model of 'create_models'
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py retrain_models
+
+        Otherwise:
+            python manage.py retrain_models --lang fr --chunk-size 1000
+    """
+
+    help = "Update the online models with the new satisfactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lang", choices=AVAILABLE_LANGUAGES, default=None)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of satisfactions read and learned at once.",
+        )
+        parser.add_argument(
+            "--corrected-only",
+            action="store_true",
+            help="Only learn satisfactions whose polarity was corrected by an admin.",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Create the online model again, from the dataset and every satisfaction.",
+        )
+        parser.add_argument(
+            "--publish",
+            action="store_true",
+            help="Replace the model used by the API with the online model.",
+        )
+
+    def handle(self, *args, **options):
+        data_path = os.getenv("DATA_PATH")
+        languages = [options["lang"]] if options["lang"] else AVAILABLE_LANGUAGES
+
+        for lang in languages:
+            start_time = time.time()
+            model = OnlineModel(data_path, lang)
+            created = options["reset"] or not model.exists()
+
+            if created:
+                model.create()
+                dataset_path = get_dataset_path(data_path, lang)
+                if dataset_exists(dataset_path):
+                    print_color(f"Creating '{lang}' online model from {dataset_path}")
+                    texts, labels = load_dataset(dataset_path)
+                    for start in range(0, len(texts), options["chunk_size"]):
+                        end = start + options["chunk_size"]
+                        model.partial_fit(texts[start:end], labels[start:end])
+            else:
+                model.load()
+                # Id watermark of the previous versions: rows below were learned
+                last_id = model.state.pop("last_id", None)
+                if last_id is not None:
+                    get_learnable(lang).filter(
+                        id__lte=last_id, learned_at__isnull=True
+                    ).update(learned_at=timezone.now())
+
+            learned_rows = []
+            for rows in get_training_rows(
+                lang,
+                options["chunk_size"],
+                options["corrected_only"],
+                learned=created,
+            ):
+                if rows:
+                    ids, texts, labels = zip(*rows)
+                    model.partial_fit(texts, labels)
+                    learned_rows.extend(zip(ids, labels))
+            learned = len(learned_rows)
+
+            if not created and not learned:
+                print_color(f"No new satisfaction for '{lang}'", "yellow")
+            else:
+                model.save()
+                mark_learned(learned_rows, options["chunk_size"])
+                print_color(
+                    f"Online model '{lang}' learned {learned} new satisfactions "
+                    f"({model.state['samples']} samples in total) in {time.time() - start_time:.2f} sec",
+                    "green",
+                )
+
+            if options["publish"] and model.state["samples"]:
+                manifest = save_pipeline(
+                    model.pipeline,
+                    data_path,
+                    lang,
+                    params={"online": True},
+                    metrics=model.state,
+                )
+                print_color(
+                    f"Online model '{lang}' published, version {manifest['version']}",
+                    "green",
+                )
@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from satisfactions.cache import prediction_cache
+from satisfactions.scoring import (
+    process_pending,
+    requeue_processing,
+    requeue_uncertain,
+)
+
+from .utils import print_color
+
+logger = logging.getLogger("satisfactions")
+
+
+class Command(BaseCommand):
+    """
+    Django management command to score pending satisfactions in the background,
+    used when SATISFACTION_ASYNC_SCORING is enabled.
+
+    This command:
+        - Requeuing satisfactions left processing by a stopped worker for
+          more than SATISFACTION_CLAIM_TIMEOUT, and with --uncertain those
+          scored with a low confidence
+        - Starting a pool of worker threads
+        - Each worker claims micro-batches of pending satisfactions,
+          predicts their polarity and writes it back with a bulk update
+
+    How to use it?
+        Using outside of docker when services are running:
+            docker compose exec api python manage.py score_satisfactions
+
+        Otherwise:
+            python manage.py score_satisfactions --workers 2 --batch-size 64
+    """
+
+    help = "Score pending satisfactions in the background."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=1, help="Number of worker threads."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=64,
+            help="Maximum number of satisfactions scored at once.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Stop once every pending satisfaction was tried.",
+        )
+        parser.add_argument(
+            "--uncertain",
+            action="store_true",
+            help="Score again the uncertain satisfactions (e.g. with a new model).",
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_processing()
+        if requeued:
+            print_color(f"Requeued {requeued} satisfactions", "yellow")
+
+        if options["uncertain"]:
+            requeued = requeue_uncertain()
+            print_color(f"Requeued {requeued} uncertain satisfactions", "yellow")
+
+        print_color(f"Starting {options['workers']} scoring workers...", "yellow")
+
+        self.processed = 0
+        self.lock = threading.Lock()
+        # With --once, each satisfaction is tried once: deferred ones (model
+        # missing) are left to the next run
+        self.started_at = timezone.now() if options["once"] else None
+
+        threads = [
+            threading.Thread(target=self.work, args=(options,), daemon=True)
+            for _ in range(options["workers"])
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            print_color("Stopping workers.", "red")
+
+        print_color(f"Scored {self.processed} satisfactions", "green")
+
+        stats = prediction_cache.stats()
+        print_color(
+            f"\tPrediction cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.1%}), {stats['size']} predictions kept"
+        )
+
+    def work(self, options):
+        """
+        Loop of one worker thread.
+        """
+        try:
+            while True:
+                try:
+                    claimed, processed = process_pending(
+                        options["batch_size"], self.started_at
+                    )
+                except DatabaseError as error:
+                    # e.g. lock timeout: the batch is back in the queue, retry later
+                    logger.warning(f"Scoring batch failed: {error}")
+                    time.sleep(options["interval"])
+                    continue
+                except Exception:
+                    # e.g. a model which can not be loaded: keep the worker
+                    # alive, the batch is retried after SATISFACTION_RETRY_DELAY
+                    logger.exception("Scoring batch failed")
+                    time.sleep(options["interval"])
+                    continue
+
+                with self.lock:
+                    self.processed += processed
+
+                if not claimed:
+                    # Claims of a worker stopped meanwhile (e.g. rolling restart)
+                    if requeue_processing():
+                        continue
+                    if options["once"]:
+                        return
+                    time.sleep(options["interval"])
+        finally:
+            # Each thread has its own database connection
+            connection.close()
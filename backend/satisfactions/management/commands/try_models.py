@@ -1,8 +1,8 @@
-import os
 import time
 
-import joblib
 from django.core.management.base import BaseCommand
+from satisfactions.registry import registry
+from satisfactions.text import clean_texts
 
 from .utils import print_color
 
@@ -30,16 +30,9 @@ class Command(BaseCommand):
     help = "Test the AI satisfaction classification model."
 
     def handle(self, *args, **options):
-        # All models must be in this folder
-        data_path = os.getenv("DATA_PATH")
-
-        is_fr_model = True
-        is_en_model = True
-
-        if not os.path.isfile(data_path + "model_ia_fr.pkl"):
-            is_fr_model = False
-        if not os.path.isfile(data_path + "model_ia_en.pkl"):
-            is_en_model = False
+        # Models are loaded through the same registry as the API
+        is_fr_model = registry.is_available("fr")
+        is_en_model = registry.is_available("en")
 
         if is_fr_model and is_en_model:
             lang = (
@@ -57,11 +50,7 @@ class Command(BaseCommand):
             print_color(f"\nNo models are present, end of the command.", "red")
             return
 
-        if lang == "fr":
-            model_charge = joblib.load(data_path + "./model_ia_fr.pkl")
-
-        if lang == "en":
-            model_charge = joblib.load(data_path + "./model_ia_en.pkl")
+        model_charge = registry.get(lang)
         print_color(
             f"\tLoaded model '{lang}' successfully! Type 'exit' to quit.", "green"
         )
@@ -75,7 +64,7 @@ class Command(BaseCommand):
                 break
 
             # Prediction using model
-            prediction = model_charge.predict([text.lower()])
+            prediction = model_charge.predict(clean_texts(lang, [text]))
             sentiment = "positive" if prediction[0] == 1 else "negative"
 
             print_color(f"\tOur prediction: {prediction[0]} ==> {sentiment}", "green")
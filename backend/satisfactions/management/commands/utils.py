@@ -1,7 +1,12 @@
+import hashlib
 import os
-import re
+import sqlite3
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import numpy as np
+import pandas as pd
 from deep_translator import GoogleTranslator
 
 
@@ -24,47 +29,276 @@ def exit_with_error(error, start_time):
     exit()
 
 
-def clean_text_fr(text):
-    text = text.lower()
-    text = re.sub(r"[^a-zàâçéèêëîïôûùüÿñæœ\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+class GoogleTranslatorBackend:
+    """
+    Translate with Google Translate through deep_translator.
+    """
+
+    def translate(self, text, src_lang, dest_lang):
+        return GoogleTranslator(source=src_lang, target=dest_lang).translate(text)
+
+
+class StubTranslatorBackend:
+    """
+    Local translator for tests and benchmarks: no network, prefixes the text
+    with the destination language.
+    """
+
+    def translate(self, text, src_lang, dest_lang):
+        return f"[{dest_lang}] {text}"
+
+
+TRANSLATORS = {
+    "google": GoogleTranslatorBackend,
+    "stub": StubTranslatorBackend,
+}
+
+
+class TranslationCache:
+    """
+    On-disk cache of translations, keyed by (source text hash, src, dest).
+    Each translation is committed as soon as it is known, so an interrupted
+    run keeps everything already translated.
+    Several processes can share the file: they wait 'timeout' seconds for
+    each other's writes, then retry 'retries' times with a backoff.
+    """
+
+    def __init__(self, path, timeout=30, retries=3):
+        self.lock = threading.Lock()
+        self.retries = retries
+        self.connection = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False
+        )
+        self.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "text_hash TEXT, src TEXT, dest TEXT, translation TEXT, "
+            "PRIMARY KEY (text_hash, src, dest))",
+            commit=True,
+        )
+
+    @staticmethod
+    def get_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def execute(self, sql, params=(), commit=False):
+        """
+        First row of 'sql', retried while another process locks the file.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                with self.lock:
+                    try:
+                        row = self.connection.execute(sql, params).fetchone()
+                        if commit:
+                            self.connection.commit()
+                        return row
+                    except sqlite3.OperationalError:
+                        self.connection.rollback()
+                        raise
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or attempt == self.retries:
+                    raise
+                time.sleep(0.5 * 2**attempt)
+
+    def get(self, text, src_lang, dest_lang):
+        row = self.execute(
+            "SELECT translation FROM translations "
+            "WHERE text_hash = ? AND src = ? AND dest = ?",
+            (self.get_hash(text), src_lang, dest_lang),
+        )
+        return row[0] if row else None
+
+    def set(self, text, src_lang, dest_lang, translation):
+        """
+        Store 'translation', unless it is empty: translated again next run.
+        """
+        if not translation:
+            return
+        self.execute(
+            "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+            (self.get_hash(text), src_lang, dest_lang, translation),
+            commit=True,
+        )
+
+    def close(self):
+        self.connection.close()
+
+
+class RateLimiter:
+    """
+    Allow at most 'rate' calls per second, shared by all threads of the
+    process. Processes calling the same API must split the rate between them.
+    """
 
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_call = time.monotonic()
 
-def clean_text_en(text):
-    text = text.lower()
-    text = re.sub(r"[^a-z\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
 
 
-def get_translations(data, src_lang, dest_lang):
+def translate_with_retry(translator, limiter, text, src_lang, dest_lang, retries):
+    """
+    Translate 'text', retrying with an exponential backoff.
+    Raises the last error if every attempt failed.
+    """
+    for attempt in range(retries + 1):
+        limiter.wait()
+        try:
+            return translator.translate(text, src_lang, dest_lang)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(0.5 * 2**attempt)
+
+
+def get_translations(
+    data,
+    src_lang,
+    dest_lang,
+    translator="google",
+    workers=4,
+    rate=10,
+    retries=3,
+    cache_path=None,
+):
     """
     Translate string from 'src_lang' to 'dest_lang'
-    Could take a long time.
+    Could take a long time:
+        - only texts missing from the cache are translated
+        - 'workers' threads translate at most 'rate' texts per second, in
+          this process only
+        - failed translations are retried 'retries' times, then left empty
+        - translations are kept when the cache fails to store them
 
     Returns translations
     """
-    translations = []
-    translator = GoogleTranslator(source=src_lang, target=dest_lang)
+    if cache_path is None:
+        cache_path = os.getenv("DATA_PATH") + "translations_cache.sqlite3"
+
+    texts = ["" if pd.isna(text) else str(text) for text in data["review"]]
+    cache = TranslationCache(cache_path)
+    backend = TRANSLATORS[translator]()
+    limiter = RateLimiter(rate)
 
-    for i, text in enumerate(data["review"]):
+    translations = {}
+    missing = []
+    for text in set(texts):
+        if not text:
+            translations[text] = ""
+            continue
+        translation = cache.get(text, src_lang, dest_lang)
+        if translation is None:
+            missing.append(text)
+        else:
+            translations[text] = translation
+
+    print(f"\t\t{len(texts) - len(missing)}/{len(texts)} translations found in cache")
+
+    def translate(text):
+        translation = (
+            translate_with_retry(backend, limiter, text, src_lang, dest_lang, retries)
+            or ""
+        )
         try:
-            if not text:
-                translations.append("")
-                continue
+            cache.set(text, src_lang, dest_lang, translation)
+        except sqlite3.OperationalError as e:
+            print(f"\n[Cache error] {e} — text: {text}")
+        return translation
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(translate, text): text for text in missing}
+
+        for i, future in enumerate(as_completed(futures)):
+            text = futures[future]
+            try:
+                translations[text] = future.result()
+            except Exception as e:
+                print(f"\n[Error] {e} — text: {text}")
+                translations[text] = ""
+
+            print(f"\t\tTranslating ... {i+1}/{len(missing)}", end="\r")
+
+    cache.close()
+
+    return [translations[text] for text in texts]
+
+
+def get_quotas(counts, sample_size):
+    """
+    Split 'sample_size' evenly between the values of 'counts' (rows available
+    by value): the remainder goes to the values with the most rows, and so do
+    the rows missing from values with too few of them.
+
+    Returns the number of rows to keep by value
+    """
+    quotas = {}
+    remaining = sample_size
+    # Smallest values first: what they can not take is left to the others
+    values = sorted(counts.items(), key=lambda item: (item[1], str(item[0])))
+    for position, (value, count) in enumerate(values):
+        quotas[value] = min(count, remaining // (len(values) - position))
+        remaining -= quotas[value]
+    return quotas
+
+
+def sample_csv(
+    path_file,
+    usecols,
+    dtype,
+    sample_size,
+    chunk_size,
+    stratify=None,
+    prepare=None,
+    seed=42,
+):
+    """
+    Read 'path_file' by chunks of 'chunk_size' rows and keep a uniform random
+    sample of 'sample_size' rows, so memory never exceeds one chunk plus the
+    sample whatever the size of the file.
+    Each row gets a random key and the sample is made of the smallest keys
+    (reservoir sampling). With 'stratify', the sample is split evenly between
+    the values of this column (see get_quotas).
+    'prepare' is applied to each chunk before sampling (rename, labels...).
+
+    Returns the sample in file order
+    """
+    rng = np.random.default_rng(seed)
+    reservoir = None
+
+    for chunk in pd.read_csv(
+        path_file, usecols=usecols, dtype=dtype, chunksize=chunk_size
+    ):
+        if prepare:
+            chunk = prepare(chunk)
+        chunk["_key"] = rng.random(len(chunk))
+        if reservoir is not None:
+            chunk = pd.concat([reservoir, chunk])
 
-            translated = translator.translate(text)
-            translations.append(translated)
+        chunk = chunk.sort_values("_key")
+        if stratify:
+            # Keep up to 'sample_size' rows per value, quotas are known at the end
+            reservoir = chunk.groupby(stratify).head(sample_size)
+        else:
+            reservoir = chunk.head(sample_size)
 
-            print(f"\t\tTranslating ... {i+1}/{len(data)}", end="\r")
-            time.sleep(0.1)
+    if reservoir is None:
+        raise ValueError(f"No rows in {path_file}")
 
-        except Exception as e:
-            print(f"\n[Error at ligne {i}] {e} — text: {text}")
-            translations.append("")
+    if stratify:
+        quotas = get_quotas(reservoir[stratify].value_counts(), sample_size)
+        reservoir = reservoir[
+            reservoir.groupby(stratify).cumcount() < reservoir[stratify].map(quotas)
+        ]
 
-    return translations
+    return reservoir.sort_index().drop(columns="_key")
 
 
 def check_files_not_exists(list_files, path, start_time):
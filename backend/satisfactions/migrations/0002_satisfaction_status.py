@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("satisfactions", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="satisfaction",
+            name="language",
+            field=models.CharField(blank=True, max_length=2),
+        ),
+        migrations.AddField(
+            model_name="satisfaction",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("scored", "Scored"),
+                    ("rejected", "Rejected"),
+                ],
+                db_index=True,
+                default="scored",
+                max_length=10,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="satisfaction",
+            name="polarity",
+            field=models.BooleanField(null=True),
+        ),
+    ]
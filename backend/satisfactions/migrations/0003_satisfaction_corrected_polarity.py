@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("satisfactions", "0002_satisfaction_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="satisfaction",
+            name="corrected_polarity",
+            field=models.BooleanField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("satisfactions", "0003_satisfaction_corrected_polarity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="satisfaction",
+            name="confidence",
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="satisfaction",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("scored", "Scored"),
+                    ("uncertain", "Uncertain"),
+                    ("rejected", "Rejected"),
+                ],
+                db_index=True,
+                default="scored",
+                max_length=10,
+            ),
+        ),
+    ]
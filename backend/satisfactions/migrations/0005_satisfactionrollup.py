@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("satisfactions", "0004_satisfaction_confidence"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SatisfactionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("day", "Day"), ("week", "Week")], max_length=4
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("language", models.CharField(max_length=2)),
+                ("cohort", models.CharField(max_length=7)),
+                ("positive", models.IntegerField(default=0)),
+                ("negative", models.IntegerField(default=0)),
+                ("uncertain", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="satisfaction",
+            index=models.Index(
+                fields=["created_at", "polarity"], name="satisfaction_created_polarity"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="satisfactionrollup",
+            constraint=models.UniqueConstraint(
+                fields=("period", "period_start", "language", "cohort"),
+                name="unique_satisfaction_rollup",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("satisfactions", "0005_satisfactionrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="satisfaction",
+            index=models.Index(
+                fields=["user", "created_at"], name="satisfaction_user_created"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("satisfactions", "0006_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="satisfaction",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
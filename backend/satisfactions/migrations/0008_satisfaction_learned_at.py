@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("satisfactions", "0007_satisfaction_claimed_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="satisfaction",
+            name="learned_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="satisfaction",
+            index=models.Index(
+                fields=["language", "learned_at"], name="satisfaction_lang_learned"
+            ),
+        ),
+    ]
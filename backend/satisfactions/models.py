@@ -10,16 +10,93 @@ class Satisfaction(models.Model):
     Model to represent a satisfaction form sent by user.
     """
 
+    class Status(models.TextChoices):
+        """
+        Scoring state of the comment, used as a queue when scoring is asynchronous.
+        """
+
+        PENDING = "pending"
+        PROCESSING = "processing"
+        SCORED = "scored"
+        # Scored with a confidence below SATISFACTION_UNCERTAINTY_THRESHOLD
+        UNCERTAIN = "uncertain"
+        REJECTED = "rejected"
+
     email = models.EmailField()
     last_name = models.CharField(max_length=50)
     first_name = models.CharField(max_length=50)
     description = models.TextField(max_length=500)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(default=timezone.now)
-    polarity = models.BooleanField()
+    polarity = models.BooleanField(null=True)
+    # Probability of the predicted polarity, between 0.5 and 1
+    confidence = models.FloatField(null=True, blank=True, db_index=True)
+    # Set by an admin when the predicted polarity is wrong, preferred for training
+    corrected_polarity = models.BooleanField(null=True, blank=True)
+    language = models.CharField(max_length=2, blank=True)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.SCORED, db_index=True
+    )
+    # Last time a scoring worker claimed it (see scoring.claim_pending)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    # When the online model learned it (see online.py)
+    learned_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Date range scans of the stats (see stats.py)
+            models.Index(
+                fields=["created_at", "polarity"], name="satisfaction_created_polarity"
+            ),
+            # Satisfactions of a user, newest first
+            models.Index(
+                fields=["user", "created_at"], name="satisfaction_user_created"
+            ),
+            # Satisfactions not learned yet by the online model of a language
+            models.Index(
+                fields=["language", "learned_at"], name="satisfaction_lang_learned"
+            ),
+        ]
 
     def __str__(self):
         """
         Display, first and last name of the user and created_at date.
         """
         return f"Satisfaction Form: {self.first_name} {self.last_name} sent a satisfaction comment on {self.created_at}."
+
+
+class SatisfactionRollup(models.Model):
+    """
+    Number of scored satisfactions by period, language and user cohort,
+    updated with each scored batch (see stats.py) so the stats never scan
+    the satisfactions.
+    """
+
+    class Period(models.TextChoices):
+        DAY = "day"
+        # Weeks start on Monday
+        WEEK = "week"
+
+    period = models.CharField(max_length=4, choices=Period.choices)
+    period_start = models.DateField()
+    language = models.CharField(max_length=2)
+    # Month the author signed up, e.g. '2025-01'
+    cohort = models.CharField(max_length=7)
+    positive = models.IntegerField(default=0)
+    negative = models.IntegerField(default=0)
+    # Part of positive and negative scored with a low confidence
+    uncertain = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "period_start", "language", "cohort"],
+                name="unique_satisfaction_rollup",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"Satisfactions of the {self.period} {self.period_start} "
+            f"({self.language}, {self.cohort}): +{self.positive} -{self.negative}"
+        )
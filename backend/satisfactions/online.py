@@ -0,0 +1,164 @@
+import json
+import os
+import tempfile
+from itertools import islice
+
+import joblib
+import numpy as np
+from django.db.models import Q
+from django.utils import timezone
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from .models import Satisfaction
+from .text import clean_texts
+
+CLASSES = np.array([0, 1])
+
+
+def build_online_pipeline(n_features=2**20):
+    """
+    Pipeline which can learn by batches: the hashing vectorizer has no
+    vocabulary to fit and MultinomialNB supports partial_fit.
+    """
+    return Pipeline(
+        [
+            (
+                "hashing",
+                HashingVectorizer(
+                    n_features=n_features, ngram_range=(1, 2), alternate_sign=False
+                ),
+            ),
+            ("clf", MultinomialNB(alpha=0.01)),
+        ]
+    )
+
+
+def write_atomic(path, write):
+    """
+    Call write(file) on a temporary file, then rename it to 'path'.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=".online-"
+    )
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class OnlineModel:
+    """
+    Sentiment model of one language updated with new satisfactions only.
+    Saved in 'data_path':
+        - model_ia_<lang>_online.pkl: the pipeline
+        - model_ia_<lang>_online.json: number of samples seen
+    Learned satisfactions are marked with 'learned_at' (see mark_learned).
+    """
+
+    def __init__(self, data_path, lang):
+        self.lang = lang
+        self.model_path = os.path.join(data_path, f"model_ia_{lang}_online.pkl")
+        self.state_path = os.path.join(data_path, f"model_ia_{lang}_online.json")
+        self.pipeline = None
+        self.state = {"samples": 0}
+
+    def exists(self):
+        return os.path.isfile(self.model_path) and os.path.isfile(self.state_path)
+
+    def load(self):
+        self.pipeline = joblib.load(self.model_path)
+        with open(self.state_path) as file:
+            self.state = json.load(file)
+        return self
+
+    def create(self):
+        self.pipeline = build_online_pipeline()
+        self.state = {"samples": 0}
+        return self
+
+    def partial_fit(self, texts, labels):
+        """
+        Learn a batch of raw texts, cleaned like every other model input.
+        """
+        vectorizer, classifier = [step for _, step in self.pipeline.steps]
+        X = vectorizer.transform(clean_texts(self.lang, texts))
+        classifier.partial_fit(X, np.asarray(labels, dtype=int), classes=CLASSES)
+        self.state["samples"] += len(labels)
+
+    def save(self):
+        """
+        Write the pipeline then the watermark, each one atomically.
+        """
+        write_atomic(self.model_path, lambda file: joblib.dump(self.pipeline, file))
+        write_atomic(
+            self.state_path, lambda file: file.write(json.dumps(self.state).encode())
+        )
+
+
+def get_learnable(lang):
+    """
+    Satisfactions of 'lang' which can be learned: scored ones, and uncertain
+    ones once corrected.
+    """
+    return Satisfaction.objects.filter(
+        Q(status=Satisfaction.Status.SCORED)
+        | Q(status=Satisfaction.Status.UNCERTAIN, corrected_polarity__isnull=False),
+        language=lang,
+    )
+
+
+def get_training_rows(lang, chunk_size, corrected_only=False, learned=False):
+    """
+    Stream from the database the learnable satisfactions of 'lang' not learned
+    yet (all of them with 'learned'), by chunks of 'chunk_size'.
+    Satisfactions still pending, or uncertain and not corrected, are not
+    learned yet: they are streamed by a later run, once scored or corrected.
+    A correction forgets that a satisfaction was learned (see signals.py), it
+    is learned again with its new label.
+    The label is the admin correction if any, otherwise the predicted polarity.
+
+    Yields lists of (id, description, label)
+    """
+    satisfactions = get_learnable(lang)
+    if not learned:
+        satisfactions = satisfactions.filter(learned_at__isnull=True)
+    if corrected_only:
+        satisfactions = satisfactions.filter(corrected_polarity__isnull=False)
+
+    rows = (
+        satisfactions.order_by("id")
+        .values_list("id", "description", "polarity", "corrected_polarity")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield [
+            (id, description, corrected if corrected is not None else polarity)
+            for id, description, polarity, corrected in chunk
+            if corrected is not None or polarity is not None
+        ]
+
+
+def mark_learned(rows, chunk_size):
+    """
+    Set 'learned_at' of the satisfactions of 'rows', (id, label) pairs, once
+    the model which learned them is saved. Those corrected meanwhile to
+    another label are left to the next run.
+    """
+    now = timezone.now()
+    for label in (True, False):
+        ids = [id for id, learned_label in rows if learned_label == label]
+        for start in range(0, len(ids), chunk_size):
+            Satisfaction.objects.filter(
+                Q(corrected_polarity=label)
+                | Q(corrected_polarity__isnull=True, polarity=label),
+                id__in=ids[start : start + chunk_size],
+            ).update(learned_at=now)
@@ -0,0 +1,137 @@
+import logging
+from collections import defaultdict
+
+from .cache import normalize_text, prediction_cache
+from .language import language_identifier
+from .registry import AVAILABLE_LANGUAGES, ModelNotAvailable, registry
+from .text import clean_texts
+
+logger = logging.getLogger("satisfactions")
+
+
+def detect_language(text):
+    """
+    Returns the language of 'text' if a model exists for it ('fr' or 'en'),
+    otherwise None.
+    """
+    return language_identifier.detect(text)
+
+
+def detect_languages(texts):
+    """
+    Same as detect_language for a whole batch of texts.
+    """
+    return language_identifier.detect_batch(texts)
+
+
+def predict_scores(lang, texts):
+    """
+    Guess if each text is positive (True) or negative (False), and the
+    probability of that guess, with a single predict_proba call to the model
+    of 'lang', on texts cleaned like the training ones.
+    Returns a list of (polarity, confidence).
+    Raises ModelNotAvailable if there is no model for this language.
+    """
+    model = registry.get(lang)
+    probas = model.predict_proba(clean_texts(lang, texts))
+
+    # Same class as predict: on a tie, the first one
+    best = probas.argmax(axis=1)
+    return [
+        (bool(model.classes_[col] == 1), float(proba[col]))
+        for proba, col in zip(probas, best)
+    ]
+
+
+def predict_polarities(lang, texts):
+    """
+    Polarities only of predict_scores.
+    """
+    return [polarity for polarity, _ in predict_scores(lang, texts)]
+
+
+def get_models_version():
+    """
+    Version of the served models, part of the prediction cache keys.
+    None when no model is available: nothing is cached.
+    """
+    versions = []
+    for lang in AVAILABLE_LANGUAGES:
+        try:
+            versions.append(f"{lang}={registry.get_source(lang)[1]}")
+        except ModelNotAvailable:
+            versions.append(f"{lang}=")
+
+    if all(version.endswith("=") for version in versions):
+        return None
+    return ";".join(versions)
+
+
+def analyze(texts, detect):
+    """
+    Returns (language, polarity, confidence) of each text, from the
+    prediction cache or from 'detect' and one model call per language for
+    the others.
+    The language is None when the text is neither French nor English,
+    polarity and confidence are None when the model of its language is missing.
+    Texts are normalized (see cache.py) before being analyzed.
+    """
+    version = get_models_version()
+    normalized = [normalize_text(text) for text in texts]
+
+    results = prediction_cache.get_many(version, normalized) if version else {}
+    # Cached polarities are only served while their model can be loaded
+    for lang in {result[0] for result in results.values() if result[1] is not None}:
+        try:
+            registry.get(lang)
+        except ModelNotAvailable:
+            results = {
+                text: result for text, result in results.items() if result[0] != lang
+            }
+    missing = [text for text in dict.fromkeys(normalized) if text not in results]
+
+    if missing:
+        computed = {}
+        batches = defaultdict(list)
+        for text, lang in zip(missing, detect(missing)):
+            computed[text] = (lang, None, None)
+            if lang is not None:
+                batches[lang].append(text)
+
+        for lang, batch in batches.items():
+            try:
+                scores = predict_scores(lang, batch)
+            except ModelNotAvailable:
+                logger.warning(f"No model to score {len(batch)} texts: lang={lang}")
+                continue
+
+            for text, (polarity, confidence) in zip(batch, scores):
+                computed[text] = (lang, polarity, confidence)
+
+        if version:
+            # Missing model: the text will be predicted once it is there
+            prediction_cache.set_many(
+                version,
+                {
+                    text: result
+                    for text, result in computed.items()
+                    if result[0] is None or result[1] is not None
+                },
+            )
+        results.update(computed)
+
+    return [results[text] for text in normalized]
+
+
+def analyze_text(text):
+    """
+    (language, polarity, confidence) of a single text, see analyze.
+    """
+    return analyze([text], lambda texts: [detect_language(texts[0])])[0]
+
+
+def analyze_texts(texts):
+    """
+    (language, polarity, confidence) of each text of a batch, see analyze.
+    """
+    return analyze(texts, detect_languages)
@@ -0,0 +1,172 @@
+import logging
+import os
+import threading
+
+import joblib
+
+from .artifacts import EXPORT_FOLDER, MODEL_FILE, ArtifactStore
+from .compact import CompactPipeline
+
+logger = logging.getLogger("satisfactions")
+
+AVAILABLE_LANGUAGES = ["fr", "en"]
+
+
+class ModelNotAvailable(Exception):
+    """
+    Raised when no trained model can be found for a language.
+    """
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of the sentiment pipelines.
+
+    Each language pipeline is loaded once per process, lazily on first use,
+    and kept in memory. Every access reads the ACTIVE pointer of the language
+    (see artifacts.py): when another version is activated, it is loaded and
+    served from this call on. The model loaded before is kept, so rolling
+    back to it needs no loading.
+    Without active version, the legacy model_ia_<lang>.pkl is used, reloaded
+    when its mtime or size changes.
+    Compact exports (see compact.py) are memory-mapped instead of unpickled.
+    """
+
+    def __init__(self, data_path=None):
+        self._data_path = data_path
+        self._models = {}
+        self._lock = threading.Lock()
+
+    @property
+    def data_path(self):
+        """
+        Folder containing the pickles, 'DATA_PATH' environment variable by default.
+        """
+        if self._data_path is not None:
+            return self._data_path
+        return os.getenv("DATA_PATH", "")
+
+    @property
+    def store(self):
+        return ArtifactStore(self.data_path)
+
+    def get_model_path(self, lang):
+        return os.path.join(self.data_path, f"model_ia_{lang}.pkl")
+
+    def get_export_path(self, lang):
+        """
+        Folder of the compact export written by 'export_models'.
+        """
+        return os.path.join(self.data_path, f"model_ia_{lang}")
+
+    def get_paths(self, lang):
+        """
+        Pickle and export paths of the model served for 'lang': those of the
+        active version, or the legacy ones. They may not exist.
+        """
+        version = self.store.get_active_version(lang)
+        if version:
+            path = self.store.get_version_path(lang, version)
+            return os.path.join(path, MODEL_FILE), os.path.join(path, EXPORT_FOLDER)
+        return self.get_model_path(lang), self.get_export_path(lang)
+
+    def is_available(self, lang):
+        return self.store.get_active_version(lang) is not None or (
+            os.path.isfile(self.get_model_path(lang))
+            or os.path.isfile(os.path.join(self.get_export_path(lang), "meta.json"))
+        )
+
+    def get_source(self, lang):
+        """
+        Returns the path, signature and loader of the model of 'lang'.
+        The signature of a version is its name: its files never change.
+        The compact export is used unless the pickle is more recent.
+        Raises ModelNotAvailable if there is neither a pickle nor an export.
+        """
+        version = self.store.get_active_version(lang)
+        if version:
+            model_path, export_path = self.get_paths(lang)
+            if os.path.isdir(export_path):
+                return export_path, version, CompactPipeline
+            return model_path, version, joblib.load
+
+        try:
+            pickle_stat = os.stat(self.get_model_path(lang))
+        except OSError:
+            pickle_stat = None
+
+        try:
+            export_stat = os.stat(os.path.join(self.get_export_path(lang), "meta.json"))
+        except OSError:
+            export_stat = None
+
+        if export_stat and (
+            pickle_stat is None or export_stat.st_mtime_ns >= pickle_stat.st_mtime_ns
+        ):
+            # An export replaces the whole folder: a new inode for meta.json
+            signature = (export_stat.st_ino, export_stat.st_mtime_ns)
+            return self.get_export_path(lang), signature, CompactPipeline
+
+        if pickle_stat:
+            signature = (pickle_stat.st_mtime_ns, pickle_stat.st_size)
+            return self.get_model_path(lang), signature, joblib.load
+
+        raise ModelNotAvailable(f"No model available for language '{lang}'.")
+
+    def get(self, lang):
+        """
+        Returns the pipeline of 'lang', loading it only if the file changed
+        since the last call.
+        Raises ModelNotAvailable if there is no model for this language.
+        """
+        path, signature, loader = self.get_source(lang)
+
+        model = self._find(lang, signature)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have loaded it while we were waiting.
+            model = self._find(lang, signature)
+            if model is not None:
+                return model
+
+            model = loader(path)
+            # Keep the previous version for a rollback, not a replaced legacy file
+            previous = [
+                (loaded_signature, loaded_model)
+                for loaded_signature, loaded_model in self._models.get(lang, [])[:1]
+                if isinstance(signature, str) and isinstance(loaded_signature, str)
+            ]
+            self._models[lang] = [(signature, model)] + previous
+            logger.info(f"Sentiment model loaded: lang={lang} path={path}")
+
+        return model
+
+    def _find(self, lang, signature):
+        for loaded_signature, model in self._models.get(lang, []):
+            if loaded_signature == signature:
+                return model
+        return None
+
+    def warm_up(self):
+        """
+        Load every available pipeline now instead of on first use.
+        Returns the list of loaded languages.
+        """
+        loaded = []
+        for lang in AVAILABLE_LANGUAGES:
+            if self.is_available(lang):
+                self.get(lang)
+                loaded.append(lang)
+        return loaded
+
+    def clear(self):
+        """
+        Forget every loaded pipeline.
+        """
+        with self._lock:
+            self._models = {}
+
+
+registry = ModelRegistry()
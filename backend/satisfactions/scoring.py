@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Satisfaction
+from .predictions import analyze_texts
+from .stats import update_rollups
+
+
+def get_scored_status(confidence):
+    """
+    SCORED, or UNCERTAIN when the model is not confident enough: those
+    comments can be scored again by a newer model (score_satisfactions
+    --uncertain) or left out of the analytics.
+    """
+    if confidence < settings.SATISFACTION_UNCERTAINTY_THRESHOLD:
+        return Satisfaction.Status.UNCERTAIN
+    return Satisfaction.Status.SCORED
+
+
+def score(satisfactions):
+    """
+    Detect the language and predict the polarity of a batch of satisfactions,
+    with one model call per language for the comments which are not cached.
+    Sets 'language', 'polarity', 'confidence' and 'status':
+        - SCORED or UNCERTAIN when the polarity is known (see get_scored_status)
+        - REJECTED when the comment is neither French nor English
+    Satisfactions whose model is missing keep their status.
+    """
+    results = analyze_texts(
+        [satisfaction.description for satisfaction in satisfactions]
+    )
+
+    for satisfaction, (lang, polarity, confidence) in zip(satisfactions, results):
+        if lang is None:
+            satisfaction.status = Satisfaction.Status.REJECTED
+        else:
+            satisfaction.language = lang
+            if polarity is not None:
+                satisfaction.polarity = polarity
+                satisfaction.confidence = confidence
+                satisfaction.status = get_scored_status(confidence)
+
+    return satisfactions
+
+
+def claim_pending(batch_size, claimed_before=None):
+    """
+    Mark up to 'batch_size' pending satisfactions as processing and return them.
+    Rows locked by another worker are skipped, and so are the rows claimed
+    less than SATISFACTION_RETRY_DELAY ago (model missing, failed batch):
+    they wait without blocking the next ones. With 'claimed_before', rows
+    claimed since then are skipped too, e.g. tried once already by this run.
+    """
+    now = timezone.now()
+    retry_before = now - timedelta(seconds=settings.SATISFACTION_RETRY_DELAY)
+    if claimed_before is not None:
+        retry_before = min(retry_before, claimed_before)
+    pending = Satisfaction.objects.filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lte=retry_before),
+        status=Satisfaction.Status.PENDING,
+    )
+    claim = {"status": Satisfaction.Status.PROCESSING, "claimed_at": now}
+
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            ids = list(
+                pending.select_for_update(skip_locked=True)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            Satisfaction.objects.filter(id__in=ids).update(**claim)
+        else:
+            # No row locks (SQLite): a row belongs to the worker whose update
+            # changed it from pending to processing.
+            candidates = pending.order_by("id").values_list("id", flat=True)
+            ids = [
+                id
+                for id in candidates[:batch_size]
+                if pending.filter(id=id).update(**claim)
+            ]
+
+    return list(Satisfaction.objects.filter(id__in=ids).order_by("id"))
+
+
+def process_pending(batch_size, claimed_before=None):
+    """
+    Score one micro-batch of pending satisfactions and write the results back
+    with a single bulk update (see claim_pending for 'claimed_before').
+    Returns the number of claimed satisfactions, and of the scored or
+    rejected ones: those whose model is missing are claimed but deferred.
+    """
+    satisfactions = claim_pending(batch_size, claimed_before)
+    if not satisfactions:
+        return 0, 0
+
+    try:
+        score(satisfactions)
+
+        processed = 0
+        for satisfaction in satisfactions:
+            if satisfaction.status == Satisfaction.Status.PROCESSING:
+                # Model missing: back in the queue, claimed again after
+                # SATISFACTION_RETRY_DELAY (claimed_at is kept)
+                satisfaction.status = Satisfaction.Status.PENDING
+            else:
+                processed += 1
+
+        with transaction.atomic():
+            Satisfaction.objects.bulk_update(
+                satisfactions,
+                ["polarity", "confidence", "language", "status"],
+                batch_size=batch_size,
+            )
+            update_rollups(satisfactions)
+    except Exception:
+        Satisfaction.objects.filter(
+            id__in=[satisfaction.id for satisfaction in satisfactions]
+        ).update(status=Satisfaction.Status.PENDING)
+        raise
+
+    return len(satisfactions), processed
+
+
+def requeue_processing():
+    """
+    Put back in the queue satisfactions claimed more than
+    SATISFACTION_CLAIM_TIMEOUT ago, by a worker which died: those claimed by
+    running workers are left to them.
+    Returns the number of requeued satisfactions.
+    """
+    stale_before = timezone.now() - timedelta(
+        seconds=settings.SATISFACTION_CLAIM_TIMEOUT
+    )
+    return Satisfaction.objects.filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=stale_before),
+        status=Satisfaction.Status.PROCESSING,
+    ).update(status=Satisfaction.Status.PENDING)
+
+
+def requeue_uncertain():
+    """
+    Put back in the queue the satisfactions scored with a low confidence,
+    e.g. once a better model is active. They leave the stats until then.
+    Returns the number of requeued satisfactions.
+    """
+    uncertain = Satisfaction.objects.filter(status=Satisfaction.Status.UNCERTAIN)
+
+    with transaction.atomic():
+        update_rollups(
+            uncertain.select_for_update().only(
+                "user",
+                "created_at",
+                "language",
+                "polarity",
+                "corrected_polarity",
+                "status",
+            ),
+            sign=-1,
+        )
+        return uncertain.update(status=Satisfaction.Status.PENDING)
@@ -1,10 +1,15 @@
-import os
-
-import joblib
-from langdetect import detect
+from django.conf import settings
 from rest_framework import serializers
 
-from .models import Satisfaction
+from .models import Satisfaction, SatisfactionRollup
+from .predictions import analyze_text
+from .scoring import get_scored_status
+from .stats import GROUP_BY_FIELDS
+
+LANGUAGE_ERROR = (
+    "Input of satisfaction commentary should be written in French or English"
+)
+MODEL_ERROR = "Sorry we can not know if your comment is positive or negative."
 
 
 class SatisfactionSerializer(serializers.ModelSerializer):
@@ -15,10 +20,23 @@ class SatisfactionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Satisfaction
-        fields = ["email", "last_name", "first_name", "description", "polarity", "user"]
+        fields = [
+            "email",
+            "last_name",
+            "first_name",
+            "description",
+            "polarity",
+            "confidence",
+            "language",
+            "status",
+            "user",
+        ]
         extra_kwargs = {
             "user": {"read_only": True},
             "polarity": {"read_only": True},
+            "confidence": {"read_only": True},
+            "language": {"read_only": True},
+            "status": {"read_only": True},
         }
 
     def validate_email(self, value):
@@ -47,36 +65,66 @@ class SatisfactionSerializer(serializers.ModelSerializer):
         Checks if satisfaction comment is written in french or english.
         and add polarity to guess if it is positive or negative
         Otherwise raise an error.
+        The bulk view skips this step ('predict' set to False in the context)
+        to detect languages and predict polarities for the whole batch.
+        With SATISFACTION_ASYNC_SCORING, the comment is saved as pending
+        and scored later by 'manage.py score_satisfactions'.
         """
-        lang_available = ["fr", "en"]
+        if settings.SATISFACTION_ASYNC_SCORING:
+            data["status"] = Satisfaction.Status.PENDING
+            return data
+
+        if not self.context.get("predict", True):
+            return data
+
         msg = data["description"]
 
-        lang_detected = detect(msg)
+        # Cached for repeated comments, see cache.py
+        lang_detected, polarity, confidence = analyze_text(msg)
 
-        if lang_detected not in lang_available:
-            raise serializers.ValidationError(
-                "Input of satisfaction commentary should be written in French or English"
-            )
+        if lang_detected is None:
+            raise serializers.ValidationError(LANGUAGE_ERROR)
+        if polarity is None:
+            raise serializers.ValidationError(MODEL_ERROR)
 
-        data_path = os.getenv("DATA_PATH")
+        data["language"] = lang_detected
+        data["polarity"] = polarity
+        data["confidence"] = confidence
+        data["status"] = get_scored_status(confidence)
 
-        if lang_detected == "fr":
-            if not os.path.isfile(data_path + "model_ia_fr.pkl"):
-                raise serializers.ValidationError(
-                    "Sorry we can not know if your comment is positive or negative."
-                )
+        return data
 
-            model = joblib.load(data_path + "./model_ia_fr.pkl")
 
-        if lang_detected == "en":
-            if not os.path.isfile(data_path + "./model_ia_en.pkl"):
-                raise serializers.ValidationError(
-                    "Sorry we can not know if your comment is positive or negative."
-                )
+class SatisfactionStatsQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of the stats, e.g. ?period=week&start=2025-01-01&group_by=language
+    """
 
-            model = joblib.load(data_path + "./model_ia_en.pkl")
+    period = serializers.ChoiceField(
+        choices=SatisfactionRollup.Period.choices,
+        default=SatisfactionRollup.Period.DAY,
+    )
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    group_by = serializers.CharField(required=False, default="")
 
-        prediction = model.predict([msg.lower()])
+    def validate_group_by(self, value):
+        """
+        Comma separated fields among GROUP_BY_FIELDS.
+        """
+        fields = [field.strip() for field in value.split(",") if field.strip()]
+        unknown = [field for field in fields if field not in GROUP_BY_FIELDS]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Cannot group by {', '.join(unknown)}, "
+                f"choose among {', '.join(GROUP_BY_FIELDS)}."
+            )
+        return list(dict.fromkeys(fields))
 
-        data["polarity"] = True if prediction[0] == 1 else False
+    def validate(self, data):
+        """
+        Ensures that the start date is not after the end date.
+        """
+        if "start" in data and "end" in data and data["start"] > data["end"]:
+            raise serializers.ValidationError("Start date must be before end date.")
         return data
@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Satisfaction
+from .stats import get_rollup_key, update_rollups
+
+
+@receiver(pre_save, sender=Satisfaction)
+def remember_counted(sender, instance, raw, **kwargs):
+    """
+    Keep the stored satisfaction, as counted in the stats, before an update.
+    Created satisfactions are counted where they are scored (see views.py and
+    scoring.py).
+    A corrected satisfaction is learned again by the online model with its
+    new label (see online.py).
+    """
+    instance._counted = None
+    if not raw and not instance._state.adding:
+        instance._counted = Satisfaction.objects.filter(pk=instance.pk).first()
+
+    counted = instance._counted
+    if (
+        counted is not None
+        and counted.corrected_polarity != instance.corrected_polarity
+    ):
+        instance.learned_at = None
+
+
+@receiver(post_save, sender=Satisfaction)
+def recount_updated(sender, instance, created, raw, **kwargs):
+    """
+    Move an updated satisfaction in the stats, e.g. when an admin corrects
+    its polarity.
+    """
+    counted = getattr(instance, "_counted", None)
+    if created or raw or counted is None:
+        return
+
+    counted_key = get_rollup_key(counted)
+    if counted_key != get_rollup_key(instance):
+        with transaction.atomic():
+            # Never counted (pending, rejected): nothing to remove
+            if counted_key is not None:
+                update_rollups([counted], sign=-1)
+            update_rollups([instance])
+
+
+@receiver(post_delete, sender=Satisfaction)
+def uncount_deleted(sender, instance, **kwargs):
+    """
+    Remove a deleted satisfaction from the stats, also when its author is.
+    """
+    update_rollups([instance], sign=-1)
@@ -0,0 +1,188 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Satisfaction, SatisfactionRollup
+
+User = get_user_model()
+
+# Statuses counted in the stats, the others have no polarity
+COUNTED_STATUSES = [Satisfaction.Status.SCORED, Satisfaction.Status.UNCERTAIN]
+GROUP_BY_FIELDS = ["language", "cohort"]
+COUNT_FIELDS = ["positive", "negative", "uncertain"]
+
+
+def get_period_start(period, created_at):
+    """
+    First day of the day or week (Monday) of 'created_at', in TIME_ZONE.
+    """
+    day = timezone.localtime(created_at).date()
+    if period == SatisfactionRollup.Period.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def get_cohort(signed_up_at):
+    return timezone.localtime(signed_up_at).strftime("%Y-%m")
+
+
+def get_polarity(satisfaction):
+    """
+    Polarity counted in the stats: the one corrected by an admin, if any.
+    """
+    if satisfaction.corrected_polarity is not None:
+        return satisfaction.corrected_polarity
+    return satisfaction.polarity
+
+
+def get_rollup_key(satisfaction):
+    """
+    Fields of 'satisfaction' deciding where it is counted, None when it is not.
+    """
+    polarity = get_polarity(satisfaction)
+    if satisfaction.status not in COUNTED_STATUSES or polarity is None:
+        return None
+    return (
+        satisfaction.status,
+        polarity,
+        satisfaction.language,
+        satisfaction.created_at,
+        satisfaction.user_id,
+    )
+
+
+def update_rollups(satisfactions, sign=1):
+    """
+    Add the scored 'satisfactions' to the rollups of their day and week,
+    or remove them with sign=-1 before they are scored again or once deleted
+    (see signals.py). One query per updated rollup, run in a single transaction.
+    """
+    satisfactions = [
+        satisfaction
+        for satisfaction in satisfactions
+        if get_rollup_key(satisfaction) is not None
+    ]
+    if not satisfactions:
+        return
+
+    cohorts = {
+        id: get_cohort(created_at)
+        for id, created_at in User.objects.filter(
+            id__in={satisfaction.user_id for satisfaction in satisfactions}
+        ).values_list("id", "created_at")
+    }
+
+    counts = defaultdict(lambda: dict.fromkeys(COUNT_FIELDS, 0))
+    for satisfaction in satisfactions:
+        for period in SatisfactionRollup.Period.values:
+            key = (
+                period,
+                get_period_start(period, satisfaction.created_at),
+                satisfaction.language,
+                cohorts[satisfaction.user_id],
+            )
+            polarity = get_polarity(satisfaction)
+            counts[key]["positive" if polarity else "negative"] += sign
+            if satisfaction.status == Satisfaction.Status.UNCERTAIN:
+                counts[key]["uncertain"] += sign
+
+    with transaction.atomic():
+        for (period, period_start, language, cohort), values in counts.items():
+            rollup, _ = SatisfactionRollup.objects.get_or_create(
+                period=period,
+                period_start=period_start,
+                language=language,
+                cohort=cohort,
+            )
+            # F() expressions: concurrent workers do not overwrite each other
+            SatisfactionRollup.objects.filter(id=rollup.id).update(
+                **{field: F(field) + value for field, value in values.items()}
+            )
+
+
+def rebuild_rollups():
+    """
+    Compute again every rollup from the satisfactions, e.g. after rows were
+    scored before the rollups existed. Returns the number of rollups.
+    """
+    truncs = {
+        SatisfactionRollup.Period.DAY: TruncDate("created_at"),
+        SatisfactionRollup.Period.WEEK: TruncWeek(
+            "created_at", output_field=DateField()
+        ),
+    }
+    satisfactions = Satisfaction.objects.annotate(
+        counted_polarity=Coalesce("corrected_polarity", "polarity")
+    ).filter(status__in=COUNTED_STATUSES, counted_polarity__isnull=False)
+
+    rollups = []
+    for period, trunc in truncs.items():
+        rows = (
+            satisfactions.annotate(
+                start=trunc, signed_up=TruncMonth("user__created_at")
+            )
+            .values("start", "language", "signed_up")
+            .annotate(
+                positive=Count("id", filter=Q(counted_polarity=True)),
+                negative=Count("id", filter=Q(counted_polarity=False)),
+                uncertain=Count("id", filter=Q(status=Satisfaction.Status.UNCERTAIN)),
+            )
+        )
+        for row in rows:
+            rollups.append(
+                SatisfactionRollup(
+                    period=period,
+                    period_start=row["start"],
+                    language=row["language"],
+                    cohort=get_cohort(row["signed_up"]),
+                    positive=row["positive"],
+                    negative=row["negative"],
+                    uncertain=row["uncertain"],
+                )
+            )
+
+    with transaction.atomic():
+        SatisfactionRollup.objects.all().delete()
+        SatisfactionRollup.objects.bulk_create(rollups, batch_size=1000)
+
+    return len(rollups)
+
+
+def get_stats(period, start=None, end=None, group_by=()):
+    """
+    Counts and ratios of positive and negative satisfactions by period start,
+    and by the 'group_by' fields (language, cohort), between the 'start' and
+    'end' dates included. Only reads the rollups.
+    """
+    rollups = SatisfactionRollup.objects.filter(period=period)
+    if start is not None:
+        rollups = rollups.filter(period_start__gte=start)
+    if end is not None:
+        rollups = rollups.filter(period_start__lte=end)
+
+    fields = ["period_start", *group_by]
+    rows = (
+        rollups.values(*fields)
+        .annotate(**{f"sum_{field}": Sum(field) for field in COUNT_FIELDS})
+        .order_by(*fields)
+    )
+
+    stats = []
+    for row in rows:
+        counts = {field: row[f"sum_{field}"] for field in COUNT_FIELDS}
+        total = counts["positive"] + counts["negative"]
+        stats.append(
+            {
+                **{field: row[field] for field in fields},
+                **counts,
+                "total": total,
+                "positive_ratio": counts["positive"] / total if total else None,
+                "negative_ratio": counts["negative"] / total if total else None,
+            }
+        )
+    return stats
@@ -0,0 +1,171 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+import joblib
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+from satisfactions.artifacts import ArtifactError, ArtifactStore
+from satisfactions.compact import CompactPipeline
+from satisfactions.registry import ModelRegistry
+from satisfactions.tests.test_registry import build_pipeline
+
+
+class ArtifactStoreTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = self.tmp_dir.name + "/"
+        self.store = ArtifactStore(self.data_path)
+        self.registry = ModelRegistry(data_path=self.data_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_publish(self):
+        """
+        Should write the version with its manifest and activate it.
+        """
+        manifest = self.store.publish(
+            build_pipeline(), "en", params={"alpha": 0.1}, metrics={"accuracy": 0.9}
+        )
+
+        version = manifest["version"]
+        self.assertEqual(self.store.list_versions("en"), [version])
+        self.assertEqual(self.store.get_active_version("en"), version)
+        self.assertEqual(self.store.get_manifest("en", version), manifest)
+        self.assertEqual(manifest["params"], {"alpha": 0.1})
+        self.assertIn("model.pkl", manifest["checksums"])
+        self.assertIn("export/meta.json", manifest["checksums"])
+
+    def test_publish_without_activation(self):
+        """
+        Should keep serving the active version.
+        """
+        first = self.store.publish(build_pipeline(), "en")["version"]
+        self.store.publish(build_pipeline(), "en", activate=False)
+
+        self.assertEqual(len(self.store.list_versions("en")), 2)
+        self.assertEqual(self.store.get_active_version("en"), first)
+
+    def test_rollback(self):
+        """
+        Should serve the previous version again, twice goes back to the last one.
+        """
+        first = self.store.publish(build_pipeline(), "en")["version"]
+        second = self.store.publish(build_pipeline(), "en")["version"]
+
+        self.assertEqual(self.store.rollback("en"), first)
+        self.assertEqual(self.store.get_active_version("en"), first)
+        self.assertEqual(self.store.rollback("en"), second)
+
+    def test_rollback_failure(self):
+        """
+        Should raise ArtifactError without a previous version.
+        """
+        self.store.publish(build_pipeline(), "en")
+
+        with self.assertRaises(ArtifactError):
+            self.store.rollback("en")
+        with self.assertRaises(ArtifactError):
+            self.store.rollback("fr")
+
+    def test_activate_corrupted_version_failure(self):
+        """
+        Should refuse a version whose files do not match the manifest.
+        """
+        first = self.store.publish(build_pipeline(), "en")["version"]
+        second = self.store.publish(build_pipeline(), "en")["version"]
+        self.store.rollback("en")
+
+        path = os.path.join(self.store.get_version_path("en", second), "model.pkl")
+        with open(path, "ab") as file:
+            file.write(b"0")
+
+        with self.assertRaises(ArtifactError):
+            self.store.activate("en", second)
+        with self.assertRaises(ArtifactError):
+            self.store.activate("en", "unknown")
+        self.assertEqual(self.store.get_active_version("en"), first)
+
+    def test_registry_serves_active_version(self):
+        """
+        Should serve the activated version from the next call, and keep the
+        previous one loaded for a rollback.
+        """
+        joblib.dump(build_pipeline(), self.registry.get_model_path("en"))
+        legacy = self.registry.get("en")
+
+        self.store.publish(build_pipeline(), "en")
+        first = self.registry.get("en")
+        self.assertIsNot(first, legacy)
+        self.assertIsInstance(first, CompactPipeline)
+
+        self.store.publish(build_pipeline(), "en")
+        second = self.registry.get("en")
+        self.assertIsNot(second, first)
+
+        with patch("satisfactions.registry.CompactPipeline") as mock_loader:
+            self.store.rollback("en")
+            self.assertIs(self.registry.get("en"), first)
+        mock_loader.assert_not_called()
+
+    def test_registry_legacy_fallback(self):
+        """
+        Should serve model_ia_<lang>.pkl when there is no active version.
+        """
+        joblib.dump(build_pipeline(), self.registry.get_model_path("en"))
+
+        self.assertTrue(self.registry.is_available("en"))
+        self.assertEqual(
+            self.registry.get_source("en")[0], self.registry.get_model_path("en")
+        )
+
+
+class ModelVersionsCommandTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = self.tmp_dir.name + "/"
+        self.store = ArtifactStore(self.data_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def call_command(self, *args):
+        with patch.dict(os.environ, {"DATA_PATH": self.data_path}):
+            call_command("model_versions", *args, stdout=StringIO())
+
+    def test_import_legacy_and_rollback(self):
+        """
+        Should publish the legacy pickle, then roll back to the previous version.
+        """
+        first = self.store.publish(build_pipeline(), "en")["version"]
+        joblib.dump(
+            build_pipeline(), ModelRegistry(self.data_path).get_model_path("en")
+        )
+
+        self.call_command("--lang", "en", "--import-legacy")
+        imported = self.store.get_active_version("en")
+        self.assertNotEqual(imported, first)
+        self.assertEqual(
+            self.store.get_manifest("en", imported)["params"],
+            {"source": "model_ia_en.pkl"},
+        )
+
+        self.call_command("--lang", "en", "--rollback")
+        self.assertEqual(self.store.get_active_version("en"), first)
+
+        self.call_command("--lang", "en", "--activate", imported)
+        with open(os.path.join(self.store.get_lang_path("en"), "ACTIVE")) as file:
+            self.assertEqual(json.load(file), {"version": imported, "previous": first})
+
+    def test_activate_failure(self):
+        """
+        Should exit with an error for an unknown version or without --lang.
+        """
+        with self.assertRaises(CommandError):
+            self.call_command("--lang", "en", "--activate", "unknown")
+        with self.assertRaises(CommandError):
+            self.call_command("--rollback")
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+import pandas as pd
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from satisfactions.dataset import get_dataset_path, save_dataset
+from satisfactions.registry import registry
+from satisfactions.tests.test_training import LABELS, TEXTS
+from satisfactions.training import build_pipeline, save_pipeline
+
+
+class BenchmarkModelsCommandTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = self.tmp_dir.name + "/"
+        save_pipeline(build_pipeline().fit(TEXTS, LABELS), self.data_path, "en")
+
+    def tearDown(self):
+        registry.clear()
+        self.tmp_dir.cleanup()
+
+    def call_command(self, *args):
+        stdout = StringIO()
+        with patch.dict(os.environ, {"DATA_PATH": self.data_path}):
+            call_command(
+                "benchmark_models",
+                "--batch-sizes",
+                "1",
+                "8",
+                "--batches",
+                "3",
+                *args,
+                stdout=stdout,
+                stderr=StringIO(),
+            )
+        return json.loads(stdout.getvalue())
+
+    def test_command(self):
+        """
+        Should report the measures of the available models as JSON.
+        """
+        save_dataset(get_dataset_path(self.data_path, "en"), TEXTS, LABELS)
+
+        report = self.call_command()
+
+        self.assertEqual(list(report["models"]), ["en"])
+        measures = report["models"]["en"]
+        self.assertEqual(measures["model"]["format"], "export")
+        self.assertEqual(measures["held_out"], {"source": "dataset_en", "samples": 5})
+        self.assertEqual(measures["accuracy"], 1.0)
+        self.assertGreater(measures["pickle_size"], 0)
+        self.assertEqual(list(measures["latency_ms"]), ["1", "8"])
+        self.assertEqual(measures["latency_ms"]["8"]["batches"], 3)
+        self.assertLessEqual(
+            measures["latency_ms"]["1"]["p50"], measures["latency_ms"]["1"]["p99"]
+        )
+
+    def test_command_dataframe(self):
+        """
+        Should prefer the raw reviews of the dataframe, cleaned by the model path.
+        """
+        pd.DataFrame(
+            {"satisfaction": LABELS, "en": [text.upper() + " !" for text in TEXTS]}
+        ).to_csv(self.data_path + "dataframe_en.csv", index=False)
+
+        output = os.path.join(self.tmp_dir.name, "benchmark.json")
+        with patch.dict(os.environ, {"DATA_PATH": self.data_path}):
+            call_command(
+                "benchmark_models", "--lang", "en", "--batches", "1", "--output", output
+            )
+
+        with open(output) as file:
+            measures = json.load(file)["models"]["en"]
+        self.assertEqual(measures["held_out"]["source"], "dataframe_en.csv")
+        self.assertEqual(measures["accuracy"], 1.0)
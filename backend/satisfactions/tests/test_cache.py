@@ -0,0 +1,150 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from satisfactions.artifacts import ArtifactStore
+from satisfactions.cache import PredictionCache, normalize_text, prediction_cache
+from satisfactions.language import language_identifier
+from satisfactions.predictions import analyze_texts
+from satisfactions.registry import ModelNotAvailable, registry
+from satisfactions.tests.test_registry import build_pipeline
+
+SHARED_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shared-predictions",
+    },
+}
+
+
+class PredictionCacheTest(SimpleTestCase):
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("  Great\tAPP \n"), "great app")
+
+    @override_settings(SATISFACTION_PREDICTION_CACHE_SIZE=2)
+    def test_least_recently_used_evicted(self):
+        """
+        Should keep at most SATISFACTION_PREDICTION_CACHE_SIZE predictions.
+        """
+        cache = PredictionCache()
+        cache.set_many("v1", {"a": ("en", True), "b": ("en", False)})
+        cache.get_many("v1", ["a"])
+        cache.set_many("v1", {"c": ("fr", True)})
+
+        self.assertEqual(
+            cache.get_many("v1", ["a", "b", "c"]),
+            {"a": ("en", True), "c": ("fr", True)},
+        )
+        self.assertEqual(
+            cache.stats(),
+            {"size": 2, "max_size": 2, "hits": 3, "misses": 1, "hit_rate": 0.75},
+        )
+
+    def test_version_in_key(self):
+        """
+        Should not return the predictions of another model version.
+        """
+        cache = PredictionCache()
+        cache.set_many("v1", {"a": ("en", True)})
+
+        self.assertEqual(cache.get_many("v2", ["a"]), {})
+
+    @override_settings(SATISFACTION_PREDICTION_CACHE_SIZE=0)
+    def test_disabled(self):
+        cache = PredictionCache()
+        cache.set_many("v1", {"a": ("en", True)})
+
+        self.assertEqual(cache.get_many("v1", ["a"]), {})
+
+    @override_settings(
+        CACHES=SHARED_CACHES, SATISFACTION_PREDICTION_CACHE_BACKEND="shared"
+    )
+    def test_shared_backend(self):
+        """
+        Should find predictions cached by another worker.
+        """
+        PredictionCache().set_many("v1", {"a": ("en", True)})
+
+        cache = PredictionCache()
+        self.assertEqual(cache.get_many("v1", ["a", "b"]), {"a": ("en", True)})
+        self.assertEqual(cache.stats()["size"], 1)
+
+
+class AnalyzeTextsTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ArtifactStore(self.tmp_dir.name)
+        self.store.publish(build_pipeline(), "en")
+
+        environ = patch.dict(os.environ, {"DATA_PATH": self.tmp_dir.name})
+        environ.start()
+        self.addCleanup(environ.stop)
+        registry.clear()
+        prediction_cache.clear()
+
+    def tearDown(self):
+        registry.clear()
+        prediction_cache.clear()
+        self.tmp_dir.cleanup()
+
+    def analyze(self, texts):
+        with patch.object(
+            language_identifier, "detect_batch", wraps=language_identifier.detect_batch
+        ) as mock_detect:
+            results = analyze_texts(texts)
+        return results, mock_detect
+
+    def test_repeated_texts(self):
+        """
+        Should analyze repeated texts once, then answer from the cache.
+        """
+        results, mock_detect = self.analyze(["Great app", "great  APP", "awful app"])
+
+        self.assertEqual(
+            [result[:2] for result in results],
+            [("en", True), ("en", True), ("en", False)],
+        )
+        self.assertEqual(results[0], results[1])
+        self.assertGreater(results[0][2], 0.5)
+        mock_detect.assert_called_once_with(["great app", "awful app"])
+
+        cached, mock_detect = self.analyze(["great app", "awful app"])
+
+        self.assertEqual(cached, [results[0], results[2]])
+        mock_detect.assert_not_called()
+        self.assertEqual(prediction_cache.stats()["hits"], 2)
+
+    def test_new_model_version(self):
+        """
+        Should predict again once another version is activated.
+        """
+        self.analyze(["great app"])
+        self.store.publish(build_pipeline(), "en")
+
+        _, mock_detect = self.analyze(["great app"])
+
+        mock_detect.assert_called_once()
+
+    def test_missing_model_not_cached(self):
+        """
+        Should not cache texts whose model is missing.
+        """
+        results, _ = self.analyze(["je parle français et ça marche"])
+        self.assertEqual(results, [("fr", None, None)])
+
+        _, mock_detect = self.analyze(["je parle français et ça marche"])
+        mock_detect.assert_called_once()
+
+    def test_cached_model_gone(self):
+        """
+        Should not serve a cached polarity once its model can not be loaded.
+        """
+        self.analyze(["great app"])
+
+        with patch.object(registry, "get", side_effect=ModelNotAvailable()):
+            results, mock_detect = self.analyze(["great app"])
+
+        self.assertEqual(results, [("en", None, None)])
+        mock_detect.assert_called_once()
@@ -0,0 +1,208 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+from django.test import SimpleTestCase
+from satisfactions.compact import CompactPipeline, StringTable, export_pipeline
+from satisfactions.registry import ModelRegistry
+from satisfactions.tests.test_registry import build_pipeline
+from sklearn.feature_extraction.text import (
+    HashingVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+TEXTS = [
+    "great app, i love it",
+    "awful app, i hate it",
+    "très bien, j'adore",
+    "unknown words only",
+    "",
+]
+
+
+def build_ovr_pipeline():
+    """
+    Same steps and kind of parameters as the pipelines of 'create_models'.
+    """
+    pipeline = Pipeline(
+        [
+            ("tfidf", TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True)),
+            ("clf", OneVsRestClassifier(MultinomialNB(alpha=0.1, fit_prior=False))),
+        ]
+    )
+    pipeline.fit(
+        ["great app", "i love it love it", "awful app", "i hate it", "très bien"],
+        [1, 1, 0, 0, 1],
+    )
+    return pipeline
+
+
+def build_hashing_pipeline():
+    """
+    Same steps as the pipelines of 'create_models --vectorizer hashing'.
+    """
+    pipeline = Pipeline(
+        [
+            (
+                "hashing",
+                HashingVectorizer(
+                    n_features=2**10,
+                    ngram_range=(1, 2),
+                    alternate_sign=False,
+                    norm=None,
+                ),
+            ),
+            ("tfidf", TfidfTransformer(sublinear_tf=True)),
+            ("clf", OneVsRestClassifier(MultinomialNB(alpha=0.1))),
+        ]
+    )
+    pipeline.fit(
+        ["great app", "i love it love it", "awful app", "i hate it", "très bien"],
+        [1, 1, 0, 0, 1],
+    )
+    return pipeline
+
+
+class CompactPipelineTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.export_path = os.path.join(self.tmp_dir.name, "model_ia_en")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_same_predictions_as_pipeline(self):
+        """
+        Should predict exactly like the exported pipelines.
+        """
+        for pipeline in [
+            build_pipeline(),
+            build_ovr_pipeline(),
+            build_hashing_pipeline(),
+        ]:
+            export_pipeline(pipeline, self.export_path)
+            compact = CompactPipeline(self.export_path)
+
+            np.testing.assert_allclose(
+                compact.predict_proba(TEXTS), pipeline.predict_proba(TEXTS)
+            )
+            np.testing.assert_array_equal(
+                compact.predict(TEXTS), pipeline.predict(TEXTS)
+            )
+
+    def test_export_replaces_previous_export(self):
+        """
+        Should replace an existing export without leaving temporary folders,
+        keeping the previous version for the readers loading it.
+        """
+        export_pipeline(build_pipeline(), self.export_path)
+        previous = CompactPipeline(self.export_path)
+        export_pipeline(build_ovr_pipeline(), self.export_path)
+        export_pipeline(build_ovr_pipeline(), self.export_path)
+
+        self.assertTrue(os.path.islink(self.export_path))
+        names = sorted(os.listdir(self.tmp_dir.name))
+        self.assertEqual(len(names), 3)
+        self.assertEqual(names[2], "model_ia_en")
+        self.assertTrue(all(name.startswith(".model_ia_en.v") for name in names[:2]))
+        self.assertTrue(CompactPipeline(self.export_path).meta["one_vs_rest"])
+        self.assertFalse(os.path.exists(previous.path))
+
+    def test_export_snapshot(self):
+        """
+        Should read the meta and arrays of the version published when loading
+        starts, even if another one is published meanwhile.
+        """
+        export_pipeline(build_pipeline(), self.export_path)
+        load = np.load
+        published = []
+
+        def publish_then_load(*args, **kwargs):
+            if not published:
+                published.append(
+                    export_pipeline(build_ovr_pipeline(), self.export_path)
+                )
+            return load(*args, **kwargs)
+
+        with patch("satisfactions.compact.np.load", side_effect=publish_then_load):
+            compact = CompactPipeline(self.export_path)
+
+        self.assertFalse(compact.meta["one_vs_rest"])
+        self.assertEqual(compact.feature_log_prob.shape[0], 1)
+        np.testing.assert_allclose(
+            compact.predict_proba(TEXTS), build_pipeline().predict_proba(TEXTS)
+        )
+
+    def test_export_replaces_legacy_folder(self):
+        """
+        Should replace an export folder written before the versioned ones.
+        """
+        os.makedirs(self.export_path)
+        export_pipeline(build_pipeline(), self.export_path)
+
+        self.assertTrue(os.path.islink(self.export_path))
+        self.assertIn(".model_ia_en.v0", os.listdir(self.tmp_dir.name))
+        self.assertFalse(CompactPipeline(self.export_path).meta["one_vs_rest"])
+
+    def test_string_table(self):
+        """
+        Should find the position of each string of the table.
+        """
+        strings = sorted(["app", "été", "great", "zèbre", "a"])
+        StringTable.save(self.tmp_dir.name, "words", strings)
+        table = StringTable.load(self.tmp_dir.name, "words")
+
+        self.assertEqual(len(table), 5)
+        for position, string in enumerate(strings):
+            self.assertEqual(table.index(string), position)
+            self.assertEqual(table.decode(position), string)
+        self.assertIsNone(table.index("missing"))
+
+
+class RegistryCompactTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(data_path=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_registry_prefers_export(self):
+        """
+        Should load the export when it is more recent than the pickle.
+        """
+        pipeline = build_pipeline()
+        joblib.dump(pipeline, self.registry.get_model_path("en"))
+        export_pipeline(pipeline, self.registry.get_export_path("en"))
+
+        self.assertIsInstance(self.registry.get("en"), CompactPipeline)
+
+    def test_registry_uses_newer_pickle(self):
+        """
+        Should ignore an export older than the pickle.
+        """
+        pipeline = build_pipeline()
+        export_pipeline(pipeline, self.registry.get_export_path("en"))
+        model_path = self.registry.get_model_path("en")
+        joblib.dump(pipeline, model_path)
+        meta_stat = os.stat(
+            os.path.join(self.registry.get_export_path("en"), "meta.json")
+        )
+        os.utime(model_path, ns=(meta_stat.st_atime_ns, meta_stat.st_mtime_ns + 10**9))
+
+        self.assertIsInstance(self.registry.get("en"), Pipeline)
+
+    def test_registry_export_only(self):
+        """
+        Should work without any pickle.
+        """
+        export_pipeline(build_pipeline(), self.registry.get_export_path("en"))
+
+        self.assertTrue(self.registry.is_available("en"))
+        self.assertEqual(self.registry.get("en").predict(["great app"])[0], 1)
@@ -0,0 +1,206 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from satisfactions.dataset import get_dataset_path, load_dataset
+from satisfactions.management.commands.create_dataframes import DATA_FILES
+from satisfactions.management.commands.utils import (
+    get_quotas,
+    get_translations,
+    sample_csv,
+)
+
+
+class SampleCsvTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "reviews.csv")
+        pd.DataFrame(
+            {
+                "review": [f"review {i}" for i in range(1000)],
+                "label": [int(i < 100) for i in range(1000)],
+                "unused": range(1000),
+            }
+        ).to_csv(self.path, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def sample(self, chunk_size, stratify=None):
+        return sample_csv(
+            self.path,
+            usecols=["review", "label"],
+            dtype={"review": str, "label": "int8"},
+            sample_size=50,
+            chunk_size=chunk_size,
+            stratify=stratify,
+        )
+
+    def test_sample_csv(self):
+        """
+        Should keep 'sample_size' rows of the needed columns, in file order.
+        """
+        sample = self.sample(chunk_size=64)
+
+        self.assertEqual(len(sample), 50)
+        self.assertEqual(list(sample.columns), ["review", "label"])
+        self.assertEqual(sample["label"].dtype, "int8")
+        self.assertTrue(sample.index.is_monotonic_increasing)
+        self.assertTrue(sample.index.is_unique)
+
+    def test_sample_csv_chunk_size(self):
+        """
+        Should give the same sample whatever the chunk size.
+        """
+        pd.testing.assert_frame_equal(
+            self.sample(chunk_size=7), self.sample(chunk_size=1000)
+        )
+
+    def test_sample_csv_stratify(self):
+        """
+        Should sample as many rows of each label.
+        """
+        sample = self.sample(chunk_size=64, stratify="label")
+
+        self.assertEqual(sample["label"].value_counts().to_dict(), {0: 25, 1: 25})
+
+    def test_sample_csv_stratify_remainder(self):
+        """
+        Should keep 'sample_size' rows when the labels do not divide it, or
+        when a label has too few rows.
+        """
+        pd.DataFrame(
+            {"review": [f"review {i}" for i in range(1000)], "label": range(1000)}
+        ).assign(label=lambda data: data["label"] % 3).to_csv(self.path, index=False)
+
+        counts = self.sample(chunk_size=64, stratify="label")["label"].value_counts()
+
+        self.assertEqual(counts.sum(), 50)
+        self.assertEqual(sorted(counts.tolist()), [16, 17, 17])
+
+        self.assertEqual(get_quotas({0: 900, 1: 10, 2: 90}, 50), {1: 10, 2: 20, 0: 20})
+        self.assertEqual(get_quotas({0: 5, 1: 3}, 50), {1: 3, 0: 5})
+
+
+class CreateDataframesCommandTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = self.tmp_dir.name + "/"
+
+        reviews = [f"avis {i}" for i in range(30)]
+        labels = [i % 2 for i in range(30)]
+        sources = {
+            "allocine_french_review.csv": {
+                "Unnamed: 0": range(30),
+                "film-url": ["url"] * 30,
+                "review": reviews,
+                "polarity": labels,
+            },
+            "amazon_fr_en_review.csv": {
+                "review": reviews,
+                "rating": [1 + i % 5 for i in range(30)],
+                "translation": [f"review {i}" for i in range(30)],
+            },
+            "french_tweets.csv": {"label": labels, "text": reviews},
+        }
+        for file in DATA_FILES:
+            if file in sources:
+                data = sources[file]
+            elif "fr" in file:
+                data = {"review": ["super"], "satisfaction": [1]}
+            else:
+                data = {"en": ["great"], "satisfaction": [1]}
+            pd.DataFrame(data).to_csv(self.data_path + file, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def call_command(self, *args):
+        with patch.dict(os.environ, {"DATA_PATH": self.data_path}):
+            call_command("create_dataframes", *args, stdout=StringIO())
+
+    def test_command(self):
+        """
+        Should write both datasets with sampled, translated and cleaned reviews.
+        """
+        self.call_command(
+            "--sample-size", "10", "--chunk-size", "8", "--translator", "stub"
+        )
+
+        texts_fr, labels_fr = load_dataset(get_dataset_path(self.data_path, "fr"))
+        texts_en, labels_en = load_dataset(get_dataset_path(self.data_path, "en"))
+
+        # 3 sampled sources and 3 AI files
+        self.assertEqual(len(texts_fr), 33)
+        self.assertEqual(len(texts_en), 33)
+        self.assertEqual(labels_fr.dtype, np.int8)
+        self.assertEqual(texts_fr[0], "avis")
+        self.assertEqual(texts_en[0], "en avis")
+        self.assertFalse(os.path.isfile(self.data_path + "dataframe_fr.csv"))
+
+    def test_command_processes_translation_rate(self):
+        """
+        Should split the translation rate between the processes translating
+        at the same time.
+        """
+        with patch(
+            "satisfactions.management.commands.create_dataframes.ProcessPoolExecutor",
+            ThreadPoolExecutor,
+        ), patch(
+            "satisfactions.management.commands.create_dataframes.get_translations",
+            side_effect=get_translations,
+        ) as mock_translations:
+            self.call_command(
+                "--sample-size",
+                "10",
+                "--translator",
+                "stub",
+                "--processes",
+                "3",
+                "--translation-rate",
+                "10",
+            )
+
+        self.assertEqual(mock_translations.call_count, 2)
+        for call in mock_translations.call_args_list:
+            self.assertEqual(call.kwargs["rate"], 5)
+
+    def test_command_export_csv(self):
+        """
+        Should also write both dataframes, with the uncleaned reviews.
+        """
+        self.call_command("--sample-size", "10", "--translator", "stub", "--export-csv")
+
+        dataframe_fr = pd.read_csv(self.data_path + "dataframe_fr.csv")
+        dataframe_en = pd.read_csv(self.data_path + "dataframe_en.csv")
+
+        self.assertEqual(list(dataframe_fr.columns), ["satisfaction", "review"])
+        self.assertEqual(list(dataframe_en.columns), ["satisfaction", "en"])
+        self.assertEqual(len(dataframe_fr), 33)
+        self.assertTrue(dataframe_en["en"].iloc[0].startswith("[en] avis"))
+        self.assertFalse(os.path.isfile(self.data_path + "dataframe_fr.csv.part"))
+
+    def test_command_convert_dataframes(self):
+        """
+        Should build the datasets from existing dataframes, without the sources.
+        """
+        for file in DATA_FILES:
+            os.remove(self.data_path + file)
+        pd.DataFrame({"satisfaction": [1, 0], "review": ["Très BIEN !", None]}).to_csv(
+            self.data_path + "dataframe_fr.csv", index=False
+        )
+        pd.DataFrame({"satisfaction": [1], "en": ["Great!"]}).to_csv(
+            self.data_path + "dataframe_en.csv", index=False
+        )
+
+        self.call_command()
+
+        texts, labels = load_dataset(get_dataset_path(self.data_path, "fr"))
+        self.assertEqual(texts, ["très bien", ""])
+        self.assertEqual(labels.tolist(), [1, 0])
@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+import numpy as np
+from django.test import SimpleTestCase
+from satisfactions.dataset import dataset_exists, load_dataset, save_dataset
+
+
+class DatasetTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "dataset_fr")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_load_dataset(self):
+        """
+        Should load the same texts and labels, in the same order.
+        """
+        texts = ["très bien", "", "nul", "génial œuvre"]
+
+        self.assertFalse(dataset_exists(self.path))
+        save_dataset(self.path, texts, [1, 0, 0, 1])
+
+        self.assertTrue(dataset_exists(self.path))
+        loaded_texts, labels = load_dataset(self.path)
+        self.assertEqual(loaded_texts, texts)
+        self.assertEqual(labels.dtype, np.int8)
+        self.assertEqual(labels.tolist(), [1, 0, 0, 1])
+
+    def test_save_dataset_replace(self):
+        """
+        Should replace a previous dataset without leaving temporary folders.
+        """
+        save_dataset(self.path, ["nul"], [0])
+        save_dataset(self.path, ["bien", "super"], [1, 1])
+
+        self.assertEqual(load_dataset(self.path)[0], ["bien", "super"])
+        # Link to the dataset, its version and the previous one
+        names = sorted(os.listdir(self.tmp_dir.name))
+        self.assertEqual(names[2], "dataset_fr")
+        self.assertTrue(all(name.startswith(".dataset_fr.v") for name in names[:2]))
+
+    def test_save_dataset_length_mismatch(self):
+        """
+        Should refuse texts and labels of different lengths.
+        """
+        with self.assertRaises(ValueError):
+            save_dataset(self.path, ["bien"], [1, 0])
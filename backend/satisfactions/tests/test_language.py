@@ -0,0 +1,53 @@
+from django.test import SimpleTestCase
+from satisfactions.language import LanguageIdentifier
+
+
+class LanguageIdentifierTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.identifier = LanguageIdentifier()
+
+    def test_detect_supported_languages_success(self):
+        """
+        Should recognize French and English comments.
+        """
+        self.assertEqual(
+            self.identifier.detect("Le film était vraiment nul, je me suis ennuyé"),
+            "fr",
+        )
+        self.assertEqual(
+            self.identifier.detect("The movie was boring and way too long"), "en"
+        )
+
+    def test_detect_other_language_failure(self):
+        """
+        Should return None for other languages or texts without letters.
+        """
+        self.assertIsNone(self.identifier.detect("ich spreche deutsch"))
+        self.assertIsNone(
+            self.identifier.detect("Este producto es muy bueno y lo recomiendo")
+        )
+        self.assertIsNone(self.identifier.detect("1234567890"))
+
+    def test_detect_short_text_with_stop_words(self):
+        """
+        Short texts made of stop words should not need the n-gram scores.
+        """
+        self.assertEqual(self.identifier.detect("très bien"), "fr")
+        self.assertEqual(self.identifier.detect("great app"), "en")
+
+    def test_detect_batch_is_deterministic(self):
+        """
+        Should return one result per text, always the same.
+        """
+        texts = [
+            "je parle français et ça marche",
+            "ich spreche deutsch",
+            "Bryan is in the kitchen",
+        ]
+        expected_output = ["fr", None, "en"]
+
+        self.assertEqual(self.identifier.detect_batch(texts), expected_output)
+        self.assertEqual(self.identifier.detect_batch(texts), expected_output)
+        self.assertEqual(self.identifier.detect_batch([]), [])
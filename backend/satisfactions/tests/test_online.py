@@ -0,0 +1,219 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from satisfactions.models import Satisfaction
+from satisfactions.online import OnlineModel, get_training_rows, mark_learned
+from satisfactions.registry import ModelRegistry
+from satisfactions.tests.test_training import LABELS, TEXTS
+from satisfactions.training import build_pipeline, save_pipeline
+
+User = get_user_model()
+
+
+class OnlineTrainingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = self.tmp_dir.name + "/"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def create(self, description, polarity, language="en", **kwargs):
+        return Satisfaction.objects.create(
+            description=description,
+            user=self.user,
+            language=language,
+            polarity=polarity,
+            **kwargs,
+        )
+
+    def call_command(self, *args):
+        with patch.dict(os.environ, {"DATA_PATH": self.data_path}):
+            call_command("retrain_models", "--lang", "en", *args, stdout=StringIO())
+
+    def test_get_training_rows(self):
+        """
+        Should stream the scored rows not learned yet.
+        """
+        self.create("old comment", True, learned_at=timezone.now())
+        corrected = self.create("great app", False, corrected_polarity=True)
+        predicted = self.create("awful app", False)
+        self.create("pending", None, status=Satisfaction.Status.PENDING)
+        self.create("ok app", True, status=Satisfaction.Status.UNCERTAIN)
+        self.create("en français", True, language="fr")
+
+        chunks = list(get_training_rows("en", chunk_size=1))
+
+        self.assertEqual(
+            chunks,
+            [[(corrected.id, "great app", True)], [(predicted.id, "awful app", False)]],
+        )
+
+        chunks = list(get_training_rows("en", chunk_size=10, corrected_only=True))
+        self.assertEqual(chunks, [[(corrected.id, "great app", True)]])
+
+        chunks = list(get_training_rows("en", chunk_size=10, learned=True))
+        self.assertEqual(len(chunks[0]), 3)
+
+    def test_get_training_rows_uncertain(self):
+        """
+        Should only learn uncertain satisfactions once they are corrected.
+        """
+        self.create("ok app", True, status=Satisfaction.Status.UNCERTAIN)
+        corrected = self.create(
+            "fine app",
+            True,
+            status=Satisfaction.Status.UNCERTAIN,
+            corrected_polarity=False,
+        )
+
+        chunks = list(get_training_rows("en", chunk_size=10))
+
+        self.assertEqual(chunks, [[(corrected.id, "fine app", False)]])
+
+    def test_command(self):
+        """
+        Should only learn the satisfactions saved since the last run.
+        """
+        for text, label in zip(TEXTS, LABELS):
+            self.create(text, bool(label))
+
+        self.call_command()
+
+        model = OnlineModel(self.data_path, "en").load()
+        self.assertEqual(model.state, {"samples": len(TEXTS)})
+        self.assertFalse(Satisfaction.objects.filter(learned_at__isnull=True).exists())
+        self.assertEqual(
+            model.pipeline.predict(["great app", "awful app"]).tolist(), [1, 0]
+        )
+
+        new = self.create("i love it", True)
+        with patch.object(OnlineModel, "partial_fit") as mock_partial_fit:
+            self.call_command()
+
+        mock_partial_fit.assert_called_once_with(("i love it",), (True,))
+        new.refresh_from_db()
+        self.assertIsNotNone(new.learned_at)
+
+    def test_command_scored_later(self):
+        """
+        Should learn satisfactions scored or corrected after a run, even
+        older than the ones it learned.
+        """
+        pending = self.create("i love it", None, status=Satisfaction.Status.PENDING)
+        uncertain = self.create("ok app", True, status=Satisfaction.Status.UNCERTAIN)
+        self.create("great app", True)
+        self.call_command()
+
+        Satisfaction.objects.filter(id=pending.id).update(
+            status=Satisfaction.Status.SCORED, polarity=True
+        )
+        Satisfaction.objects.filter(id=uncertain.id).update(corrected_polarity=False)
+        with patch.object(OnlineModel, "partial_fit") as mock_partial_fit:
+            self.call_command()
+
+        mock_partial_fit.assert_called_once_with(("i love it", "ok app"), (True, False))
+
+    def test_command_corrected_only(self):
+        """
+        Should leave the uncorrected satisfactions to the next full run.
+        """
+        self.create("great app", True)
+        self.call_command()
+
+        predicted = self.create("i love it", True)
+        self.create("awful app", True, corrected_polarity=False)
+        self.call_command("--corrected-only")
+
+        with patch.object(OnlineModel, "partial_fit") as mock_partial_fit:
+            self.call_command()
+
+        mock_partial_fit.assert_called_once_with(("i love it",), (True,))
+        predicted.refresh_from_db()
+        self.assertIsNotNone(predicted.learned_at)
+
+    def test_command_corrected_after_learned(self):
+        """
+        Should learn again a satisfaction corrected after it was learned.
+        """
+        satisfaction = self.create("great app", True)
+        self.call_command()
+
+        satisfaction.corrected_polarity = False
+        satisfaction.save()
+        self.assertIsNone(satisfaction.learned_at)
+
+        with patch.object(OnlineModel, "partial_fit") as mock_partial_fit:
+            self.call_command("--corrected-only")
+
+        mock_partial_fit.assert_called_once_with(("great app",), (False,))
+        satisfaction.refresh_from_db()
+        self.assertIsNotNone(satisfaction.learned_at)
+
+    def test_mark_learned_corrected_meanwhile(self):
+        """
+        Should not mark as learned a satisfaction corrected while its previous
+        label was learned.
+        """
+        satisfaction = self.create("great app", True)
+        learned = self.create("awful app", False)
+        Satisfaction.objects.filter(id=satisfaction.id).update(corrected_polarity=False)
+
+        mark_learned([(satisfaction.id, True), (learned.id, False)], chunk_size=10)
+
+        satisfaction.refresh_from_db()
+        learned.refresh_from_db()
+        self.assertIsNone(satisfaction.learned_at)
+        self.assertIsNotNone(learned.learned_at)
+
+    def test_command_legacy_watermark(self):
+        """
+        Should not learn again the satisfactions below the id watermark of
+        a previous version.
+        """
+        learned = self.create("great app", True)
+        OnlineModel(self.data_path, "en").create().save()
+        with open(OnlineModel(self.data_path, "en").state_path, "w") as file:
+            json.dump({"last_id": learned.id, "samples": 1}, file)
+        new = self.create("i love it", True)
+
+        with patch.object(OnlineModel, "partial_fit") as mock_partial_fit:
+            self.call_command()
+
+        mock_partial_fit.assert_called_once_with(("i love it",), (True,))
+        model = OnlineModel(self.data_path, "en").load()
+        self.assertEqual(model.state, {"samples": 1})
+        self.assertEqual(
+            Satisfaction.objects.filter(learned_at__isnull=True).count(), 0
+        )
+        new.refresh_from_db()
+        self.assertIsNotNone(new.learned_at)
+
+    def test_command_publish(self):
+        """
+        Should replace the model served by the registry, and its export.
+        """
+        registry = ModelRegistry(data_path=self.data_path)
+        save_pipeline(build_pipeline().fit(TEXTS, LABELS), self.data_path, "en")
+        for text, label in zip(TEXTS, LABELS):
+            self.create(text, bool(label))
+
+        self.call_command("--publish")
+
+        self.assertFalse(os.path.exists(registry.get_export_path("en")))
+        model = registry.get("en")
+        self.assertEqual(model.named_steps["hashing"].n_features, 2**20)
+        self.assertEqual(model.predict(["great app"]).tolist(), [1])
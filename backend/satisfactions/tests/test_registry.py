@@ -0,0 +1,93 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import joblib
+from django.test import SimpleTestCase
+from satisfactions.cache import prediction_cache
+from satisfactions.registry import ModelNotAvailable, ModelRegistry, registry
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+
+def build_pipeline():
+    """
+    Tiny pipeline with the same shape as the ones created by 'create_models'.
+    """
+    pipeline = Pipeline([("tfidf", TfidfVectorizer()), ("clf", MultinomialNB())])
+    pipeline.fit(["great app", "i love it", "awful app", "i hate it"], [1, 1, 0, 0])
+    return pipeline
+
+
+def reset_predictions(test):
+    """
+    Forget the models and predictions of the process before and after 'test':
+    a prediction cached by another test would skip its mocked models.
+    """
+    registry.clear()
+    prediction_cache.clear()
+    test.addCleanup(registry.clear)
+    test.addCleanup(prediction_cache.clear)
+
+
+class ModelRegistryTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = self.tmp_dir.name + "/"
+        self.registry = ModelRegistry(data_path=self.data_path)
+        self.model_path = self.registry.get_model_path("en")
+        joblib.dump(build_pipeline(), self.model_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_loads_model_once(self):
+        """
+        Should unpickle the model only on the first call.
+        """
+        with patch(
+            "satisfactions.registry.joblib.load", wraps=joblib.load
+        ) as mock_load:
+            first = self.registry.get("en")
+            second = self.registry.get("en")
+
+        self.assertIs(first, second)
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertEqual(first.predict(["great app"])[0], 1)
+
+    def test_get_reloads_when_file_changes(self):
+        """
+        Should reload the model when a new pickle is written.
+        """
+        first = self.registry.get("en")
+
+        joblib.dump(build_pipeline(), self.model_path)
+        stat = os.stat(self.model_path)
+        os.utime(self.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        second = self.registry.get("en")
+        self.assertIsNot(first, second)
+
+    def test_get_missing_model_failure(self):
+        """
+        Should raise ModelNotAvailable when there is no pickle.
+        """
+        self.assertFalse(self.registry.is_available("fr"))
+        with self.assertRaises(ModelNotAvailable):
+            self.registry.get("fr")
+
+    def test_clear(self):
+        """
+        Should load the model again after clear().
+        """
+        first = self.registry.get("en")
+        self.registry.clear()
+        self.assertIsNot(first, self.registry.get("en"))
+
+    def test_warm_up_loads_available_models(self):
+        """
+        Should load every language which has a pickle and skip the others.
+        """
+        self.assertEqual(self.registry.warm_up(), ["en"])
+        self.assertIn("en", self.registry._models)
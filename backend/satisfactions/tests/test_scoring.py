@@ -0,0 +1,340 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from satisfactions.models import Satisfaction
+from satisfactions.predictions import predict_scores
+from satisfactions.registry import ModelNotAvailable
+from satisfactions.scoring import (
+    process_pending,
+    requeue_processing,
+    requeue_uncertain,
+)
+from satisfactions.tests.test_registry import build_pipeline, reset_predictions
+from satisfactions.text import clean_texts
+
+User = get_user_model()
+
+
+def create_pending(user, description):
+    return Satisfaction.objects.create(
+        description=description,
+        user=user,
+        status=Satisfaction.Status.PENDING,
+    )
+
+
+class ScoringTest(TestCase):
+    def setUp(self):
+        reset_predictions(self)
+
+        self.user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        self.model = build_pipeline()
+
+    def test_process_pending_success(self):
+        """
+        Should score English comments and reject the other languages.
+        """
+        positive = create_pending(self.user, "great app, i love it")
+        negative = create_pending(self.user, "awful app, i hate it")
+        german = create_pending(self.user, "ich spreche deutsch")
+
+        with patch(
+            "satisfactions.predictions.registry.get", return_value=self.model
+        ) as mock_get:
+            claimed, processed = process_pending(batch_size=10)
+
+        self.assertEqual((claimed, processed), (3, 3))
+        mock_get.assert_called_once_with("en")
+
+        for satisfaction in (positive, negative, german):
+            satisfaction.refresh_from_db()
+
+        self.assertEqual(positive.status, Satisfaction.Status.SCORED)
+        self.assertEqual(positive.language, "en")
+        self.assertTrue(positive.polarity)
+        self.assertFalse(negative.polarity)
+        self.assertGreaterEqual(positive.confidence, 0.6)
+        self.assertEqual(german.status, Satisfaction.Status.REJECTED)
+        self.assertIsNone(german.polarity)
+        self.assertIsNone(german.confidence)
+
+    @override_settings(SATISFACTION_UNCERTAINTY_THRESHOLD=1.0)
+    def test_process_pending_uncertain(self):
+        """
+        Should flag the satisfactions scored below the confidence threshold.
+        """
+        satisfaction = create_pending(self.user, "great app, i love it")
+
+        with patch("satisfactions.predictions.registry.get", return_value=self.model):
+            self.assertEqual(process_pending(batch_size=10), (1, 1))
+
+        satisfaction.refresh_from_db()
+        self.assertEqual(satisfaction.status, Satisfaction.Status.UNCERTAIN)
+        self.assertTrue(satisfaction.polarity)
+        self.assertLess(satisfaction.confidence, 1.0)
+
+    def test_predict_scores(self):
+        """
+        Should return the polarity of predict with its probability.
+        """
+        texts = ["great app, i love it", "awful app, i hate it"]
+
+        with patch("satisfactions.predictions.registry.get", return_value=self.model):
+            scores = predict_scores("en", texts)
+
+        texts = clean_texts("en", texts)
+
+        self.assertEqual(
+            [polarity for polarity, _ in scores],
+            [bool(label) for label in self.model.predict(texts)],
+        )
+        self.assertEqual(
+            [confidence for _, confidence in scores],
+            self.model.predict_proba(texts).max(axis=1).tolist(),
+        )
+
+    def test_process_pending_batch_size(self):
+        """
+        Should claim at most 'batch_size' satisfactions.
+        """
+        for _ in range(3):
+            create_pending(self.user, "great app, i love it")
+
+        with patch("satisfactions.predictions.registry.get", return_value=self.model):
+            self.assertEqual(process_pending(batch_size=2), (2, 2))
+            self.assertEqual(process_pending(batch_size=2), (1, 1))
+            self.assertEqual(process_pending(batch_size=2), (0, 0))
+
+    @patch("satisfactions.predictions.registry.get", side_effect=ModelNotAvailable())
+    def test_process_pending_missing_model(self, mock_get):
+        """
+        Should keep satisfactions pending when the model is missing.
+        """
+        satisfaction = create_pending(self.user, "great app, i love it")
+
+        self.assertEqual(process_pending(batch_size=10), (1, 0))
+
+        satisfaction.refresh_from_db()
+        self.assertEqual(satisfaction.status, Satisfaction.Status.PENDING)
+
+    def test_process_pending_missing_model_deferred(self):
+        """
+        Should not claim again a satisfaction whose model is missing before
+        SATISFACTION_RETRY_DELAY, nor block the next ones.
+        """
+        deferred = create_pending(self.user, "great app, i love it")
+        with patch(
+            "satisfactions.predictions.registry.get", side_effect=ModelNotAvailable()
+        ):
+            self.assertEqual(process_pending(batch_size=1), (1, 0))
+
+        scoreable = create_pending(self.user, "awful app, i hate it")
+        with patch("satisfactions.predictions.registry.get", return_value=self.model):
+            self.assertEqual(process_pending(batch_size=1), (1, 1))
+            self.assertEqual(process_pending(batch_size=1), (0, 0))
+
+            Satisfaction.objects.filter(id=deferred.id).update(
+                claimed_at=timezone.now() - timedelta(minutes=10)
+            )
+            self.assertEqual(process_pending(batch_size=1), (1, 1))
+
+        deferred.refresh_from_db()
+        scoreable.refresh_from_db()
+        self.assertEqual(deferred.status, Satisfaction.Status.SCORED)
+        self.assertEqual(scoreable.status, Satisfaction.Status.SCORED)
+
+    def test_requeue_processing(self):
+        """
+        Should put stale processing satisfactions back in the queue, not
+        those claimed by a running worker.
+        """
+        stale = create_pending(self.user, "great app, i love it")
+        claimed = create_pending(self.user, "awful app, i hate it")
+        Satisfaction.objects.update(status=Satisfaction.Status.PROCESSING)
+        Satisfaction.objects.filter(id=stale.id).update(
+            claimed_at=timezone.now() - timedelta(hours=1)
+        )
+        Satisfaction.objects.filter(id=claimed.id).update(claimed_at=timezone.now())
+
+        self.assertEqual(requeue_processing(), 1)
+
+        stale.refresh_from_db()
+        claimed.refresh_from_db()
+        self.assertEqual(stale.status, Satisfaction.Status.PENDING)
+        self.assertEqual(claimed.status, Satisfaction.Status.PROCESSING)
+
+    def test_requeue_uncertain(self):
+        """
+        Should put uncertain satisfactions back in the queue, not scored ones.
+        """
+        uncertain = create_pending(self.user, "ok app")
+        scored = create_pending(self.user, "great app, i love it")
+        Satisfaction.objects.filter(id=uncertain.id).update(
+            status=Satisfaction.Status.UNCERTAIN, polarity=True, confidence=0.52
+        )
+        Satisfaction.objects.filter(id=scored.id).update(
+            status=Satisfaction.Status.SCORED, polarity=True, confidence=0.9
+        )
+
+        self.assertEqual(requeue_uncertain(), 1)
+
+        uncertain.refresh_from_db()
+        scored.refresh_from_db()
+        self.assertEqual(uncertain.status, Satisfaction.Status.PENDING)
+        self.assertEqual(scored.status, Satisfaction.Status.SCORED)
+
+    @override_settings(SATISFACTION_ASYNC_SCORING=True)
+    @patch("satisfactions.predictions.language_identifier.detect_batch")
+    def test_create_satisfaction_async(self, mock_detect):
+        """
+        Should save the satisfaction as pending without any prediction.
+        """
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        data = {
+            "description": "great app, i love it",
+            "email": "user@user.com",
+            "first_name": "user",
+            "last_name": "user",
+        }
+
+        response = client.post(
+            reverse("satisfactions_create"), data=data, format="json"
+        )
+        bulk_response = client.post(
+            reverse("satisfactions_bulk_create"), data=[data], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(bulk_response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["status"], Satisfaction.Status.PENDING)
+        self.assertIsNone(response.json()["polarity"])
+        self.assertEqual(
+            Satisfaction.objects.filter(status=Satisfaction.Status.PENDING).count(), 2
+        )
+        mock_detect.assert_not_called()
+
+
+class ScoreSatisfactionsCommandTest(TransactionTestCase):
+    def setUp(self):
+        reset_predictions(self)
+
+    def test_command_once(self):
+        """
+        Should score every pending satisfaction and stop.
+        """
+        user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        for _ in range(5):
+            create_pending(user, "great app, i love it")
+
+        with patch(
+            "satisfactions.predictions.registry.get", return_value=build_pipeline()
+        ):
+            call_command(
+                "score_satisfactions",
+                "--once",
+                "--workers",
+                "1",
+                "--batch-size",
+                "2",
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(
+            Satisfaction.objects.filter(status=Satisfaction.Status.SCORED).count(), 5
+        )
+
+    @override_settings(SATISFACTION_RETRY_DELAY=0)
+    def test_command_once_missing_model(self):
+        """
+        Should score the next satisfactions when a batch only holds ones whose
+        model is missing, and try those only once.
+        """
+        user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        french = create_pending(user, "très bon film, je vous le conseille")
+        english = create_pending(user, "great app, i love it")
+        model = build_pipeline()
+
+        def get_model(lang):
+            if lang == "fr":
+                raise ModelNotAvailable()
+            return model
+
+        with patch(
+            "satisfactions.predictions.registry.get", side_effect=get_model
+        ) as mock_get:
+            call_command(
+                "score_satisfactions",
+                "--once",
+                "--batch-size",
+                "1",
+                "--interval",
+                "0",
+                stdout=StringIO(),
+            )
+
+        french.refresh_from_db()
+        english.refresh_from_db()
+        self.assertEqual(french.status, Satisfaction.Status.PENDING)
+        self.assertEqual(english.status, Satisfaction.Status.SCORED)
+        self.assertEqual(
+            [call.args[0] for call in mock_get.call_args_list].count("fr"), 1
+        )
+
+    @override_settings(SATISFACTION_RETRY_DELAY=0)
+    def test_command_batch_error(self):
+        """
+        Should log an unexpected error and keep scoring, the failed batch is
+        left to the next run.
+        """
+        user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        failed = create_pending(user, "great app, i love it")
+        scored = create_pending(user, "awful app, i hate it")
+
+        with patch(
+            "satisfactions.predictions.registry.get",
+            side_effect=[ValueError("Corrupted model"), build_pipeline()],
+        ), self.assertLogs("satisfactions", level="ERROR") as logs:
+            call_command(
+                "score_satisfactions",
+                "--once",
+                "--batch-size",
+                "1",
+                "--interval",
+                "0",
+                stdout=StringIO(),
+            )
+
+        self.assertIn("Corrupted model", "\n".join(logs.output))
+        failed.refresh_from_db()
+        scored.refresh_from_db()
+        self.assertEqual(failed.status, Satisfaction.Status.PENDING)
+        self.assertEqual(scored.status, Satisfaction.Status.SCORED)
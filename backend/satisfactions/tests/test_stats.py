@@ -0,0 +1,287 @@
+from datetime import date, datetime, timezone
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from satisfactions.models import Satisfaction, SatisfactionRollup
+from satisfactions.scoring import requeue_uncertain
+from satisfactions.stats import get_stats, update_rollups
+from satisfactions.tests.test_registry import build_pipeline, reset_predictions
+
+User = get_user_model()
+
+MONDAY = datetime(2025, 3, 3, 10, tzinfo=timezone.utc)
+TUESDAY = datetime(2025, 3, 4, 10, tzinfo=timezone.utc)
+NEXT_MONDAY = datetime(2025, 3, 10, 10, tzinfo=timezone.utc)
+
+
+class StatsTest(TestCase):
+    def setUp(self):
+        reset_predictions(self)
+
+        self.user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+            created_at=datetime(2025, 1, 15, tzinfo=timezone.utc),
+        )
+        self.other_user = User.objects.create_user(
+            email="jane@example.com",
+            password="pass12345",
+            first_name="Jane",
+            last_name="Doe",
+            created_at=datetime(2025, 2, 15, tzinfo=timezone.utc),
+        )
+
+    def create(self, created_at, polarity, language="en", user=None, **kwargs):
+        return Satisfaction.objects.create(
+            description="great app, i love it",
+            user=user or self.user,
+            created_at=created_at,
+            polarity=polarity,
+            language=language,
+            **kwargs,
+        )
+
+    def create_all(self):
+        return [
+            self.create(MONDAY, True),
+            self.create(MONDAY, False, language="fr"),
+            self.create(
+                TUESDAY, True, status=Satisfaction.Status.UNCERTAIN, confidence=0.55
+            ),
+            self.create(NEXT_MONDAY, False, user=self.other_user),
+            self.create(MONDAY, None, status=Satisfaction.Status.PENDING),
+            self.create(MONDAY, None, status=Satisfaction.Status.REJECTED),
+        ]
+
+    def get_rollups(self):
+        return sorted(
+            SatisfactionRollup.objects.values_list(
+                "period",
+                "period_start",
+                "language",
+                "cohort",
+                "positive",
+                "negative",
+                "uncertain",
+            )
+        )
+
+    def test_update_rollups(self):
+        """
+        Should count scored satisfactions by day and week, language and cohort.
+        """
+        update_rollups(self.create_all())
+
+        self.assertEqual(
+            self.get_rollups(),
+            [
+                ("day", date(2025, 3, 3), "en", "2025-01", 1, 0, 0),
+                ("day", date(2025, 3, 3), "fr", "2025-01", 0, 1, 0),
+                ("day", date(2025, 3, 4), "en", "2025-01", 1, 0, 1),
+                ("day", date(2025, 3, 10), "en", "2025-02", 0, 1, 0),
+                ("week", date(2025, 3, 3), "en", "2025-01", 2, 0, 1),
+                ("week", date(2025, 3, 3), "fr", "2025-01", 0, 1, 0),
+                ("week", date(2025, 3, 10), "en", "2025-02", 0, 1, 0),
+            ],
+        )
+
+    def test_rebuild_rollups(self):
+        """
+        Should compute the same rollups as the incremental updates.
+        """
+        update_rollups(self.create_all())
+        expected = self.get_rollups()
+        SatisfactionRollup.objects.update(positive=0)
+
+        call_command("rebuild_stats", stdout=StringIO())
+
+        self.assertEqual(self.get_rollups(), expected)
+
+    def test_requeue_uncertain(self):
+        """
+        Should remove the requeued satisfactions from the stats.
+        """
+        update_rollups(self.create_all())
+
+        requeue_uncertain()
+
+        self.assertEqual(
+            SatisfactionRollup.objects.get(
+                period="day", period_start=TUESDAY.date()
+            ).positive,
+            0,
+        )
+
+    def test_deleted(self):
+        """
+        Should remove the deleted satisfactions from the stats, also when
+        their author is deleted.
+        """
+        satisfactions = self.create_all()
+        update_rollups(satisfactions)
+
+        satisfactions[0].delete()
+        self.other_user.delete()
+
+        rollups = self.get_rollups()
+        self.assertIn(("day", date(2025, 3, 3), "en", "2025-01", 0, 0, 0), rollups)
+        self.assertIn(("week", date(2025, 3, 10), "en", "2025-02", 0, 0, 0), rollups)
+        self.assertIn(("week", date(2025, 3, 3), "fr", "2025-01", 0, 1, 0), rollups)
+
+    def test_corrected(self):
+        """
+        Should count the polarity corrected by an admin, and keep the rollups
+        equal to a rebuild.
+        """
+        satisfactions = self.create_all()
+        update_rollups(satisfactions)
+
+        satisfactions[0].corrected_polarity = False
+        satisfactions[0].save()
+        satisfactions[3].language = "fr"
+        satisfactions[3].save()
+        # Not counted before nor after
+        satisfactions[4].save()
+
+        rollups = self.get_rollups()
+        self.assertIn(("day", date(2025, 3, 3), "en", "2025-01", 0, 1, 0), rollups)
+        self.assertIn(("week", date(2025, 3, 3), "en", "2025-01", 1, 1, 1), rollups)
+        self.assertIn(("day", date(2025, 3, 10), "fr", "2025-02", 0, 1, 0), rollups)
+
+        call_command("rebuild_stats", stdout=StringIO())
+        self.assertEqual(
+            [rollup for rollup in rollups if any(rollup[4:])], self.get_rollups()
+        )
+
+    def test_corrected_not_counted(self):
+        """
+        Should not remove from the stats a satisfaction which was not counted.
+        """
+        pending = self.create(MONDAY, None, status=Satisfaction.Status.PENDING)
+
+        pending.corrected_polarity = True
+        pending.save()
+        self.assertEqual(self.get_rollups(), [])
+
+        # Counted once scored, with its correction
+        pending.status = Satisfaction.Status.SCORED
+        pending.polarity = False
+        pending.save()
+        self.assertIn(
+            ("day", date(2025, 3, 3), "en", "2025-01", 1, 0, 0), self.get_rollups()
+        )
+
+        pending.corrected_polarity = False
+        pending.save()
+        rollups = self.get_rollups()
+        self.assertIn(("day", date(2025, 3, 3), "en", "2025-01", 0, 1, 0), rollups)
+        self.assertTrue(all(count >= 0 for rollup in rollups for count in rollup[4:]))
+
+    def test_get_stats(self):
+        """
+        Should sum the rollups of the date range by the requested fields.
+        """
+        update_rollups(self.create_all())
+
+        stats = get_stats("week", start=date(2025, 3, 1), end=date(2025, 3, 9))
+
+        self.assertEqual(
+            stats,
+            [
+                {
+                    "period_start": date(2025, 3, 3),
+                    "positive": 2,
+                    "negative": 1,
+                    "uncertain": 1,
+                    "total": 3,
+                    "positive_ratio": 2 / 3,
+                    "negative_ratio": 1 / 3,
+                }
+            ],
+        )
+
+        stats = get_stats("week", group_by=["cohort"])
+
+        self.assertEqual(
+            [(row["period_start"], row["cohort"], row["total"]) for row in stats],
+            [(date(2025, 3, 3), "2025-01", 3), (date(2025, 3, 10), "2025-02", 1)],
+        )
+
+
+class StatsViewTest(TestCase):
+    def setUp(self):
+        reset_predictions(self)
+
+        self.admin = User.objects.create_superuser(
+            email="admin@example.com",
+            password="pass12345",
+            first_name="Admin",
+            last_name="Admin",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse("satisfactions_stats")
+
+    def test_created_satisfactions_counted(self):
+        """
+        Should serve the satisfactions created through the API.
+        """
+        data = {
+            "description": "great app, i love it",
+            "email": "user@user.com",
+            "first_name": "user",
+            "last_name": "user",
+        }
+        with patch(
+            "satisfactions.predictions.registry.get", return_value=build_pipeline()
+        ):
+            self.client.post(reverse("satisfactions_create"), data, format="json")
+            self.client.post(
+                reverse("satisfactions_bulk_create"), [data, data], format="json"
+            )
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"group_by": "language"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["period"], "day")
+        results = response.json()["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["language"], "en")
+        self.assertEqual(results[0]["total"], 3)
+
+    def test_invalid_query_failure(self):
+        """
+        Should reject unknown periods, group_by fields and inverted date ranges.
+        """
+        for params in (
+            {"period": "year"},
+            {"group_by": "email"},
+            {"start": "2025-03-10", "end": "2025-03-01"},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_not_admin_failure(self):
+        """
+        Should refuse users who are not staff.
+        """
+        user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        self.client.force_authenticate(user=user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
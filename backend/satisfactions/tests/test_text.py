@@ -0,0 +1,53 @@
+import random
+
+import pandas as pd
+from django.test import SimpleTestCase
+from satisfactions.management.commands.benchmark_cleaning import clean_text_by_row
+from satisfactions.text import clean_text_en, clean_text_fr, clean_texts
+
+
+class CleanTextsTest(SimpleTestCase):
+    def test_clean_texts(self):
+        """
+        Should lower the text and keep only letters of the language.
+        """
+        texts = ["  Très BIEN, j'adore !!\n", "Top 10\tdes films", ""]
+
+        self.assertEqual(
+            clean_texts("fr", texts), ["très bien j adore", "top des films", ""]
+        )
+        self.assertEqual(
+            clean_texts("en", texts), ["tr s bien j adore", "top des films", ""]
+        )
+        self.assertEqual(clean_text_fr("Génial ŒUVRE"), "génial œuvre")
+        self.assertEqual(clean_text_en("Great app!"), "great app")
+
+    def test_clean_texts_series(self):
+        """
+        Should accept a Series and an empty batch.
+        """
+        self.assertEqual(clean_texts("fr", pd.Series(["A", "B"])), ["a", "b"])
+        self.assertEqual(clean_texts("fr", []), [])
+
+    def test_clean_texts_separator(self):
+        """
+        Should keep one cleaned text per text when they contain the separator.
+        """
+        self.assertEqual(clean_texts("fr", ["a\x00b", "c"]), ["a b", "c"])
+
+    def test_clean_texts_same_as_row_by_row(self):
+        """
+        Should give the same texts as the previous cleaning of each row.
+        """
+        random.seed(0)
+        characters = "aZéÉÀŒœß!?,.'-0 \n\t \x00İΣ😀"
+        texts = [
+            "".join(random.choice(characters) for _ in range(random.randint(0, 20)))
+            for _ in range(2000)
+        ]
+
+        for lang in ["fr", "en"]:
+            self.assertEqual(
+                clean_texts(lang, texts),
+                [clean_text_by_row(lang, text) for text in texts],
+            )
@@ -0,0 +1,256 @@
+import os
+import tempfile
+import warnings
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from satisfactions.dataset import get_dataset_path, save_dataset
+from satisfactions.registry import ModelRegistry
+from satisfactions.training import (
+    HASHING_PARAMETERS,
+    CachedSearch,
+    build_pipeline,
+    save_pipeline,
+)
+from sklearn.model_selection import GridSearchCV
+
+TEXTS = [
+    "great app i love it",
+    "love this great movie",
+    "really great and fun",
+    "i love the actors",
+    "awful app i hate it",
+    "hate this awful movie",
+    "really boring and bad",
+    "i hate the actors",
+] * 3
+LABELS = [1, 1, 1, 1, 0, 0, 0, 0] * 3
+
+PARAMETERS = {
+    "tfidf__max_df": [0.5, 1.0],
+    # 30: no term remains, the candidate fails
+    "tfidf__min_df": [1, 2, 30],
+    "tfidf__ngram_range": [(1, 1), (1, 2)],
+    "tfidf__sublinear_tf": [True, False],
+    "clf__estimator__alpha": [1e-2, 1.0],
+}
+
+
+class CachedSearchTest(SimpleTestCase):
+    def test_same_as_grid_search(self):
+        """
+        Should give the same scores and best estimator as GridSearchCV.
+        """
+        grid_search = GridSearchCV(build_pipeline(), PARAMETERS, cv=2)
+        with warnings.catch_warnings():
+            # Failed candidates
+            warnings.simplefilter("ignore")
+            grid_search.fit(TEXTS, LABELS)
+
+        search = CachedSearch(PARAMETERS, cv=2).fit(TEXTS, LABELS)
+
+        self.assertEqual(
+            search.cv_results_["params"], grid_search.cv_results_["params"]
+        )
+        np.testing.assert_allclose(
+            search.cv_results_["mean_test_score"],
+            grid_search.cv_results_["mean_test_score"],
+        )
+        self.assertEqual(search.best_params_, grid_search.best_params_)
+        self.assertEqual(search.best_score_, grid_search.best_score_)
+        self.assertEqual(
+            search.best_estimator_.predict(TEXTS).tolist(),
+            grid_search.best_estimator_.predict(TEXTS).tolist(),
+        )
+        self.assertEqual(search.score(TEXTS, LABELS), 1.0)
+
+    def test_hashing_same_as_grid_search(self):
+        """
+        Should give the same scores as GridSearchCV with hashed terms.
+        """
+        grid_search = GridSearchCV(
+            build_pipeline(n_features=2**10), HASHING_PARAMETERS, cv=2
+        )
+        grid_search.fit(TEXTS, LABELS)
+
+        search = CachedSearch(HASHING_PARAMETERS, cv=2, n_features=2**10)
+        search.fit(TEXTS, LABELS)
+
+        self.assertEqual(
+            search.cv_results_["params"], grid_search.cv_results_["params"]
+        )
+        np.testing.assert_allclose(
+            search.cv_results_["mean_test_score"],
+            grid_search.cv_results_["mean_test_score"],
+        )
+        self.assertEqual(search.best_params_, grid_search.best_params_)
+        self.assertEqual(search.best_estimator_.steps[0][1].n_features, 2**10)
+
+    def test_random_search(self):
+        """
+        Should only score 'n_iter' candidates of the grid.
+        """
+        search = CachedSearch(PARAMETERS, strategy="random", n_iter=5)
+        search.fit(TEXTS, LABELS)
+
+        self.assertEqual(len(search.cv_results_["params"]), 5)
+        self.assertEqual(len(search.history_), 5)
+        self.assertIn(search.best_params_, search.cv_results_["params"])
+
+    def test_halving_search(self):
+        """
+        Should score fewer candidates on more samples at each iteration.
+        """
+        search = CachedSearch(PARAMETERS, strategy="halving", factor=2)
+        search.fit(TEXTS * 4, LABELS * 4)
+
+        iterations = search.cv_results_["iter"]
+        n_resources = search.cv_results_["n_resources"]
+        counts = [iterations.count(i) for i in range(max(iterations) + 1)]
+
+        self.assertEqual(counts[0], 48)
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertEqual(n_resources, sorted(n_resources))
+        self.assertEqual(n_resources[-1], len(TEXTS) * 4)
+        self.assertEqual(
+            search.cv_results_["iter"][search.best_index_], max(iterations)
+        )
+
+    @patch("satisfactions.training.time.time")
+    def test_time_budget(self, mock_time):
+        """
+        Should stop scoring new candidates once the time budget is spent.
+        """
+        # Every call to time.time() moves 10 seconds forward
+        mock_time.side_effect = range(0, 100000, 10)
+
+        search = CachedSearch(PARAMETERS, time_budget=25, n_jobs=1)
+        search.fit(TEXTS, LABELS)
+
+        self.assertLess(len(search.history_), 48)
+        self.assertFalse(np.isnan(search.best_score_))
+        self.assertEqual(
+            search.score(TEXTS, LABELS), search.best_estimator_.score(TEXTS, LABELS)
+        )
+
+    def test_unsupported_parameters(self):
+        """
+        Should refuse TF-IDF parameters it cannot share between candidates.
+        """
+        with self.assertRaises(ValueError):
+            CachedSearch({"tfidf__binary": [True, False]})
+
+
+class CreateModelsCommandTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = self.tmp_dir.name + "/"
+        self.registry = ModelRegistry(data_path=self.data_path)
+        for lang in ["fr", "en"]:
+            save_dataset(get_dataset_path(self.data_path, lang), TEXTS, LABELS)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def call_command(self, *args, stdout=None):
+        with patch.dict(os.environ, {"DATA_PATH": self.data_path}):
+            call_command(
+                "create_models",
+                "--strategy",
+                "random",
+                "--n-iter",
+                "2",
+                *args,
+                stdout=stdout or StringIO(),
+            )
+
+    def test_command(self):
+        """
+        Should train both models, in parallel, whatever the output of the
+        command (a file can not be sent to the training processes).
+        """
+        with open(os.path.join(self.tmp_dir.name, "output.txt"), "w") as stdout:
+            self.call_command(stdout=stdout)
+
+        for lang in ["fr", "en"]:
+            model = self.registry.get(lang)
+            self.assertEqual(model.predict(["great app i love it"]).tolist(), [1])
+
+    def test_command_lang(self):
+        """
+        Should only retrain the model of '--lang', even if it exists.
+        """
+        manifest = save_pipeline(
+            build_pipeline().fit(TEXTS, LABELS), self.data_path, "fr"
+        )
+
+        self.call_command("--lang", "fr")
+
+        version = self.registry.store.get_active_version("fr")
+        self.assertNotEqual(version, manifest["version"])
+        self.assertEqual(
+            self.registry.store.get_manifest("fr", version)["params"]["strategy"],
+            "random",
+        )
+        self.assertFalse(self.registry.is_available("en"))
+
+    def test_command_hashing(self):
+        """
+        Should train and export pipelines without vocabulary.
+        """
+        self.call_command("--lang", "en", "--vectorizer", "hashing")
+
+        model = self.registry.get("en")
+        self.assertEqual(model.meta["hashing"]["n_features"], 2**18)
+        self.assertIsNone(model.vocabulary)
+        self.assertEqual(model.predict(["great app i love it"]).tolist(), [1])
+
+    def test_compare_vectorizers(self):
+        """
+        Should report the measures of both pipelines.
+        """
+        stdout = StringIO()
+        with patch.dict(os.environ, {"DATA_PATH": self.data_path}), patch(
+            "satisfactions.management.commands.compare_vectorizers.print_color",
+            side_effect=lambda text, *args: stdout.write(text + "\n"),
+        ):
+            call_command(
+                "compare_vectorizers",
+                "--n-iter",
+                "2",
+                "--n-features",
+                "1024",
+                "--repeat",
+                "1",
+            )
+
+        lines = stdout.getvalue().splitlines()
+        self.assertIn("tfidf", lines[-12])
+        self.assertIn("hashing", lines[-12])
+        self.assertIn("1024", next(line for line in lines if "Features" in line))
+
+
+class SavePipelineTest(SimpleTestCase):
+    def test_save_pipeline(self):
+        """
+        Should publish and activate a version, without temporary files left.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            registry = ModelRegistry(data_path=tmp_dir)
+            manifest = save_pipeline(
+                build_pipeline().fit(TEXTS, LABELS),
+                tmp_dir,
+                "en",
+                metrics={"test_accuracy": 1.0},
+            )
+
+            self.assertEqual(
+                sorted(os.listdir(registry.store.get_lang_path("en"))),
+                [manifest["version"], "ACTIVE"],
+            )
+            self.assertEqual(manifest["format"], "export")
+            self.assertEqual(manifest["metrics"], {"test_accuracy": 1.0})
+            self.assertEqual(registry.get("en").predict(TEXTS[:1]).tolist(), [1])
@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+import pandas as pd
+from django.test import SimpleTestCase
+from satisfactions.management.commands.utils import (
+    StubTranslatorBackend,
+    TranslationCache,
+    get_translations,
+)
+
+
+class TranslationsTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp_dir.name, "cache.sqlite3")
+        self.data = pd.DataFrame(
+            {"review": ["bonjour", "très bon film", "bonjour", None, "nul"]}
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def translate(self):
+        return get_translations(
+            self.data,
+            "fr",
+            "en",
+            translator="stub",
+            workers=2,
+            rate=0,
+            cache_path=self.cache_path,
+        )
+
+    def test_get_translations_order(self):
+        """
+        Should return one translation per review, in the same order.
+        """
+        self.assertEqual(
+            self.translate(),
+            ["[en] bonjour", "[en] très bon film", "[en] bonjour", "", "[en] nul"],
+        )
+
+    def test_get_translations_cache(self):
+        """
+        Should only translate each text once, even across runs.
+        """
+        with patch.object(
+            StubTranslatorBackend,
+            "translate",
+            autospec=True,
+            side_effect=lambda self, text, src, dest: text.upper(),
+        ) as mock_translate:
+            first = self.translate()
+            second = self.translate()
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_translate.call_count, 3)
+
+    @patch("satisfactions.management.commands.utils.time.sleep")
+    def test_get_translations_retry(self, mock_sleep):
+        """
+        Should retry failed translations, then leave them empty.
+        """
+        with patch.object(
+            StubTranslatorBackend, "translate", side_effect=ConnectionError()
+        ) as mock_translate:
+            translations = self.translate()
+
+        self.assertEqual(translations, ["", "", "", "", ""])
+        # 3 texts, 1 attempt + 3 retries each
+        self.assertEqual(mock_translate.call_count, 12)
+        self.assertIn(((0.5,),), mock_sleep.call_args_list)
+        self.assertIn(((2.0,),), mock_sleep.call_args_list)
+
+        # Failures are not cached
+        self.assertEqual(self.translate()[0], "[en] bonjour")
+
+    @patch("satisfactions.management.commands.utils.time.sleep")
+    def test_get_translations_locked_cache(self, mock_sleep):
+        """
+        Should wait for another process writing the cache, and keep the
+        translations it could not store.
+        """
+        TranslationCache(self.cache_path).close()
+        other = sqlite3.connect(self.cache_path)
+        # Write lock of another process, readers are not blocked
+        other.execute("BEGIN IMMEDIATE")
+
+        connect = sqlite3.connect
+        with patch(
+            "satisfactions.management.commands.utils.sqlite3.connect",
+            side_effect=lambda *args, **kwargs: connect(
+                *args, **{**kwargs, "timeout": 0.01}
+            ),
+        ):
+            translations = self.translate()
+
+        self.assertEqual(translations[0], "[en] bonjour")
+        # Retried, then left to the next run
+        self.assertEqual(mock_sleep.call_count, 3 * 3)
+        other.rollback()
+        other.close()
+        self.assertEqual(self.translate(), translations)
+
+    def test_get_translations_empty_not_cached(self):
+        """
+        Should translate again the texts translated as empty.
+        """
+        with patch.object(StubTranslatorBackend, "translate", return_value=None):
+            self.assertEqual(self.translate(), ["", "", "", "", ""])
+
+        self.assertEqual(self.translate()[0], "[en] bonjour")
@@ -3,9 +3,12 @@ import unittest
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient, APITestCase
 from satisfactions.models import Satisfaction
+from satisfactions.registry import ModelNotAvailable
+from satisfactions.tests.test_registry import build_pipeline, reset_predictions
 
 User = get_user_model()
 from rest_framework import status
@@ -20,6 +23,8 @@ class SatisfactionsViewTests(APITestCase):
         """
         Create example of satisfactions.
         """
+        reset_predictions(self)
+
         self.user = User.objects.create_user(
             email="john@example.com",
             password="pass12345",
@@ -41,7 +46,7 @@ class SatisfactionsViewTests(APITestCase):
     @unittest.skipIf(
         os.getenv("CI") == "true", "Skip test because no pkl files are pushed"
     )
-    @patch("satisfactions.serializers.detect", return_value="fr")
+    @patch("satisfactions.predictions.language_identifier.detect", return_value="fr")
     def test_create_satisfaction_fr_success(self, mock_detect):
         """
         Should create a new satisfaction form when valid data is provided.
@@ -61,7 +66,7 @@ class SatisfactionsViewTests(APITestCase):
     @unittest.skipIf(
         os.getenv("CI") == "true", "Skip test because no pkl files are pushed"
     )
-    @patch("satisfactions.serializers.detect", return_value="en")
+    @patch("satisfactions.predictions.language_identifier.detect", return_value="en")
     def test_create_satisfaction_en_success(self, mock_detect):
         """
         Should create a new satisfaction form when valid data is provided.
@@ -81,11 +86,9 @@ class SatisfactionsViewTests(APITestCase):
     @unittest.skipIf(
         os.getenv("CI") == "true", "Skip test because no pkl files are pushed"
     )
-    @patch("satisfactions.serializers.detect", return_value="fr")
-    @patch("satisfactions.serializers.os.path.isfile", return_value=False)
-    def test_create_satisfaction_missing_model_fr_failure(
-        self, mock_isfile, mock_detect
-    ):
+    @patch("satisfactions.predictions.language_identifier.detect", return_value="fr")
+    @patch("satisfactions.predictions.registry.get", side_effect=ModelNotAvailable())
+    def test_create_satisfaction_missing_model_fr_failure(self, mock_get, mock_detect):
         """
         Should return 400 if the model file is missing for French language.
         """
@@ -106,11 +109,9 @@ class SatisfactionsViewTests(APITestCase):
     @unittest.skipIf(
         os.getenv("CI") == "true", "Skip test because no pkl files are pushed"
     )
-    @patch("satisfactions.serializers.detect", return_value="en")
-    @patch("satisfactions.serializers.os.path.isfile", return_value=False)
-    def test_create_satisfaction_missing_model_en_failure(
-        self, mock_isfile, mock_detect
-    ):
+    @patch("satisfactions.predictions.language_identifier.detect", return_value="en")
+    @patch("satisfactions.predictions.registry.get", side_effect=ModelNotAvailable())
+    def test_create_satisfaction_missing_model_en_failure(self, mock_get, mock_detect):
         """
         Should return 400 if the model file is missing for English language.
         """
@@ -127,3 +128,108 @@ class SatisfactionsViewTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("Sorry we can not know", str(response.data))
+
+
+class SatisfactionsBulkViewTests(APITestCase):
+    """
+    Unit tests for the SatisfactionBulkView.
+    """
+
+    def setUp(self):
+        reset_predictions(self)
+
+        self.user = User.objects.create_user(
+            email="john@example.com",
+            password="pass12345",
+            first_name="John",
+            last_name="Doe",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.bulk_url = reverse("satisfactions_bulk_create")
+        self.model = build_pipeline()
+
+    def build_item(self, description):
+        return {
+            "description": description,
+            "email": "user@user.com",
+            "first_name": "user",
+            "last_name": "user",
+        }
+
+    @patch(
+        "satisfactions.predictions.language_identifier.detect_batch",
+        return_value=["en", "fr", "en", None],
+    )
+    def test_bulk_create_partial_success(self, mock_detect):
+        """
+        Should save valid items and return an error for each invalid one,
+        with a single prediction per language.
+        """
+        data = [
+            self.build_item("great app, i love it"),
+            self.build_item("je parle français et ça marche"),
+            self.build_item("small"),
+            self.build_item("awful app, i hate it"),
+            self.build_item("ich spreche deutsch"),
+        ]
+
+        with patch(
+            "satisfactions.predictions.registry.get", return_value=self.model
+        ) as mock_get:
+            response = self.client.post(self.bulk_url, data=data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Satisfaction.objects.count(), 3)
+        self.assertEqual(
+            sorted(call.args[0] for call in mock_get.call_args_list), ["en", "fr"]
+        )
+
+        created = response.json()["created"]
+        self.assertEqual([item["index"] for item in created], [0, 1, 3])
+        self.assertTrue(created[0]["polarity"])
+        self.assertFalse(created[2]["polarity"])
+
+        errors = response.json()["errors"]
+        self.assertEqual([item["index"] for item in errors], [2, 4])
+        self.assertIn("description", errors[0]["errors"])
+        self.assertIn("French or English", str(errors[1]["errors"]))
+
+    @patch(
+        "satisfactions.predictions.language_identifier.detect_batch",
+        return_value=["en"],
+    )
+    @patch("satisfactions.predictions.registry.get", side_effect=ModelNotAvailable())
+    def test_bulk_create_missing_model_failure(self, mock_get, mock_detect):
+        """
+        Should return 400 when no item can be saved.
+        """
+        data = [self.build_item("great app, i love it")]
+
+        response = self.client.post(self.bulk_url, data=data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Satisfaction.objects.count(), 0)
+        self.assertIn("Sorry we can not know", str(response.json()["errors"]))
+
+    def test_bulk_create_not_a_list_failure(self):
+        """
+        Should reject a payload which is not a list.
+        """
+        response = self.client.post(
+            self.bulk_url, data=self.build_item("great app"), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(SATISFACTION_BULK_MAX_ITEMS=1)
+    def test_bulk_create_too_many_items_failure(self):
+        """
+        Should reject a batch bigger than SATISFACTION_BULK_MAX_ITEMS.
+        """
+        data = [self.build_item("great app"), self.build_item("great app")]
+
+        response = self.client.post(self.bulk_url, data=data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,43 @@
+import re
+
+# Texts of a batch are joined with this character and cleaned at once
+SEPARATOR = "\x00"
+
+FORBIDDEN_CHARACTERS = {
+    "fr": re.compile(r"[^a-zàâçéèêëîïôûùüÿñæœ\s\x00]+"),
+    "en": re.compile(r"[^a-z\s\x00]+"),
+}
+
+
+def clean_texts(lang, texts):
+    """
+    Normalise a batch of texts the same way for training and predictions:
+        - lower case
+        - characters which are not letters of 'lang' replaced by a space
+        - consecutive spaces merged, leading and trailing spaces removed
+    'texts' can be a list, a Series or an array of strings.
+    The regex and lower() run once on the whole batch instead of once per text.
+
+    Returns the list of cleaned texts
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
+    joined = SEPARATOR.join(texts)
+    if joined.count(SEPARATOR) != len(texts) - 1:
+        texts = [text.replace(SEPARATOR, " ") for text in texts]
+        joined = SEPARATOR.join(texts)
+
+    joined = FORBIDDEN_CHARACTERS[lang].sub(" ", joined.lower())
+
+    # str.split() drops every whitespace run, like re.sub(r"\s+", " ") + strip()
+    return [" ".join(text.split()) for text in joined.split(SEPARATOR)]
+
+
+def clean_text_fr(text):
+    return clean_texts("fr", [text])[0]
+
+
+def clean_text_en(text):
+    return clean_texts("en", [text])[0]
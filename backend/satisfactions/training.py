@@ -0,0 +1,412 @@
+import numbers
+import time
+from collections import defaultdict
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import (
+    CountVectorizer,
+    HashingVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from .artifacts import ArtifactStore
+
+PARAMETERS = {
+    # TF-IDF
+    "tfidf__max_df": [0.25, 0.5, 0.75, 1.0],
+    "tfidf__min_df": [1, 2, 5],
+    "tfidf__ngram_range": [(1, 1), (1, 2), (1, 3)],
+    "tfidf__sublinear_tf": [True, False],
+    # MultinomialNB
+    "clf__estimator__alpha": [1e-2, 1e-3, 1e-1],
+    "clf__estimator__fit_prior": [True, False],
+}
+
+# Same search for the pipeline with a hashing vectorizer, which has no
+# vocabulary to filter by document frequency
+HASHING_PARAMETERS = {
+    # Hashing and TF-IDF
+    "hashing__ngram_range": [(1, 1), (1, 2), (1, 3)],
+    "tfidf__sublinear_tf": [True, False],
+    # MultinomialNB
+    "clf__estimator__alpha": [1e-2, 1e-3, 1e-1],
+    "clf__estimator__fit_prior": [True, False],
+}
+
+# Vectorizer parameters the search can share between candidates
+TFIDF_PARAMETERS = [
+    "tfidf__max_df",
+    "tfidf__min_df",
+    "tfidf__ngram_range",
+    "tfidf__sublinear_tf",
+]
+HASHING_SHARED_PARAMETERS = ["hashing__ngram_range", "tfidf__sublinear_tf"]
+
+
+def build_hashing_vectorizer(n_features, ngram_range=(1, 1)):
+    """
+    Counts of hashed terms: like CountVectorizer, without vocabulary.
+    """
+    return HashingVectorizer(
+        n_features=n_features,
+        ngram_range=ngram_range,
+        alternate_sign=False,
+        norm=None,
+    )
+
+
+def build_pipeline(params=None, n_features=None):
+    """
+    Pipeline trained by 'create_models', with 'params' if given.
+    With 'n_features', terms are hashed to that many columns instead of
+    being looked up in a vocabulary.
+    """
+    if n_features:
+        vectorizer = [
+            ("hashing", build_hashing_vectorizer(n_features)),
+            ("tfidf", TfidfTransformer()),
+        ]
+    else:
+        vectorizer = [("tfidf", TfidfVectorizer())]
+
+    pipeline = Pipeline(
+        vectorizer
+        + [
+            (
+                "clf",
+                OneVsRestClassifier(MultinomialNB(fit_prior=True, class_prior=None)),
+            ),
+        ]
+    )
+    if params:
+        pipeline.set_params(**params)
+    return pipeline
+
+
+def split_dataset(X, y):
+    """
+    Train and test sets of 'create_models': the test set is never trained on.
+    Returns X_train, X_test, y_train, y_test
+    """
+    return train_test_split(X, y, test_size=0.2, random_state=48)
+
+
+def save_pipeline(pipeline, data_path, lang, params=None, metrics=None):
+    """
+    Publish 'pipeline' as a new version of the model of 'lang' and activate
+    it (see artifacts.py): running registries serve it on their next call.
+    Returns the manifest of the version.
+    """
+    return ArtifactStore(data_path).publish(
+        pipeline, lang, params=params, metrics=metrics
+    )
+
+
+def limit_features(counts, max_df, min_df):
+    """
+    Columns of 'counts' a CountVectorizer with 'max_df' and 'min_df' would keep,
+    None when it would raise because no term remains.
+    """
+    n_docs = counts.shape[0]
+    high = max_df if isinstance(max_df, numbers.Integral) else max_df * n_docs
+    low = min_df if isinstance(min_df, numbers.Integral) else min_df * n_docs
+    if high < low:
+        return None
+
+    # Number of documents containing each term
+    dfs = np.bincount(counts.indices, minlength=counts.shape[1])
+    columns = np.flatnonzero((dfs <= high) & (dfs >= low))
+    if not len(columns):
+        return None
+    return columns
+
+
+def score_candidates(
+    X, y, train, test, ngram_range, candidates, deadline=None, n_features=None
+):
+    """
+    Score on one fold every candidate sharing 'ngram_range':
+        - counts are computed once for the fold and the ngram range
+        - TF-IDF matrices once per (max_df, min_df, sublinear_tf)
+        - only the classifier is fitted for each candidate
+    'candidates' is a list of (index, params). After 'deadline' (time.time()),
+    remaining candidates are skipped, but at least one is scored.
+    With 'n_features', candidates are hashing pipelines (see build_pipeline).
+
+    Returns {index: accuracy}, NaN when the vectorizer would fail
+    """
+    if n_features:
+        counter = build_hashing_vectorizer(n_features, ngram_range)
+    else:
+        counter = CountVectorizer(ngram_range=ngram_range)
+    counts_train = counter.fit_transform(X[train])
+    counts_test = counter.transform(X[test])
+
+    def tfidf_key(candidate):
+        _, params = candidate
+        return (
+            params.get("tfidf__max_df"),
+            params.get("tfidf__min_df"),
+            params["tfidf__sublinear_tf"],
+        )
+
+    scores = {}
+    key, matrices = None, None
+    # Sorted by TF-IDF parameters: only one pair of matrices in memory
+    for index, params in sorted(candidates, key=tfidf_key):
+        if scores and deadline and time.time() > deadline:
+            break
+
+        if tfidf_key((index, params)) != key:
+            key = tfidf_key((index, params))
+            if n_features:
+                # Hashed columns are not filtered, unused ones stay empty
+                columns = np.arange(counts_train.shape[1])
+            else:
+                columns = limit_features(counts_train, key[0], key[1])
+            if columns is None:
+                matrices = None
+            else:
+                transformer = TfidfTransformer(sublinear_tf=key[2])
+                matrices = (
+                    transformer.fit_transform(counts_train[:, columns]),
+                    transformer.transform(counts_test[:, columns]),
+                )
+
+        if matrices is None:
+            scores[index] = np.nan
+            continue
+
+        classifier = build_pipeline(params, n_features).named_steps["clf"]
+        classifier.fit(matrices[0], y[train])
+        scores[index] = accuracy_score(y[test], classifier.predict(matrices[1]))
+
+    return scores
+
+
+def score_fold(fold, *args):
+    return fold, score_candidates(*args)
+
+
+class CachedSearch:
+    """
+    Search of the best build_pipeline parameters with cross validation,
+    without refitting the vectorizer for each candidate: see score_candidates.
+    Strategies:
+        - exhaustive: every candidate of the grid, same folds, scores and
+          best candidate as GridSearchCV(build_pipeline(), parameters, cv=cv)
+        - random: 'n_iter' candidates of the grid drawn at random
+        - halving: successive halving, every candidate is scored on a small
+          random part of the data, the best 1/'factor' on 'factor' times more
+          data, and so on until the whole data
+    With 'time_budget' (seconds), no new candidate is scored once it is spent.
+    With 'n_features', the hashing pipeline of build_pipeline is searched.
+    Only the vectorizer parameters of TFIDF_PARAMETERS (or
+    HASHING_SHARED_PARAMETERS) can be searched.
+    """
+
+    STRATEGIES = ["exhaustive", "random", "halving"]
+
+    def __init__(
+        self,
+        parameters,
+        strategy="exhaustive",
+        n_iter=50,
+        factor=3,
+        time_budget=None,
+        cv=2,
+        n_jobs=None,
+        random_state=0,
+        verbose=0,
+        n_features=None,
+    ):
+        if n_features:
+            self.shared_parameters = HASHING_SHARED_PARAMETERS
+            self.ngram_parameter = "hashing__ngram_range"
+        else:
+            self.shared_parameters = TFIDF_PARAMETERS
+            self.ngram_parameter = "tfidf__ngram_range"
+        unsupported = [
+            name
+            for name in parameters
+            if name.startswith(("tfidf__", "hashing__"))
+            and name not in self.shared_parameters
+        ]
+        if unsupported:
+            raise ValueError(f"Unsupported vectorizer parameters: {unsupported}")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+
+        self.parameters = parameters
+        self.strategy = strategy
+        self.n_iter = n_iter
+        self.factor = factor
+        self.time_budget = time_budget
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.verbose = verbose
+        self.n_features = n_features
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=object)
+        y = np.asarray(y)
+        rng = np.random.default_rng(self.random_state)
+
+        default_params = build_pipeline(n_features=self.n_features).get_params()
+        defaults = {name: [default_params[name]] for name in self.shared_parameters}
+        grid = list(ParameterGrid({**defaults, **self.parameters}))
+        candidates = list(enumerate(grid))
+
+        if self.strategy == "random" and self.n_iter < len(candidates):
+            drawn = rng.choice(len(candidates), self.n_iter, replace=False)
+            candidates = [candidates[index] for index in sorted(drawn)]
+
+        self._start_time = time.perf_counter()
+        deadline = time.time() + self.time_budget if self.time_budget else None
+        self.history_ = []
+        self._results = []
+
+        if self.strategy == "halving":
+            # Enough rounds to keep a single candidate
+            n_rounds = 1
+            while self.factor**n_rounds <= len(candidates):
+                n_rounds += 1
+            min_resources = max(
+                len(y) // self.factor ** (n_rounds - 1),
+                2 * self.cv * len(np.unique(y)),
+            )
+
+            for iteration in range(n_rounds):
+                n_resources = min(len(y), min_resources * self.factor**iteration)
+                subset = np.sort(rng.permutation(len(y))[:n_resources])
+                scores = self.evaluate(
+                    X[subset], y[subset], candidates, deadline, iteration, n_resources
+                )
+
+                # Best ones first, in grid order for equal scores
+                ranked = sorted(
+                    scores,
+                    key=lambda index: (-np.nan_to_num(scores[index], nan=-1), index),
+                )
+                kept = set(ranked[: int(np.ceil(len(candidates) / self.factor))])
+                candidates = [
+                    candidate for candidate in candidates if candidate[0] in kept
+                ]
+
+                if n_resources == len(y) or (deadline and time.time() > deadline):
+                    break
+        else:
+            self.evaluate(X, y, candidates, deadline, 0, len(y))
+
+        self.search_time_ = time.perf_counter() - self._start_time
+
+        self._results.sort(key=lambda result: (result["iter"], result["index"]))
+        self.cv_results_ = {
+            "params": [
+                {name: grid[result["index"]][name] for name in self.parameters}
+                for result in self._results
+            ],
+            "mean_test_score": np.array([result["score"] for result in self._results]),
+            "iter": [result["iter"] for result in self._results],
+            "n_resources": [result["n_resources"] for result in self._results],
+        }
+
+        # First of the best candidates of the last iteration, like GridSearchCV
+        last_round = max(self.cv_results_["iter"])
+        mean_scores = np.where(
+            np.array(self.cv_results_["iter"]) == last_round,
+            self.cv_results_["mean_test_score"],
+            np.nan,
+        )
+        self.best_index_ = int(np.nanargmax(mean_scores))
+        self.best_score_ = mean_scores[self.best_index_]
+        self.best_params_ = self.cv_results_["params"][self.best_index_]
+
+        start_time = time.perf_counter()
+        self.best_estimator_ = build_pipeline(self.best_params_, self.n_features)
+        self.best_estimator_.fit(X, y)
+        self.refit_time_ = time.perf_counter() - start_time
+
+        return self
+
+    def evaluate(self, X, y, candidates, deadline, iteration, n_resources):
+        """
+        Score 'candidates' with cross validation on X, y.
+        Returns {index: mean accuracy} of the candidates scored on every fold
+        """
+        folds = list(StratifiedKFold(n_splits=self.cv).split(X, y))
+
+        groups = defaultdict(list)
+        for index, params in candidates:
+            groups[params[self.ngram_parameter]].append((index, params))
+
+        if self.verbose:
+            print(
+                f"Fitting {len(folds)} folds for each of {len(candidates)} candidates"
+                f" on {n_resources} samples, totalling {len(folds) * len(candidates)} fits"
+            )
+
+        fold_scores = defaultdict(list)
+        mean_scores = {}
+        for _, scores in Parallel(n_jobs=self.n_jobs, return_as="generator_unordered")(
+            delayed(score_fold)(
+                fold,
+                X,
+                y,
+                train,
+                test,
+                ngram_range,
+                group,
+                deadline,
+                self.n_features,
+            )
+            for fold, (train, test) in enumerate(folds)
+            for ngram_range, group in groups.items()
+        ):
+            for index, score in scores.items():
+                fold_scores[index].append(score)
+                if len(fold_scores[index]) < len(folds):
+                    continue
+
+                mean_scores[index] = np.mean(fold_scores[index])
+                self._results.append(
+                    {
+                        "index": index,
+                        "score": mean_scores[index],
+                        "iter": iteration,
+                        "n_resources": n_resources,
+                    }
+                )
+                self.record(iteration, mean_scores[index])
+
+        return mean_scores
+
+    def record(self, iteration, score):
+        """
+        Add the best score of the current iteration so far to 'history_'.
+        """
+        best_score = np.nan
+        if self.history_ and self.history_[-1]["iter"] == iteration:
+            best_score = self.history_[-1]["best_score"]
+        if np.isnan(best_score) or score > best_score:
+            best_score = score
+
+        self.history_.append(
+            {
+                "time": time.perf_counter() - self._start_time,
+                "iter": iteration,
+                "candidates": len(self.history_) + 1,
+                "best_score": best_score,
+            }
+        )
+
+    def score(self, X, y):
+        return self.best_estimator_.score(X, y)
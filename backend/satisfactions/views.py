@@ -1,8 +1,21 @@
-from rest_framework.generics import CreateAPIView
-from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import CreateAPIView, GenericAPIView
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from .models import Satisfaction
-from .serializers import SatisfactionSerializer
+from .scoring import score
+from .serializers import (
+    LANGUAGE_ERROR,
+    MODEL_ERROR,
+    SatisfactionSerializer,
+    SatisfactionStatsQuerySerializer,
+)
+from .stats import get_stats, update_rollups
 
 
 class SatisfactionView(CreateAPIView):
@@ -16,6 +29,114 @@ class SatisfactionView(CreateAPIView):
 
     def perform_create(self, serializer):
         """
-        Associate the current authentified user
+        Associate the current authentified user, and count the satisfaction
+        in the stats.
         """
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            satisfaction = serializer.save(user=self.request.user)
+            update_rollups([satisfaction])
+
+
+class SatisfactionBulkView(GenericAPIView):
+    """
+    View to save a batch of satisfaction comments (only POST method).
+    Mobile clients queue comments offline and send them all at once.
+
+    Each item is validated on its own, so one bad item does not reject the batch:
+        - languages are detected for the whole batch at once
+        - polarities are predicted with one model call per language
+        - valid items are saved with a single bulk_create
+        - the stats are updated once for the whole batch
+    With SATISFACTION_ASYNC_SCORING, valid items are saved as pending instead.
+    """
+
+    queryset = Satisfaction.objects.all()
+    serializer_class = SatisfactionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_serializer_context(self):
+        """
+        Polarities are predicted for the whole batch, not item by item.
+        """
+        context = super().get_serializer_context()
+        context["predict"] = False
+        return context
+
+    def post(self, request, *args, **kwargs):
+        items = request.data
+        max_items = settings.SATISFACTION_BULK_MAX_ITEMS
+
+        if not isinstance(items, list):
+            raise ValidationError({"detail": "Expected a list of satisfactions."})
+        if len(items) > max_items:
+            raise ValidationError(
+                {"detail": f"A batch cannot contain more than {max_items} items."}
+            )
+
+        errors = {}
+        satisfactions = {}
+
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                satisfactions[index] = Satisfaction(
+                    **serializer.validated_data, user=request.user
+                )
+            else:
+                errors[index] = serializer.errors
+
+        if not settings.SATISFACTION_ASYNC_SCORING:
+            for satisfaction in satisfactions.values():
+                satisfaction.status = Satisfaction.Status.PENDING
+
+            score(list(satisfactions.values()))
+
+            for index, satisfaction in list(satisfactions.items()):
+                if satisfaction.status == Satisfaction.Status.REJECTED:
+                    errors[index] = {"non_field_errors": [LANGUAGE_ERROR]}
+                elif satisfaction.status == Satisfaction.Status.PENDING:
+                    errors[index] = {"non_field_errors": [MODEL_ERROR]}
+                else:
+                    continue
+                del satisfactions[index]
+
+        indexes = sorted(satisfactions)
+        with transaction.atomic():
+            created = Satisfaction.objects.bulk_create(
+                [satisfactions[index] for index in indexes]
+            )
+            update_rollups(created)
+
+        data = {
+            "created": [
+                {"index": index, **self.get_serializer(satisfactions[index]).data}
+                for index in indexes
+            ],
+            "errors": [
+                {"index": index, "errors": errors[index]} for index in sorted(errors)
+            ],
+        }
+        status_code = (
+            status.HTTP_201_CREATED if indexes else status.HTTP_400_BAD_REQUEST
+        )
+
+        return Response(data, status=status_code)
+
+
+class SatisfactionStatsView(APIView):
+    """
+    View to read the number of positive and negative satisfactions (only GET
+    method, admins only), by day or week and optionally by language and
+    cohort (month the author signed up).
+    Served from the rollups (see stats.py), never from the satisfactions.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        query = SatisfactionStatsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        results = get_stats(**query.validated_data)
+
+        return Response({"period": query.validated_data["period"], "results": results})
@@ -19,5 +19,11 @@ class EmailUser(AbstractUser):
     # User our EmailUserManager
     objects = EmailUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pagination (see backend/pagination.py)
+            models.Index(fields=["created_at", "id"], name="user_created_at_id"),
+        ]
+
     def __str__(self):
         return f"User email: {self.email}, created at: {self.created_at}."
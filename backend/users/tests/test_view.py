@@ -202,3 +202,26 @@ class UsersAPITests(APITestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.json()["count"], 1)
         self.assertIn("email", res.data["results"][0])
+
+    def test_list_users_with_keyset_pagination_success(self):
+        """
+        Should page users newest first, up to 'page_size' per page.
+        """
+        jane = User.objects.create_user(
+            email="jane@example.com",
+            password="pass12345",
+            first_name="Jane",
+            last_name="Doe",
+        )
+        url = reverse("users-list")
+
+        res = self.client.get(url, {"cursor": "", "page_size": 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", res.json())
+        self.assertEqual(res.json()["results"][0]["email"], jane.email)
+
+        res = self.client.get(res.json()["next"])
+
+        self.assertEqual(res.json()["results"][0]["email"], self.user.email)
+        self.assertIsNone(res.json()["next"])
@@ -1,5 +1,6 @@
 import logging
 
+from backend.pagination import KeysetPaginationMixin
 from django.contrib.auth import get_user_model
 from rest_framework import permissions, viewsets
 from rest_framework.decorators import action
@@ -11,16 +12,20 @@ User = get_user_model()
 logger = logging.getLogger("users")
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     """
     Handle CRUD operations on USERS
         list/retrieve
         create
         update/partial_update/destroy
         me
+    With a 'cursor' query parameter, list is paginated on (created_at, id),
+    newest first (see backend/pagination.py).
     """
 
     queryset = User.objects.all().order_by("-id")
+    keyset_ordering_fields = ["created_at"]
+    keyset_ordering = "-created_at"
     serializer_class = UserSerializer
 
     def get_permissions(self):